@@ -1,3 +1,5 @@
+import os
+import secrets
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -40,12 +42,6 @@ delta_red = "#FF5555"
 border_radius_px = 40
 border_radius_rem = px_to_rem(40)
 
-#######################
-# Read Helper Data
-
-electives_ranking = load_bba_electives_ranking()
-electives_demand_vacancy = load_bba_electives_demand_vacancy_data()
-
 #######################
 # Functions to Render Charts/Visualisations/Widgets
 
@@ -66,6 +62,11 @@ def render_CGPA_box(label, sublabel, value:int, bg_color="#fa4202", text_color="
 
     degree_class = degree_classifier(user.snapshot.cgpa)
 
+    # percentile within the reference cohort (empty if there is no cohort_percentiles artifact)
+    cohort_display = format_percentile(load_cohort_percentiles().percentile(COHORT_OVERALL, user.snapshot.cgpa))
+    if cohort_display:
+        cohort_display = f"{cohort_display} of cohort"
+
     st.markdown(f"""
         <div style="
             background: {bg_color};
@@ -146,6 +147,14 @@ def render_CGPA_box(label, sublabel, value:int, bg_color="#fa4202", text_color="
                 ">
                     {degree_class}
                 </div>
+                <div style="
+                    color: {text_color};
+                    font-size: {x_axis_tick_size_rem}rem;
+                    font-weight: 500;
+                    white-space: nowrap;
+                ">
+                    {cohort_display}
+                </div>
             </div>
         </div>
     </div>
@@ -219,6 +228,12 @@ def render_metric_box(label, sublabel, value:int, icon, bg_color, text_color, su
 
 def render_degree_completion_donut(completion_rate):
 
+    fig = figure_cache.get_or_build('Degree Completion', lambda: build_degree_completion_donut_figure(completion_rate),
+                                    completion_rate, colors)
+    st.plotly_chart(fig, use_container_width=True)
+
+def build_degree_completion_donut_figure(completion_rate):
+
     fig = go.Figure()
 
     # Base Ring (Remaining)
@@ -297,10 +312,15 @@ def render_degree_completion_donut(completion_rate):
         paper_bgcolor=colors.chart_background_color
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 def render_track_progress_donut(df):
 
+    fig = figure_cache.get_or_build('Track Progress', lambda: build_track_progress_donut_figure(df), df, colors)
+    st.plotly_chart(fig, use_container_width=True)
+
+def build_track_progress_donut_figure(df):
+
     df = df.sort_values(by='Completion_Rate')
 
     fig = go.Figure()
@@ -386,13 +406,27 @@ def render_track_progress_donut(df):
         plot_bgcolor=colors.chart_background_color
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 def render_track_gpa_barchart(df):
 
     df = df[['Module_Type', 'CGPA']]
     df = df.sort_values(by='CGPA', ascending=True)
 
+    # percentile of each track CGPA within the reference cohort (binary search on the cohort_percentiles artifact),
+    # none for tracks without graded modules (CGPA filled with 0)
+    cohort_percentiles = load_cohort_percentiles()
+    cohort_labels = [
+        format_percentile(cohort_percentiles.percentile(track, cgpa)) if cgpa > 0 else ''
+        for track, cgpa in zip(df['Module_Type'], df['CGPA'])
+    ]
+
+    fig = figure_cache.get_or_build('Track CGPA', lambda: build_track_gpa_barchart_figure(df, user.snapshot.cgpa, cohort_labels),
+                                    df, user.snapshot.cgpa, cohort_labels, colors)
+    st.plotly_chart(fig, use_container_width=True)
+
+def build_track_gpa_barchart_figure(df, cgpa, cohort_labels):
+
     fig = go.Figure()
 
     # Background bar & half-circle markers at right edge to simulate rounded edges
@@ -415,11 +449,16 @@ def render_track_gpa_barchart(df):
         x=df['CGPA'],
         orientation='h',
         marker=dict(color=[
-            colors.primary_chart_color if val >= user.snapshot.cgpa else colors.secondary_chart_color
+            colors.primary_chart_color if val >= cgpa else colors.secondary_chart_color
             for val in df['CGPA']
             ]
         ),
-        hovertemplate='Cumulative GPA: %{x}<extra></extra>',
+        text=cohort_labels,
+        textposition='inside',
+        insidetextanchor='end',
+        textfont=dict(size=x_axis_tick_size_px * 0.8, color=colors.app_bgcolor),
+        customdata=[f"<br>{label} of cohort" if label else '' for label in cohort_labels],
+        hovertemplate='Cumulative GPA: %{x}%{customdata}<extra></extra>',
         name='Cumulative GPA',
         showlegend=False
     ))
@@ -429,7 +468,7 @@ def render_track_gpa_barchart(df):
         x=[None],
         y=[None],
         marker=dict(color=colors.primary_chart_color),
-        name=f'>=  {user.snapshot.cgpa}',
+        name=f'>=  {cgpa}',
         hoverinfo='skip',
         showlegend=True
     ))
@@ -438,7 +477,7 @@ def render_track_gpa_barchart(df):
         x=[None],
         y=[None],
         marker=dict(color=colors.secondary_chart_color),
-        name=f'<  {user.snapshot.cgpa}',
+        name=f'<  {cgpa}',
         hoverinfo='skip',
         showlegend=True
     ))
@@ -483,55 +522,18 @@ def render_track_gpa_barchart(df):
     )
 
     # Now display the chart normally
-    st.plotly_chart(fig, use_container_width=True)
-
-def render_cgpa_trend_waterfallchart(df):
-
-    def pad_missing_lists(year_list, cgpa_list, measure_list):
-
-        full_term_order = [11, 12, 21, 22, 31, 32, 41, 42, 51, 52]
-        max_term = max(year_list)
-        padded_terms = [term for term in full_term_order if term <= max_term]
-        term_cgpa_map = dict(zip(year_list, cgpa_list))
-        term_measure_map = dict(zip(year_list, measure_list))
-
-        padded_cgpas = []
-        last_cgpa = 0
-        for term in padded_terms:
-            if term in term_cgpa_map:
-                cgpa = term_cgpa_map[term]
-                padded_cgpas.append(cgpa)
-                last_cgpa = cgpa
-            else:
-                padded_cgpas.append(last_cgpa)
-        # padded_cgpas = [term_cgpa_map.get(term, 0) for term in padded_terms]
+    return fig
 
-        padded_measures = [term_measure_map.get(term, "relative") for term in padded_terms]
-        return padded_cgpas, padded_terms, padded_measures
-
-    cgpa_vector, measure_vector, year_vector = [], [], []
-
-    for term in sorted(df['Term'].unique()):
-
-        data = df[df['Term'] <= term]
-
-        cgpa = user.compute_cgpa(data)
-    
-        cgpa_vector.append(cgpa)
+def render_cgpa_trend_waterfallchart(timeline):
 
-        if term == min(df['Term']):
-            measure_vector.append('absolute')
-        else:
-            measure_vector.append('relative')
-        
-        # term = str(term)
-        year_vector.append(term)
+    fig = figure_cache.get_or_build('CGPA Trend', lambda: build_cgpa_trend_waterfallchart_figure(timeline), timeline, colors)
+    st.plotly_chart(fig, use_container_width=True)
 
-    padded_cgpas, padded_terms, padded_measures = pad_missing_lists(year_list=year_vector,
-                                                                    cgpa_list=cgpa_vector,
-                                                                    measure_list=measure_vector)
+def build_cgpa_trend_waterfallchart_figure(timeline):
 
-    padded_cgpas_vector = pd.Series(padded_cgpas).apply(lambda x : round_half_up(x))
+    # timeline: CGPATimeline precomputed with the snapshot (cumulative CGPA after every term, missing terms padded)
+    padded_terms, padded_measures = timeline.terms, timeline.measures
+    padded_cgpas_vector = pd.Series(round_half_up_array(timeline.cgpa))
 
     padded_change_vector = padded_cgpas_vector.diff()
     padded_change_vector.iloc[0] = padded_cgpas_vector.iloc[0]
@@ -611,10 +613,20 @@ def render_cgpa_trend_waterfallchart(df):
         showlegend=True
     )
  
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 def render_demand_vacancy_trends(elective_df: pd.DataFrame, demand_df: pd.DataFrame, top_modules: set):
 
+    # top_modules as a list: the iteration order of the set decides the colour of each module
+    top_modules = list(top_modules)
+    main_major = user.main_major
+    fig = figure_cache.get_or_build('Demand & Vacancy',
+                                    lambda: build_demand_vacancy_trends_figure(elective_df, demand_df, top_modules, main_major),
+                                    elective_df, demand_df, top_modules, main_major, colors)
+    st.plotly_chart(fig, use_container_width=True)
+
+def build_demand_vacancy_trends_figure(elective_df: pd.DataFrame, demand_df: pd.DataFrame, top_modules: list, main_major):
+
     term_order = ["AY20-21-Sem-2",
                   "AY20-21-Special-Term-2",
                   "AY21-22-Sem-1", 
@@ -741,7 +753,8 @@ def render_demand_vacancy_trends(elective_df: pd.DataFrame, demand_df: pd.DataFr
         height=920,
         margin=dict(t=top_padding_px, l=left_padding_px, r=right_padding_px, b=bottom_padding_px+50),  # Extra bottom space for annotations
         title=dict(
-            text="🗂️ Recommended Modules for Your Main Major" if user.main_major is not None else "🗂️ Modules with High Popularity Scores",
+            text=("🗂️ Recommended Modules for Your Main Major" if main_major is not None
+                  else "🗂️ Modules with High Popularity Scores"),
             font=dict(size=title_font_size_px, color=colors.primary_text_color, family="Inter, sans-serif"),
             x=title_x_orient,
             xanchor='left',
@@ -763,7 +776,7 @@ def render_demand_vacancy_trends(elective_df: pd.DataFrame, demand_df: pd.DataFr
         showlegend=True
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 def render_table(df):
 
@@ -894,12 +907,220 @@ def render_table(df):
     # Render in Streamlit
     components.html(html_string, height=600, width=5000, scrolling=True)
 
+# -- What-If Planner: hypothetical modules entered in an editable table, applied to the user's WhatIfPlan as deltas:
+
+def render_what_if_planner(user):
+
+    # Start a new plan whenever the snapshot changes (new upload, filter or main major)
+    if st.session_state.get('what_if_snapshot') is not user.snapshot:
+        st.session_state.what_if_snapshot = user.snapshot
+        st.session_state.what_if_plan = user.start_what_if()
+        st.session_state.what_if_rows = {}
+    plan = st.session_state.what_if_plan
+
+    with st.expander("🔮 What-If Planner: add future modules to see your projected results", expanded=False):
+
+        edited_df = st.data_editor(
+            pd.DataFrame({'Module_Code': pd.Series(dtype=str), 'Units': pd.Series(dtype=int),
+                          'Module_Type': pd.Series(dtype=str), 'Grade': pd.Series(dtype=str), 'Year': pd.Series(dtype=int)}),
+            num_rows='dynamic',
+            use_container_width=True,
+            key='what_if_editor',
+            column_config={
+                'Module_Code': st.column_config.TextColumn('Module Code', required=True),
+                'Units': st.column_config.NumberColumn('Units', min_value=1, max_value=20, step=1, default=4, required=True),
+                'Module_Type': st.column_config.SelectboxColumn(
+                    'Module Type', options=sorted(ALLOWED_MODULE_TYPES | set(user.all_tracks)), required=True
+                ),
+                'Grade': st.column_config.SelectboxColumn(
+                    'Grade', options=list(get_grade_mapping()), default='A', required=True
+                ),
+                'Year': st.column_config.NumberColumn(
+                    'Year', min_value=1, max_value=6, step=1, default=int(user.snapshot.current_year), required=True
+                )
+            }
+        )
+        sync_what_if_plan(plan, edited_df, st.session_state.what_if_rows)
+
+        projection = plan.projection()
+        snapshot = user.snapshot
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Projected CGPA", f"{projection.cgpa:.2f}", delta=f"{projection.cgpa - snapshot.cgpa:+.2f}")
+        col2.metric("Degree Classification", projection.degree_classification)
+        col3.metric("Remaining S/Us", int(projection.SU_used), delta=int(projection.SU_used - snapshot.SU_used))
+        col4.metric("Total MCs", projection.total_units, delta=int(projection.total_units - snapshot.total_units))
+
+        current = normalize_completion_status(snapshot.track_status).set_index('Module_Type')['Completion_Rate']
+        projected = normalize_completion_status(projection.track_status).set_index('Module_Type')['Completion_Rate']
+        comparison = pd.DataFrame({'Current': current, 'Projected': projected}).fillna(0)
+        comparison = comparison[(comparison['Current'] > 0) | (comparison['Projected'] > 0)]
+        st.dataframe(
+            (comparison * 100).round(0).astype(int).astype(str) + '%',
+            use_container_width=True
+        )
+
+# -- Degree Classification Reachability: which classes are still reachable & the least demanding grade mix for each:
+
+def render_classification_reachability(user):
+
+    with st.expander("🎯 Degree Classification Targets: what you need over your remaining modules", expanded=False):
+
+        targets = user.compute_classification_reachability()
+        remaining_units = max(0, 160 - int(user.snapshot.total_units))
+        st.caption(f"Assumes your remaining {remaining_units} MCs are taken as graded 4-MC modules (no S/U).")
+
+        st.dataframe(
+            pd.DataFrame({
+                'Degree Classification': [target.degree_classification for target in targets],
+                'Minimum CGPA': [f"{target.min_cgpa:.2f}" for target in targets],
+                'Status': [
+                    '✅ Guaranteed' if target.guaranteed else '🟢 Reachable' if target.reachable else '❌ Out of reach'
+                    for target in targets
+                ],
+                'Least Demanding Grades': [
+                    ', '.join(f"{count} × {grade}" for grade, count in target.grade_mix.items())
+                    if target.reachable and not target.guaranteed else '-'
+                    for target in targets
+                ],
+                'Projected CGPA': [
+                    f"{target.projected_cgpa:.2f}" if target.reachable and not target.guaranteed else '-' for target in targets
+                ]
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+
+# -- Graduation Path: remaining requirements packed into the fewest semesters under a max MCs per semester:
+
+def render_graduation_path(user):
+
+    with st.expander("🗓️ Graduation Path: a semester-by-semester plan of what you have left", expanded=False):
+
+        max_units = st.slider("Max MCs per semester", min_value=12, max_value=32, value=20, step=1,
+                              key='graduation_path_max_units')
+        plan = user.plan_graduation_path(max_units=max_units)
+        if not plan.terms:
+            st.info("You have no remaining requirements to plan.")
+            return
+
+        st.caption(f"{len(plan.terms)} semesters left"
+                   f"{'' if plan.is_optimal else ' (best plan found, may not be the shortest)'}. "
+                   "Modules of a track follow its lower-level modules; 'Other module' stands for GE, UE or minor modules.")
+        plan_df = plan.to_dataframe()
+        plan_df['Term'] = plan_df['Term'].map(lambda term: f"Y{term // 10}S{term % 10}")
+        st.dataframe(plan_df, use_container_width=True, hide_index=True)
+
 #######################
 # Helper Functions for Utility
 
+# -- Renders Diagnostic / ValidationIssue records from utils.py & user.py as Streamlit messages:
+
+def render_diagnostics(diagnostics):
+    for diagnostic in diagnostics:
+        if diagnostic.level == 'warning':
+            st.warning(diagnostic.message)
+        elif diagnostic.level == 'info':
+            st.info(diagnostic.message)
+        else:
+            st.error(diagnostic.message)
+
+# -- Returns True if internal reports for maintainers (e.g Session Memory) are shown: DASHBOARD_DEBUG=1 or ?debug=1 in the URL:
+
+def is_debug_mode():
+    return os.environ.get('DASHBOARD_DEBUG') == '1' or st.query_params.get('debug') == '1'
+
+# -- Renders per-panel build timings of the figure cache (debug mode only):
+
+def render_panel_timings():
+
+    with st.expander("⏱️ Panel Build Timings", expanded=False):
+        timings = load_figure_cache_report()
+        st.caption(f"Charts are rebuilt only when their data or colour theme change: "
+                   f"{timings['Hits'].sum()} served from cache, saving {timings['Saved_s'].sum():.2f}s of build time")
+        st.dataframe(timings, use_container_width=True, hide_index=True)
+
+# -- Renders per-artifact load time & memory of the reference data loaded so far (debug mode only):
+
+def render_data_registry_report():
+
+    with st.expander("📦 Reference Data", expanded=False):
+        registry_report = load_data_registry_report()
+        st.caption(f"{len(registry_report)} reference artifacts loaded in {registry_report['Load_Time_s'].sum():.2f}s, "
+                   f"holding {registry_report['Memory_Bytes'].sum() / 1024:,.1f} KB shared by every session")
+        st.dataframe(registry_report, use_container_width=True, hide_index=True)
+
+# -- Renders size, hit rate & evictions of the process-wide upload cache (debug mode only):
+
+def render_upload_cache_stats():
+
+    with st.expander("📥 Upload Cache", expanded=False):
+        cache_stats = load_upload_cache_stats()
+        st.caption(f"Re-uploads of a file already parsed skip parsing & validation: "
+                   f"{cache_stats['hits']} of {cache_stats['hits'] + cache_stats['misses']} uploads served from cache")
+        st.dataframe(pd.DataFrame([cache_stats]), use_container_width=True, hide_index=True)
+
+# -- Reads & validates uploaded file, rendering every problem found, returns (Dataframe or None, sha256 of the file):
+
+def load_uploaded_data(uploaded_file):
+    content_hash, df, issues = read_hashed_upload(uploaded_file)
+    render_diagnostics(issues)
+    return df, content_hash
+
+# -- Resumes a returning student (e.g after a browser refresh) from the snapshot store, using the ?session= token of the URL:
+
+def resume_session():
+    store = load_snapshot_store()
+    session_token = st.query_params.get('session')
+    if store is None or session_token is None:
+        return
+    resumed = store.get(session_token)
+    if resumed is not None:
+        content_hash, df, state = resumed
+        st.session_state.update(uploaded_df=df, upload_hash=content_hash, session_token=session_token,
+                                user=User.from_state(df, state), page='dashboard')
+
+# -- Saves the transcript & snapshots to the snapshot store whenever new snapshots were computed:
+
+def persist_session(user):
+    store = load_snapshot_store()
+    if store is None or 'upload_hash' not in st.session_state:
+        return
+    misses = user.snapshot_cache_stats()['misses']
+    if st.session_state.get('persisted_misses') != misses:
+        store.put(st.session_state.upload_hash, st.session_state.session_token, user.raw_data, user.export_state())
+        st.session_state.persisted_misses = misses
+
+# -- Applies edits of the What-If Planner table to the plan as add / remove / change-grade deltas
+#    (rows: { row position : (row values, plan id) } of the previous run):
+
+def sync_what_if_plan(plan, edited_df, rows):
+
+    for position in [position for position in rows if position >= len(edited_df)]:
+        plan.remove_module(rows.pop(position)[1])
+
+    for position, row in enumerate(edited_df.itertuples(index=False)):
+        if any(pd.isna(value) or value == '' for value in row):
+            if position in rows:
+                plan.remove_module(rows.pop(position)[1])
+            continue
+
+        values = (str(row.Module_Code).strip().upper(), int(row.Units), row.Module_Type, row.Grade, int(row.Year))
+        previous = rows.get(position)
+        if previous is not None and previous[0] == values:
+            continue
+        if previous is not None and previous[0][:3] + previous[0][4:] == values[:3] + values[4:]:
+            plan.change_grade(previous[1], values[3])
+            rows[position] = (values, previous[1])
+            continue
+        if previous is not None:
+            plan.remove_module(previous[1])
+        module_code, units, module_type, grade, year = values
+        rows[position] = (values, plan.add_module(module_code, units, grade, module_type, year=year))
+
 def recommend_modules(main_major, k=3):
 
-    data = electives_ranking.copy()
+    data = load_bba_electives_ranking().copy()
 
     min_score = data['popularity_score'].min()
     max_score = data['popularity_score'].max()
@@ -939,6 +1160,7 @@ sample_data = load_excel_file_bytes('./data/sample_data.xlsx')
 
 if 'page' not in st.session_state:
     st.session_state.page = 'download'
+    resume_session()
 
 if st.session_state.page == 'download':
 
@@ -1018,13 +1240,19 @@ elif st.session_state.page == 'upload':
                           page_transition_textcolor="#ffffff",
                           page_transition_hovercolor="#fa4202")
 
-        # -- Upload Excel File:
+        # -- Upload Excel File (or CSV / Parquet / JSON-lines export with the same columns):
 
-        uploaded_file = st.file_uploader("", type=["xlsx"])
+        uploaded_file = st.file_uploader("", type=["xlsx", "csv", "parquet", "jsonl", "json"])
         if uploaded_file:
-            df = load_uploaded_data(uploaded_file)
+            df, content_hash = load_uploaded_data(uploaded_file)
             if df is not None:
                 st.session_state.uploaded_df = df
+                st.session_state.pop('user', None) # new upload: rebuild User (and its snapshot cache) on the dashboard
+                st.session_state.pop('persisted_misses', None)
+                st.session_state.upload_hash = content_hash
+                if 'session' not in st.query_params:
+                    st.query_params['session'] = secrets.token_urlsafe(16)
+                st.session_state.session_token = st.query_params['session']
                 if st.button("Continue to Dashboard"):
                     st.session_state.page = 'dashboard'
                     st.rerun()
@@ -1084,10 +1312,7 @@ elif st.session_state.page == 'dashboard':
         
         # -- Main Major Selection Widget:
 
-        specialisation_options = [track for track in selected_tracks if (
-            track.startswith('BBA-') and
-            track not in ["BBA-BE", "BBA-BF", "BBA-FSP"]
-        )]
+        specialisation_options = return_major_options(selected_tracks)
 
         main_major = st.selectbox("Select Your Main Major:", options=specialisation_options)
 
@@ -1100,29 +1325,24 @@ elif st.session_state.page == 'dashboard':
         
         # -- Additional Data Preprocessing:
 
-        df['GPA'] = df['Grade'].map(grade_point_mapper)
-        df['Term'] = (df['Year'].astype(str) + df['Semester'].astype(str)).astype(int)
-        df['Module_Type_UE'] = df['Module_Type'].apply(
-                                    lambda x : (
-                                        x if x in ['BBA-BE', 'BBA-BF', 'BBA-FSP', 'GE', 'UE', main_major] else
-                                        'UE' if x.startswith('MINOR-') else
-                                        'UE' if x.startswith('MAJOR-') else
-                                        'UE'
-                                    )
-                                )
+        transcript_diagnostics = []
+        prepare_transcript(df, main_major, diagnostics=transcript_diagnostics)
+        render_diagnostics(transcript_diagnostics)
 
         # -- Initialize User:
 
         if "user" not in st.session_state:
             st.session_state.user = User(raw_data=df)
         user = st.session_state.user
+        render_diagnostics(user.diagnostics)
 
          # -- Apply Filtering:
 
         user.main_major = main_major
         user.apply_filter(selected_tracks)
+        persist_session(user)
 
-        if user.filtered_data is None or user.filtered_data.empty:
+        if user.row_mask is None or not user.row_mask.any():
             st.markdown(
                 f"""
                 <div style="
@@ -1149,6 +1369,14 @@ elif st.session_state.page == 'dashboard':
             st.session_state.page = 'upload'
             st.rerun()
 
+        # -- Session Memory Report (for sizing servers, debug mode only: it walks the whole session state):
+
+        if is_debug_mode():
+            with st.expander("🧮 Session Memory", expanded=False):
+                memory_report = session_memory_report(st.session_state)
+                st.caption(f"This session holds {memory_report['Bytes'].sum() / 1024:,.1f} KB")
+                st.dataframe(memory_report, use_container_width=True, hide_index=True)
+
         # -- Style App:
 
         style_app_background(bgcolor=colors.app_bgcolor,
@@ -1234,7 +1462,7 @@ elif st.session_state.page == 'dashboard':
 
             # -- CGPA Line Chart, CGPA Bar Chart, Track Progress Multilayered Donut:
 
-            render_cgpa_trend_waterfallchart(df=user.filtered_data)
+            render_cgpa_trend_waterfallchart(timeline=user.snapshot.cgpa_timeline)
             
             render_space()
             
@@ -1253,11 +1481,31 @@ elif st.session_state.page == 'dashboard':
 
             top_modules, top_modules_df = recommend_modules(main_major=user.main_major)
             render_demand_vacancy_trends(elective_df=top_modules_df, 
-                                         demand_df=bba_electives_demand_vacancy_data,
+                                         demand_df=load_bba_electives_demand_vacancy_data(),
                                          top_modules=top_modules); render_space()
             
             render_table(track_status)
 
+    # -- What-If Planner:
+
+    render_space()
+    render_what_if_planner(user)
+
+    # -- Degree Classification Targets:
+
+    render_classification_reachability(user)
+
+    # -- Graduation Path:
+
+    render_graduation_path(user)
+
+    # -- Panel Build Timings (figure cache), Reference Data (registry) & Upload Cache, debug mode only:
+
+    if is_debug_mode():
+        render_panel_timings()
+        render_data_registry_report()
+        render_upload_cache_stats()
+
     #######################
     # Hide Streamlit Style
 
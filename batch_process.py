@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pandas as pd
+from utils import *
+from user import User
+
+'''
+    1) This script computes the dashboard metrics (UserProgressSnapshot) for a directory of student transcripts,
+       without Streamlit:
+        - Each file (xlsx, CSV, Parquet or JSON-lines) is parsed, validated and evaluated in a pool of worker processes;
+        - One summary row per student is streamed to a CSV or Parquet output file as results arrive;
+        - The main major defaults to the first BBA major found in each transcript (same default as the dashboard);
+    2) This script is not a module;
+    3) Run from the repository root: `python batch_process.py <input_dir> -o summary.csv [-w WORKERS]`.
+'''
+
+#######################
+# Output Schema
+
+SUMMARY_COLUMNS = ['Student', 'Status', 'Errors', 'Main_Major', 'Total_Units', 'CGPA', 'Completion_Rate',
+                   'Current_Year', 'SU_Remaining', 'Degree_Classification', 'Track_Status']
+
+SUMMARY_TYPES = {'Student': 'string', 'Status': 'string', 'Errors': 'string', 'Main_Major': 'string', 'Total_Units': 'int64',
+                 'CGPA': 'float64', 'Completion_Rate': 'float64', 'Current_Year': 'int64', 'SU_Remaining': 'int64',
+                 'Degree_Classification': 'string', 'Track_Status': 'string'}
+
+UPLOAD_SUFFIXES = {'.xlsx', '.csv', '.parquet', '.jsonl', '.json'}
+
+#######################
+# Worker Functions
+
+# -- Loads the reference data each worker needs once, before processing its first file:
+
+def init_worker():
+    load_requirements_index()
+    load_ge_pillar_index()
+    load_module_vocabulary()
+    load_degree_rules()
+
+# -- Returns summary row (dictionary) of one student's transcript:
+
+def process_transcript(file_path):
+    row = dict.fromkeys(SUMMARY_COLUMNS)
+    row['Student'] = Path(file_path).stem
+
+    try:
+        df, issues = parse_uploaded_data(Path(file_path).read_bytes())
+        if df is None:
+            row['Status'] = 'invalid'
+            row['Errors'] = ' | '.join(' '.join(issue.message.split()) for issue in issues if issue.level == 'error')
+            return row
+
+        tracks = list(df['Module_Type'].unique())
+        major_options = return_major_options(tracks)
+        main_major = major_options[0] if major_options else None
+
+        user = User(raw_data=prepare_transcript(df, main_major))
+        user.main_major = main_major
+        user.apply_filter(tracks)
+        snapshot = user.snapshot
+
+        row.update({
+            'Status': 'ok',
+            'Main_Major': main_major,
+            'Total_Units': int(snapshot.total_units),
+            'CGPA': float(snapshot.cgpa),
+            'Completion_Rate': float(snapshot.completion_rate),
+            'Current_Year': int(snapshot.current_year),
+            'SU_Remaining': int(snapshot.SU_used),
+            'Degree_Classification': degree_classifier(snapshot.cgpa),
+            'Track_Status': json.dumps({
+                track : float(result[0]) for track, result in sorted(snapshot.track_status.items()) if result is not None
+            })
+        })
+    except Exception as e:
+        row['Status'] = 'error'
+        row['Errors'] = f"{type(e).__name__}: {e}"
+    return row
+
+#######################
+# Output Writers (append batches of rows as they arrive)
+
+# -- Returns pyarrow schema of the summary rows (SUMMARY_TYPES):
+
+def summary_schema():
+    import pyarrow as pa
+    types = {'string': pa.string(), 'int64': pa.int64(), 'float64': pa.float64()}
+    return pa.schema([(column, types[SUMMARY_TYPES[column]]) for column in SUMMARY_COLUMNS])
+
+class SummaryWriter:
+
+    def __init__(self, output_path):
+        self.output_path = Path(output_path)
+        self.is_parquet = self.output_path.suffix == '.parquet'
+        self._parquet_writer = None
+        self._header_written = False
+
+    def write(self, rows):
+        if not rows:
+            return
+        batch = pd.DataFrame(rows, columns=SUMMARY_COLUMNS).astype({
+            'Total_Units': 'Int64', 'CGPA': 'float64', 'Completion_Rate': 'float64', 'Current_Year': 'Int64',
+            'SU_Remaining': 'Int64'
+        })
+        if self.is_parquet:
+            import pyarrow as pa
+            from pyarrow import parquet
+            # explicit schema: a batch whose Errors / Main_Major are all None would otherwise be inferred as the null type
+            if self._parquet_writer is None:
+                self._parquet_writer = parquet.ParquetWriter(self.output_path, summary_schema())
+            table = pa.Table.from_pandas(batch, schema=self._parquet_writer.schema, preserve_index=False)
+            self._parquet_writer.write_table(table)
+        else:
+            batch.to_csv(self.output_path, mode='a' if self._header_written else 'w', header=not self._header_written,
+                         index=False)
+            self._header_written = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+#######################
+# Batch Runner
+
+# -- Processes every transcript in input_dir, returns dictionary of run statistics:
+
+def run_batch(input_dir, output_path, workers=None, batch_size=256):
+    files = sorted(str(path) for path in Path(input_dir).iterdir() if path.suffix.lower() in UPLOAD_SUFFIXES)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(files) // (workers * 8))
+
+    writer = SummaryWriter(output_path)
+    status_counts = {}
+    pending = []
+    start = time.perf_counter()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            for row in executor.map(process_transcript, files, chunksize=chunksize):
+                status_counts[row['Status']] = status_counts.get(row['Status'], 0) + 1
+                pending.append(row)
+                if len(pending) >= batch_size:
+                    writer.write(pending)
+                    pending = []
+            writer.write(pending)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'students': len(files),
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'students_per_second': round(len(files) / elapsed, 1) if elapsed > 0 else 0.0,
+        'status': status_counts
+    }
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Compute dashboard metrics for a directory of student transcripts.")
+    parser.add_argument('input_dir', help="directory of transcripts (.xlsx, .csv, .parquet, .jsonl)")
+    parser.add_argument('-o', '--output', default='transcript_summary.csv', help="output file (.csv or .parquet)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="number of worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    if not Path(args.input_dir).is_dir():
+        sys.exit(f"Input directory not found: {args.input_dir}")
+
+    stats = run_batch(args.input_dir, args.output, workers=args.workers)
+    print(f"Processed {stats['students']} students with {stats['workers']} workers in {stats['seconds']}s "
+          f"({stats['students_per_second']} students/second) -> {args.output}")
+    print(f"Status: {stats['status']}")
@@ -0,0 +1,815 @@
+import multiprocessing as mp
+import importlib
+import io
+import resource
+import statistics
+import sys
+import time
+from functools import partial
+import pandas as pd
+
+'''
+    1) This script benchmarks performance-sensitive paths of the app;
+    2) This script is not a module;
+    3) Run `python benchmark.py` to run every benchmark, or `python benchmark.py <name> ...` to run selected ones.
+'''
+
+#######################
+# Helper Functions
+
+# -- Returns (median seconds, result) of calling func {repeat} times:
+
+def time_call(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+# -- Returns peak RSS of the current process in MB:
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+# -- Runs func in a fresh interpreter (after importing {setup_modules}) and returns (seconds, RSS increase in MB):
+
+def _isolated_worker(func, setup_modules, queue):
+    for module in setup_modules:
+        importlib.import_module(module)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    func()
+    queue.put((time.perf_counter() - start, peak_rss_mb() - baseline))
+
+def run_isolated(func, setup_modules=()):
+    ctx = mp.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_isolated_worker, args=(func, list(setup_modules), queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+#######################
+# Benchmark: Reference Data Artifacts (pickle / excel vs columnar feather)
+# -- Cold = first load in a fresh interpreter (includes importing the reader library), Warm = median of repeated loads
+
+def _load_legacy(file_name):
+    if file_name.endswith('.pkl'):
+        import pickle
+        with open(f'./data/{file_name}', 'rb') as f:
+            return pickle.load(f)
+    return pd.read_excel(f'./data/{file_name}')
+
+def _load_columnar(name, source):
+    from utils import open_data_artifact
+    return open_data_artifact(name, f'./data/{source}').to_pandas()
+
+def bench_artifacts():
+    from build_data_artifacts import ARTIFACT_SOURCES
+    from utils import open_data_artifact
+
+    rows = []
+    for name, (source, _) in ARTIFACT_SOURCES.items():
+        if open_data_artifact(name, f'./data/{source}') is None:
+            print(f"Skipped {name}: no up-to-date {name}.feather (run build_data_artifacts.py first)")
+            continue
+        legacy_s, legacy_mb = run_isolated(partial(_load_legacy, source), setup_modules=['pandas'])
+        columnar_s, columnar_mb = run_isolated(partial(_load_columnar, name, source), setup_modules=['pandas', 'utils'])
+        legacy_warm_s, _ = time_call(partial(_load_legacy, source))
+        columnar_warm_s, _ = time_call(partial(_load_columnar, name, source))
+        rows.append({
+            'Artifact': name,
+            'Legacy_Source': source,
+            'Legacy_Cold_ms': round(legacy_s * 1000, 2),
+            'Legacy_Warm_ms': round(legacy_warm_s * 1000, 2),
+            'Legacy_RSS_MB': round(legacy_mb, 2),
+            'Columnar_Cold_ms': round(columnar_s * 1000, 2),
+            'Columnar_Warm_ms': round(columnar_warm_s * 1000, 2),
+            'Columnar_RSS_MB': round(columnar_mb, 2)
+        })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: Upload Ingestion (pd.read_excel vs streaming read-only workbook)
+
+# -- Returns bytes of data/sample_data.xlsx (incl. instructions tab) with its data rows repeated up to {n_rows}:
+
+def scaled_sample_workbook(n_rows):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook('./data/sample_data.xlsx')
+    sheet = workbook['data']
+    sample_rows = [row for row in sheet.iter_rows(min_row=2, values_only=True) if any(value is not None for value in row)]
+    for i in range(n_rows - len(sample_rows)):
+        sheet.append(sample_rows[i % len(sample_rows)])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def _ingest_legacy(file_bytes):
+    from utils import EXPECTED_COLUMNS
+    return pd.read_excel(io.BytesIO(file_bytes), sheet_name='data')[EXPECTED_COLUMNS]
+
+def _ingest_streaming(file_bytes, max_rows):
+    from utils import read_workbook_data
+    return read_workbook_data(io.BytesIO(file_bytes), max_rows=max_rows)
+
+def bench_upload():
+    rows = []
+    for n_rows in [28, 1000, 5000, 20000]:
+        file_bytes = scaled_sample_workbook(n_rows)
+        legacy_s, _ = time_call(partial(_ingest_legacy, file_bytes), repeat=3)
+        streaming_s, _ = time_call(partial(_ingest_streaming, file_bytes, n_rows), repeat=3)
+        capped_s, _ = time_call(partial(_ingest_streaming, file_bytes, 1000), repeat=3)
+        rows.append({
+            'Rows': n_rows,
+            'File_KB': round(len(file_bytes) / 1024, 1),
+            'read_excel_ms': round(legacy_s * 1000, 2),
+            'Streaming_ms': round(streaming_s * 1000, 2),
+            'Speedup': round(legacy_s / streaming_s, 2),
+            'Rejected_at_1000_Row_Cap_ms': round(capped_s * 1000, 2) if n_rows > 1000 else None
+        })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: Import Time of the Core Library (utils.py + user.py) vs Streamlit
+# -- Measured in fresh interpreters that have already imported pandas (shared by both)
+
+def _import_modules(modules):
+    for module in modules:
+        importlib.import_module(module)
+
+def bench_imports():
+    rows = []
+    for label, modules in [('core (utils, user)', ['utils', 'user']),
+                           ('streamlit', ['streamlit']),
+                           ('core + streamlit (previous core import)', ['streamlit', 'utils', 'user'])]:
+        timings = [run_isolated(partial(_import_modules, modules))[0] for _ in range(3)]
+        rows.append({'Import': label, 'Import_ms': round(statistics.median(timings) * 1000, 1)})
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: Grade-Point Mapping, Half-Up Rounding & CGPA (scalar vs vectorized / exact)
+
+# -- Returns a synthetic transcript Dataframe of {n_rows} modules (Grade, Units, Year, Semester, Module_Type):
+
+def synthetic_transcript(n_rows, seed=0):
+    import numpy as np
+    from utils import GRADES
+
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Module_Code': [f"MOD{i:05d}" for i in range(n_rows)],
+        'Grade': rng.choice(GRADES, size=n_rows),
+        'Units': rng.choice([2, 4, 4, 4, 8], size=n_rows),
+        'Year': rng.integers(1, 5, size=n_rows),
+        'Semester': rng.integers(1, 3, size=n_rows),
+        'Module_Type': rng.choice(['BBA-BE', 'BBA-BF', 'BBA-FIN', 'GE', 'UE'], size=n_rows)
+    })
+
+def _legacy_cgpa(grade_points, units):
+    import numpy as np
+    from utils import round_half_up
+    return round_half_up(np.sum(grade_points * units) / sum(units))
+
+def bench_cgpa():
+    import numpy as np
+    from utils import grade_point_mapper, map_grade_points, round_half_up, round_half_up_array, compute_exact_cgpa
+
+    rows = []
+    for n_rows in [1000, 10000, 100000]:
+        df = synthetic_transcript(n_rows)
+        graded = df[~df['Grade'].isin(['S', 'IP', 'NG'])]
+
+        map_legacy_s, legacy_points = time_call(lambda: df['Grade'].map(grade_point_mapper), repeat=3)
+        map_vector_s, vector_points = time_call(lambda: map_grade_points(df['Grade']), repeat=3)
+
+        # Running CGPA after every module: exercises many different half-point totals
+        gp, units = map_grade_points(graded['Grade']).to_numpy(), graded['Units'].to_numpy()
+        cum_gp, cum_units = np.cumsum(gp * units), np.cumsum(units)
+        raw_cgpas = pd.Series(cum_gp / cum_units)
+        round_legacy_s, legacy_rounded = time_call(lambda: raw_cgpas.apply(round_half_up), repeat=3)
+        round_vector_s, vector_rounded = time_call(lambda: round_half_up_array(raw_cgpas), repeat=3)
+
+        prefixes = np.linspace(1, len(graded), num=min(len(graded), 500), dtype=int)
+        cgpa_mismatches = sum(
+            _legacy_cgpa(gp[:k], units[:k]) != compute_exact_cgpa(gp[:k], units[:k]) for k in prefixes
+        )
+        cgpa_legacy_s, _ = time_call(lambda: _legacy_cgpa(gp, units), repeat=3)
+        cgpa_exact_s, _ = time_call(lambda: compute_exact_cgpa(gp, units), repeat=3)
+
+        rows.append({
+            'Rows': n_rows,
+            'Map_Legacy_ms': round(map_legacy_s * 1000, 2),
+            'Map_Vector_ms': round(map_vector_s * 1000, 2),
+            'Round_Legacy_ms': round(round_legacy_s * 1000, 2),
+            'Round_Vector_ms': round(round_vector_s * 1000, 2),
+            'CGPA_Legacy_ms': round(cgpa_legacy_s * 1000, 3),
+            'CGPA_Exact_ms': round(cgpa_exact_s * 1000, 3),
+            'Map_Mismatches': int((legacy_points.astype(float) != vector_points).sum()),
+            'Round_Mismatches': int((legacy_rounded.to_numpy() != vector_rounded).sum()),
+            'CGPA_Mismatches': int(cgpa_mismatches)
+        })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: Snapshot Generation (per-metric filtering & drop_duplicates vs single-pass aggregation kernel)
+
+# -- Returns a prepared transcript of {n_rows} modules drawn from the real BBA requirements, GE pillars, UEs
+#    & a second major/minor, with ~5% of modules double-counted under a second track:
+
+def synthetic_user_transcript(n_rows, seed=0, main_major='BBA-FIN'):
+    import numpy as np
+    from utils import GRADES, load_requirements_index, load_ge_requirements, prepare_transcript
+
+    rng = np.random.default_rng(seed)
+    pool = [
+        (code, track) for track, requirements in load_requirements_index().tracks.items()
+        for code in sorted(requirements.required_courses | requirements.electives_3000 | requirements.electives_4000)
+    ]
+    pool += [(code, 'GE') for code in load_ge_requirements()['Module_Code']]
+    pool += [(f"UE{i:04d}", 'UE') for i in range(60)]
+    pool += [(f"CS{i:04d}", 'MAJOR-CS') for i in range(20)] + [(f"MKT{i:04d}", 'MINOR-MKT') for i in range(10)]
+
+    picks = rng.integers(0, len(pool), size=n_rows)
+    df = pd.DataFrame({
+        'Module_Code': [pool[i][0] for i in picks],
+        'Module_Title': [f"Title of {pool[i][0]}" for i in picks],
+        'Year': rng.integers(1, 5, size=n_rows),
+        'Semester': rng.integers(1, 3, size=n_rows),
+        'Units': rng.choice([2, 4, 4, 4, 8], size=n_rows),
+        'Module_Type': [pool[i][1] for i in picks],
+        'Grade': rng.choice(GRADES, size=n_rows, p=[0.05] + [0.08] * 10 + [0.08, 0.04, 0.03])
+    })
+    double_counted = df.sample(frac=0.05, random_state=seed).assign(Module_Type='MINOR-MKT')
+    df = pd.concat([df, double_counted], ignore_index=True)
+    return prepare_transcript(df, main_major)
+
+def _legacy_SUs(data):
+    current_year = max(data['Year'].astype(int))
+    if current_year <= 1:
+        return 32 - sum(data[data['Grade']=='S']['Units'])
+    remaining_SUs = 32 - sum(data[(data['Year'] <= 1) & (data['Grade']=='S')]['Units'])
+    return min(12, remaining_SUs) - sum(data[(data['Year'] >= 2) & (data['Grade']=='S')]['Units'])
+
+def _legacy_progress(user, data):
+    status = {track : None for track in list(user.all_tracks.union(set(data['Module_Type_UE'].unique())))}
+    status.update(dict.fromkeys(['BBA-FSP', 'BBA-BE', 'BBA-BF', 'GE', 'UE']))
+    for track in list(status):
+        status[track] = user.compute_track_progress(data, track)
+    return status
+
+def _legacy_snapshot(user):
+    data = user.filtered_data.copy()
+    return (user.compute_total_MCs(data), user.compute_cgpa(data), user.compute_completion_rate(data),
+            user.compute_current_year(data), _legacy_SUs(data), _legacy_progress(user, data))
+
+def _kernel_snapshot(user):
+    snapshot = user._generate_snapshot()
+    return (snapshot.total_units, snapshot.cgpa, snapshot.completion_rate,
+            snapshot.current_year, snapshot.SU_used, snapshot.track_status)
+
+def _comparable(snapshot):
+    *fields, track_status = snapshot
+    return fields, {
+        track : (status[0], sorted(map(str, status[1])), status[2]) if status else status
+        for track, status in track_status.items()
+    }
+
+def bench_snapshot():
+    from user import User
+
+    rows = []
+    for n_rows in [50, 500, 5000]:
+        user = User(raw_data=synthetic_user_transcript(n_rows))
+        user.main_major = 'BBA-FIN'
+
+        legacy_s, legacy = time_call(partial(_legacy_snapshot, user), repeat=7)
+        kernel_s, kernel = time_call(partial(_kernel_snapshot, user), repeat=7)
+        rows.append({
+            'Rows': len(user.raw_data),
+            'Legacy_ms': round(legacy_s * 1000, 2),
+            'Kernel_ms': round(kernel_s * 1000, 2),
+            'Speedup': round(legacy_s / kernel_s, 2),
+            'Identical': _comparable(legacy) == _comparable(kernel)
+        })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: Degree Rules (every track of a student evaluated on bitsets)
+
+def _evaluate_all_tracks(rules, students):
+    return [[rules.evaluate(track, taken_bits, taken_units) for track, taken_bits, taken_units in tracks] for tracks in students]
+
+def bench_rules():
+    from user import aggregate_transcript
+    from utils import load_degree_rules
+
+    rules = load_degree_rules()
+    rows = []
+    for n_students in [100, 1000]:
+        students = []
+        for seed in range(n_students):
+            aggregate = aggregate_transcript(synthetic_user_transcript(40, seed=seed))
+            tracks = [
+                (track, bits, aggregate.track_units[track]) for track, bits in aggregate.track_bits.items() if track != 'UE'
+            ]
+            tracks += [(track, 0, 0) for track in rules.tracks if track not in aggregate.track_bits]
+            students.append(tracks + [('UE', 0, aggregate.ue_units)])
+
+        evaluate_s, _ = time_call(partial(_evaluate_all_tracks, rules, students), repeat=5)
+        rows.append({
+            'Students': n_students,
+            'Tracks_per_Student': round(sum(map(len, students)) / n_students, 1),
+            'Total_ms': round(evaluate_s * 1000, 2),
+            'Per_Student_us': round(evaluate_s / n_students * 1e6, 1)
+        })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: Module Vocabulary (per-student Python sets of codes vs one boolean matrix over interned ids)
+
+def _cohort_transcripts(n_students):
+    return pd.concat([synthetic_user_transcript(40, seed=seed).assign(Student=seed) for seed in range(n_students)],
+                     ignore_index=True)
+
+def _required_done_sets(cohort, required):
+    return [len(set(codes.str.upper()) & required) for _, codes in cohort.groupby('Student', sort=False)['Module_Code']]
+
+def _required_done_matrix(vocabulary, cohort, required_mask):
+    _, matrix = vocabulary.encode_matrix(cohort['Student'].to_numpy(), cohort['Module_Code'])
+    return (matrix & required_mask).sum(axis=1)
+
+def bench_vocabulary():
+    from utils import load_module_vocabulary, load_requirements_index
+
+    vocabulary = load_module_vocabulary()
+    index = load_requirements_index()
+    required = set(index.track('BBA-FIN').required_courses | index.track('BBA-BF').required_courses)
+    required_mask = vocabulary.mask_of(sorted(required))
+
+    rows = []
+    for n_students in [100, 1000, 5000]:
+        cohort = _cohort_transcripts(n_students)
+        sets_s, sets_result = time_call(partial(_required_done_sets, cohort, required), repeat=3)
+        matrix_s, matrix_result = time_call(partial(_required_done_matrix, vocabulary, cohort, required_mask), repeat=3)
+        rows.append({
+            'Students': n_students,
+            'Modules': len(cohort),
+            'Sets_ms': round(sets_s * 1000, 2),
+            'Matrix_ms': round(matrix_s * 1000, 2),
+            'Speedup': round(sets_s / matrix_s, 1),
+            'Matrix_KB': round(n_students * len(vocabulary) / 1024, 1),
+            'Identical': list(sets_result) == list(matrix_result)
+        })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: What-If Planner (rebuilding a User per hypothetical vs O(1) deltas on a WhatIfPlan)
+
+HYPOTHETICAL_ROW = {'Module_Code': 'FIN4711', 'Module_Title': 'Hypothetical', 'Year': 4, 'Semester': 2,
+                    'Units': 4, 'Module_Type': 'BBA-FIN', 'Grade': 'A-'}
+
+def _what_if_rebuild(raw_data):
+    from user import User
+    from utils import prepare_transcript
+
+    df = pd.concat([raw_data, pd.DataFrame([HYPOTHETICAL_ROW])], ignore_index=True)
+    user = User(raw_data=prepare_transcript(df, 'BBA-FIN'))
+    user.main_major = 'BBA-FIN'
+    user.apply_filter(list(user.all_tracks))
+    return user.snapshot.cgpa
+
+def _what_if_delta(plan):
+    plan_id = plan.add_module(HYPOTHETICAL_ROW['Module_Code'], HYPOTHETICAL_ROW['Units'], HYPOTHETICAL_ROW['Grade'],
+                              HYPOTHETICAL_ROW['Module_Type'], year=HYPOTHETICAL_ROW['Year'])
+    cgpa = plan.projection().cgpa
+    plan.remove_module(plan_id)
+    return cgpa
+
+def bench_what_if():
+    from user import User
+
+    rows = []
+    for n_rows in [50, 500, 5000]:
+        prepared = synthetic_user_transcript(n_rows)
+        raw_data = prepared[list(HYPOTHETICAL_ROW)]
+        user = User(raw_data=prepared)
+        user.main_major = 'BBA-FIN'
+        user.apply_filter(list(user.all_tracks))
+        plan = user.start_what_if()
+
+        rebuild_s, rebuild_cgpa = time_call(partial(_what_if_rebuild, raw_data), repeat=5)
+        delta_s, delta_cgpa = time_call(partial(_what_if_delta, plan), repeat=50)
+        rows.append({
+            'Rows': len(prepared),
+            'Rebuild_User_ms': round(rebuild_s * 1000, 2),
+            'Delta_and_Projection_ms': round(delta_s * 1000, 3),
+            'Speedup': round(rebuild_s / delta_s, 1),
+            'Identical': rebuild_cgpa == delta_cgpa
+        })
+    return pd.DataFrame(rows)
+
+# -- Degree classification reachability: cold (empty DP memo) vs warm solve for growing numbers of remaining modules:
+
+def _cold_reachability(weighted_half_points, graded_units, remaining_units):
+    from user import _grade_mix_tables, classification_reachability
+    _grade_mix_tables.cache_clear()
+    return classification_reachability(weighted_half_points, graded_units, remaining_units)
+
+# -- Returns targets of classification_reachability that disagree with brute force (every grade of every remaining module
+#    enumerated) over small random cases, incl. a student without graded units taken or left (e.g all S/U or IP):
+
+def _reachability_mismatches(trials=200, seed=0):
+    import itertools
+    import numpy as np
+    from utils import cgpa_from_totals
+    from user import HALF_POINT_STEPS, GRADE_OF_HALF_POINTS, classification_reachability
+
+    rng = np.random.default_rng(seed)
+    cases = [(0, 0, []), (0, 0, [0, 0])]
+    for _ in range(trials):
+        graded_units = int(rng.choice([0, 4, 20, 120]))
+        remaining_units = [int(u) for u in rng.choice([2, 4, 6], size=rng.integers(0, 4))]
+        cases.append((int(rng.integers(0, 10 * graded_units + 1)), graded_units, remaining_units))
+
+    half_points_of = {grade : half_points for half_points, grade in GRADE_OF_HALF_POINTS.items()}
+    mismatches = []
+    for weighted_half_points, graded_units, remaining_units in cases:
+        units = [u for u in remaining_units if u > 0]
+        total_units = graded_units + sum(units)
+        mixes = list(itertools.product(HALF_POINT_STEPS, repeat=len(units)))
+        cgpas = [cgpa_from_totals(weighted_half_points + sum(g * u for g, u in zip(mix, units)), total_units)
+                 if total_units else 0 for mix in mixes]
+
+        for target in classification_reachability(weighted_half_points, graded_units, remaining_units):
+            feasible = [mix for mix, cgpa in zip(mixes, cgpas) if cgpa >= target.min_cgpa]
+            expected = (bool(feasible), len(feasible) == len(mixes),
+                        min(((max(mix, default=0), mix.count(max(mix, default=0))) for mix in feasible), default=None))
+            grades = [half_points_of[grade] for grade, count in target.grade_mix.items() for _ in range(count)]
+            found = (target.reachable, target.guaranteed,
+                     (max(grades, default=0), grades.count(max(grades, default=0))) if target.reachable else None)
+            if found != expected or (target.reachable and total_units and target.projected_cgpa < target.min_cgpa):
+                mismatches.append((weighted_half_points, graded_units, remaining_units, target))
+    return mismatches
+
+def bench_reachability():
+    from user import classification_reachability
+
+    mismatches = _reachability_mismatches()
+    if mismatches:
+        raise AssertionError(f"{len(mismatches)} targets disagree with brute force, e.g {mismatches[0]}")
+
+    rows = []
+    for n_modules in [10, 20, 30, 40]:
+        graded_units = 160 - 4 * n_modules
+        weighted_half_points = 7 * graded_units                # CGPA 3.5 so far
+        remaining_units = [4] * n_modules
+
+        cold_s, targets = time_call(partial(_cold_reachability, weighted_half_points, graded_units, remaining_units), repeat=5)
+        warm_s, _ = time_call(partial(classification_reachability, weighted_half_points, graded_units, remaining_units),
+                              repeat=20)
+        rows.append({
+            'Remaining_Modules': n_modules,
+            'Cold_ms': round(cold_s * 1000, 2),
+            'Warm_ms': round(warm_s * 1000, 3),
+            'Reachable_Classes': sum(target.reachable for target in targets)
+        })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: Multi-track Module Assignment (max-flow vs crediting modules to their typed Module_Type only)
+#   - Typed crediting has no double-counting limit: large synthetic transcripts type the same module under many tracks;
+#   - Fails if the assignment credits any track less than typed crediting does.
+
+def bench_assignment():
+    import numpy as np
+    from utils import load_degree_rules, assign_track_modules
+    from user import aggregate_transcript
+
+    rules = load_degree_rules()
+    vocabulary = rules.vocabulary
+    rows = []
+    for n_rows in [20, 50, 200, 5000]:
+        aggregate = aggregate_transcript(synthetic_user_transcript(n_rows, seed=n_rows))
+        tracks = sorted(track for track in aggregate.track_bits if track.startswith('BBA-'))
+
+        seconds, credited_bits = time_call(partial(assign_track_modules, rules, tracks, aggregate.track_bits), repeat=20)
+        typed = [rules.evaluate(track, aggregate.track_bits[track])[0] for track in tracks]
+        assigned = [rules.evaluate(track, credited_bits[track])[0] for track in tracks]
+        typed_counts = np.bincount(np.concatenate([
+            np.flatnonzero(vocabulary.mask_from_bits(aggregate.track_bits[track])) for track in tracks
+        ]))
+        rows.append({
+            'Rows': n_rows,
+            'BBA_Tracks': len(tracks),
+            'Typed_Double_Counted': int((typed_counts > 1).sum()),
+            'Assignment_ms': round(seconds * 1000, 3),
+            'Typed_Completion': round(sum(typed), 2),
+            'Assigned_Completion': round(sum(assigned), 2),
+            'Tracks_Improved': sum(a > t for a, t in zip(assigned, typed)),
+            'Tracks_Regressed': sum(a < t for a, t in zip(assigned, typed))
+        })
+
+    results = pd.DataFrame(rows)
+    if results['Tracks_Regressed'].any():
+        raise AssertionError(f"assign_track_modules credits tracks less than typed crediting:\n{results.to_string(index=False)}")
+    return results
+
+#######################
+# Benchmark: Graduation Path Scheduler (must return within 200 ms)
+#   - Fails if a plan schedules a module the track table already credits (see User.plan_graduation_path).
+
+GRADUATION_PATH_TRACKS = {
+    'Single major': ['BBA-BE', 'BBA-BF', 'BBA-FSP', 'BBA-FIN'],
+    'Double major': ['BBA-BE', 'BBA-BF', 'BBA-FSP', 'BBA-FIN', 'BBA-MKT'],
+    'Double major (ACC)': ['BBA-BE', 'BBA-BF', 'BBA-FSP', 'BBA-ACC', 'BBA-BZA']
+}
+
+# -- FIN & MKT double major with the courses both majors require typed under FIN only, and a MKT elective typed UE:
+
+def shared_course_transcript():
+    from utils import prepare_transcript
+
+    modules = [('FIN3701', 'BBA-FIN'), ('MNO2705', 'BBA-FIN'), ('BSP4701', 'BBA-FIN'), ('MKT3701', 'BBA-MKT'),
+               ('MKT3702', 'BBA-MKT'), ('MKT3711', 'UE')]
+    df = pd.DataFrame({
+        'Module_Code': [code for code, _ in modules],
+        'Module_Title': [f"Title of {code}" for code, _ in modules],
+        'Year': 2, 'Semester': 1, 'Units': 4,
+        'Module_Type': [track for _, track in modules],
+        'Grade': 'A'
+    })
+    return prepare_transcript(df, 'BBA-FIN')
+
+# -- Returns module codes of a plan of user that the track table already credits:
+
+def _rescheduled_modules(user, plan):
+    from utils import load_degree_rules
+
+    credited_bits = 0
+    for bits in user.snapshot.credited_bits.values():
+        credited_bits |= bits
+    credited_codes = set(load_degree_rules().vocabulary.codes_of(credited_bits))
+    return sorted({module.label for semester in plan.semesters for module in semester if module.label in credited_codes})
+
+def bench_graduation_path():
+    from user import User, remaining_requirements, other_module_placeholders, schedule_graduation_path
+
+    rows = []
+    for name, tracks in GRADUATION_PATH_TRACKS.items():
+        modules = remaining_requirements(tracks, {})
+        modules += other_module_placeholders(160 - sum(module.units for module in modules))
+        for max_units in [23, 20, 16, 12]:
+            seconds, plan = time_call(partial(schedule_graduation_path, modules, max_units), repeat=3)
+            rows.append({'Student': f"Freshman, {name}", 'Modules_Left': len(modules), 'Max_MCs': max_units,
+                         'ms': round(seconds * 1000, 1), 'Semesters': len(plan.terms), 'Lower_Bound': plan.lower_bound,
+                         'Optimal': plan.is_optimal, 'Rescheduled': ''})
+
+    transcripts = {f"{n_rows}-row transcript": synthetic_user_transcript(n_rows, seed=n_rows) for n_rows in [10, 20, 30]}
+    transcripts['FIN & MKT, shared courses typed FIN'] = shared_course_transcript()
+    for name, transcript in transcripts.items():
+        user = User(raw_data=transcript)
+        user.main_major = 'BBA-FIN'
+        user.apply_filter(list(user.all_tracks))
+        for max_units in [20, 16]:
+            # the search itself: user.plan_graduation_path memoizes the plan per snapshot after its first call
+            seconds, plan = time_call(partial(user._plan_graduation_path, max_units, None, True, 0.15), repeat=3)
+            rows.append({'Student': name, 'Modules_Left': sum(map(len, plan.semesters)), 'Max_MCs': max_units,
+                         'ms': round(seconds * 1000, 1), 'Semesters': len(plan.terms), 'Lower_Bound': plan.lower_bound,
+                         'Optimal': plan.is_optimal, 'Rescheduled': ', '.join(_rescheduled_modules(user, plan))})
+
+    results = pd.DataFrame(rows)
+    results['Under_200ms'] = results['ms'] < 200
+    if (results['Rescheduled'] != '').any():
+        raise AssertionError(f"plans schedule modules the track table already credits:\n{results.to_string(index=False)}")
+    return results
+
+#######################
+# Benchmark: Session Memory Load Test (many dashboard sessions, each switching between track filters)
+#   - 'Frame copies' keeps what snapshots used to hold: a filtered Dataframe per cached filter plus a copy inside each snapshot;
+#   - 'Row masks' is the current User: one shared frame, a boolean row mask per cached filter & compact snapshots.
+
+def _dashboard_session(n_rows, seed, frame_copies):
+    from user import User
+
+    user = User(raw_data=synthetic_user_transcript(n_rows, seed=seed))
+    user.main_major = 'BBA-FIN'
+    tracks = sorted(user.all_tracks)
+    session = {'uploaded_df': user.raw_data, 'user': user, 'page': 'dashboard'}
+    copies = []
+    for i in range(len(tracks)):
+        user.apply_filter(tracks[i:])
+        if frame_copies:
+            filtered = user.raw_data[user.row_mask]
+            copies.append((filtered, filtered.copy()))
+    user.apply_filter(tracks)
+    session['what_if_plan'] = user.start_what_if()
+    if frame_copies:
+        session['filtered_copies'] = copies
+    return session
+
+def _session_load_worker(n_sessions, n_rows, frame_copies, queue):
+    from utils import session_memory_report
+
+    _dashboard_session(n_rows, 0, frame_copies)                         # warm up: reference data & imports
+    baseline = peak_rss_mb()
+    sessions = [_dashboard_session(n_rows, seed, frame_copies) for seed in range(n_sessions)]
+    report_bytes = statistics.median(session_memory_report(session)['Bytes'].sum() for session in sessions)
+    queue.put(((peak_rss_mb() - baseline) / n_sessions, report_bytes))
+
+def bench_sessions():
+    ctx = mp.get_context('spawn')
+    rows = []
+    for n_rows in [50, 500]:
+        for frame_copies in [True, False]:
+            queue = ctx.Queue()
+            process = ctx.Process(target=_session_load_worker, args=(100, n_rows, frame_copies, queue))
+            process.start()
+            rss_mb, report_bytes = queue.get()
+            process.join()
+            rows.append({
+                'Rows': n_rows,
+                'Storage': 'Frame copies' if frame_copies else 'Row masks',
+                'Peak_RSS_KB_per_Session': round(rss_mb * 1024, 1),
+                'Report_KB_per_Session': round(report_bytes / 1024, 1)
+            })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: Returning Student (re-upload & recompute vs resume from the SQLite snapshot store)
+
+def _reupload_session(file_bytes):
+    from utils import parse_uploaded_data, prepare_transcript, return_major_options
+    from user import User
+
+    df, _ = parse_uploaded_data(file_bytes)
+    tracks = list(df['Module_Type'].unique())
+    main_major = return_major_options(tracks)[0]
+    user = User(raw_data=prepare_transcript(df, main_major))
+    user.main_major = main_major
+    user.apply_filter(tracks)
+    return user
+
+def _resumed_session(store, session_token):
+    from user import User
+
+    _, df, state = store.get(session_token)
+    user = User.from_state(df, state)
+    user.apply_filter(list(df['Module_Type'].unique()))
+    return user
+
+def bench_resume():
+    import tempfile
+    from pathlib import Path
+    from utils import EXPECTED_COLUMNS, SnapshotStore, hash_upload
+
+    uploads = {
+        'sample_data.xlsx': Path('./data/sample_data.xlsx').read_bytes(),
+        '50-row CSV': synthetic_user_transcript(50)[EXPECTED_COLUMNS].to_csv(index=False).encode()
+    }
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        store = SnapshotStore(Path(directory) / 'snapshots.sqlite3')
+        for name, file_bytes in uploads.items():
+            user = _reupload_session(file_bytes)
+            stored_bytes = store.stats()['bytes']
+            store.put(hash_upload(file_bytes), name, user.raw_data, user.export_state())
+            stored_bytes = store.stats()['bytes'] - stored_bytes
+
+            reupload_s, _ = time_call(partial(_reupload_session, file_bytes), repeat=5)
+            resume_s, resumed = time_call(partial(_resumed_session, store, name), repeat=20)
+            rows.append({
+                'Upload': name,
+                'Reupload_ms': round(reupload_s * 1000, 2),
+                'Resume_ms': round(resume_s * 1000, 2),
+                'Speedup': round(reupload_s / resume_s, 1),
+                'Stored_KB': round(stored_bytes / 1024, 1),
+                'Identical': resumed.snapshot == user.snapshot
+            })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark: Cohort Analytics Engine (looping User objects vs one grouped pass over a long-format cohort table)
+#   - Looping User objects is timed on a sample of the cohort and scaled to the full cohort.
+
+# -- Returns a synthetic long-format cohort table (upload schema + Student) of {n_students} transcripts: modules of each
+#    student's main major (and second major for a quarter of them), the core, GE, UE & a minor
+#    (some typed under the minor twice):
+
+def synthetic_cohort(n_students, rows_per_student=40, seed=0):
+    import numpy as np
+    from utils import GRADES, load_requirements_index, load_ge_requirements
+
+    rng = np.random.default_rng(seed)
+    index = load_requirements_index()
+    pools = {
+        track : [
+            (code, track)
+            for code in sorted(requirements.required_courses | requirements.electives_3000 | requirements.electives_4000)
+        ]
+        for track, requirements in index.tracks.items()
+    }
+    pools['GE'] = [(code, 'GE') for code in load_ge_requirements()['Module_Code']]
+    pools['UE'] = [(f"UE{i:04d}", 'UE') for i in range(60)]
+    pools['MINOR-MKT'] = [(f"MKT{i:04d}", 'MINOR-MKT') for i in range(10)]
+    names = list(pools)
+    majors = [names.index(track) for track in names if track.startswith('BBA-') and not index.track(track).is_core]
+    cores = [names.index(track) for track in names if track.startswith('BBA-') and index.track(track).is_core]
+    pool = [module for track in names for module in pools[track]]
+    sizes = np.array([len(pools[track]) for track in names])
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    n_rows = n_students * rows_per_student
+    students = np.repeat(np.arange(n_students), rows_per_student)
+    main_majors = rng.choice(majors, size=n_students)
+    second_majors = np.where(rng.random(n_students) < 0.25, rng.choice(majors, size=n_students), main_majors)
+    source = rng.choice(6, size=n_rows, p=[0.35, 0.1, 0.2, 0.15, 0.15, 0.05])   # main major, second major, core, GE, UE, minor
+    groups = np.select(
+        [source == 0, source == 1, source == 2, source == 3, source == 4],
+        [main_majors[students], second_majors[students], rng.choice(cores, size=n_rows), names.index('GE'), names.index('UE')],
+        names.index('MINOR-MKT')
+    )
+    picks = starts[groups] + (rng.random(n_rows) * sizes[groups]).astype(int)
+
+    df = pd.DataFrame({
+        'Student': [f"S{student:06d}" for student in students],
+        'Module_Code': [pool[i][0] for i in picks],
+        'Module_Title': [f"Title of {pool[i][0]}" for i in picks],
+        'Year': rng.integers(1, 5, size=n_rows),
+        'Semester': rng.integers(1, 3, size=n_rows),
+        'Units': rng.choice([2, 4, 4, 4, 8], size=n_rows),
+        'Module_Type': [pool[i][1] for i in picks],
+        'Grade': rng.choice(GRADES, size=n_rows, p=[0.05] + [0.08] * 10 + [0.08, 0.04, 0.03])
+    })
+    double_counted = df.sample(frac=0.03, random_state=seed).assign(Module_Type='MINOR-MKT')
+    return pd.concat([df, double_counted]).sort_index(kind='stable').reset_index(drop=True)
+
+def _loop_users(cohort):
+    from utils import prepare_transcript, return_major_options
+    from user import User
+
+    snapshots = {}
+    for student, df in cohort.groupby('Student', sort=False):
+        df = df.drop(columns='Student').reset_index(drop=True)
+        tracks = list(df['Module_Type'].unique())
+        major_options = return_major_options(tracks)
+        user = User(raw_data=prepare_transcript(df, major_options[0] if major_options else None))
+        user.main_major = major_options[0] if major_options else None
+        user.apply_filter(tracks)
+        snapshots[student] = user.snapshot
+    return snapshots
+
+def bench_cohort():
+    from user import aggregate_cohort
+
+    rows = []
+    for n_students in [1000, 10000]:
+        cohort = synthetic_cohort(n_students, seed=n_students)
+        sample = cohort[cohort['Student'].isin(cohort['Student'].unique()[:200])]
+
+        loop_s, snapshots = time_call(partial(_loop_users, sample), repeat=1)
+        engine_s, result = time_call(partial(aggregate_cohort, cohort), repeat=3)
+        loop_s *= n_students / len(snapshots)
+        rows.append({
+            'Students': n_students,
+            'Modules': len(cohort),
+            'Loop_Users_s': round(loop_s, 2),
+            'Engine_s': round(engine_s, 3),
+            'Speedup': round(loop_s / engine_s, 1),
+            'Assigned_Students': int(result.students['Assigned'].sum()),
+            'Identical': all(result.snapshot(student) == snapshot for student, snapshot in snapshots.items())
+        })
+    return pd.DataFrame(rows)
+
+#######################
+# Benchmark Registry { name : function returning a Dataframe of results }
+
+BENCHMARKS = {
+    'artifacts': bench_artifacts,
+    'upload': bench_upload,
+    'imports': bench_imports,
+    'cgpa': bench_cgpa,
+    'snapshot': bench_snapshot,
+    'rules': bench_rules,
+    'vocabulary': bench_vocabulary,
+    'what_if': bench_what_if,
+    'reachability': bench_reachability,
+    'assignment': bench_assignment,
+    'graduation_path': bench_graduation_path,
+    'sessions': bench_sessions,
+    'resume': bench_resume,
+    'cohort': bench_cohort
+}
+
+if __name__ == "__main__":
+
+    selected = sys.argv[1:] or list(BENCHMARKS)
+
+    for name in selected:
+        print(f"\n=== {name} ===")
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(BENCHMARKS[name]().to_string(index=False))
@@ -0,0 +1,130 @@
+import argparse
+import pandas as pd
+import pickle
+import os
+import pyarrow as pa
+from pyarrow import feather
+from utils import ARTIFACT_SOURCE_HASH_KEY, hash_data_file
+
+'''
+    1) This script converts the reference data in ./data (pickles & excel files) into typed, columnar Feather (Arrow IPC) files:
+        - Module codes, module types, pillars & academic terms are stored as categoricals;
+        - Integer columns are downcast to the smallest integer dtype that fits;
+        - Files are written uncompressed so that they can be memory-mapped & column-projected on load;
+    2) utils.py reads these files first and falls back to the original pickles & excel files if they are missing or stale:
+        - Each file stores the sha256 of its source file in its schema metadata (utils.ARTIFACT_SOURCE_HASH_KEY);
+        - A file built from another version of its source (e.g before popularity_ranker.py was re-run) is ignored;
+    3) It also builds cohort_percentiles.feather, the sorted CGPAs per track of a reference cohort (see utils.CohortPercentiles):
+        - The cohort is a long-format transcript file (CSV or Parquet) with a Student column, passed with --cohort;
+        - Without --cohort, no cohort_percentiles.feather is written and the dashboard shows no cohort percentiles;
+        - Only CGPAs are stored, and tracks with fewer than MIN_COHORT_SIZE students are left out;
+    4) This script is not a module;
+    5) Re-run this script whenever popularity_ranker.py, course_description_from_API.py or the excel files are updated
+       (until then, the app reads the updated source files, which is slower but never serves old data).
+'''
+
+#######################
+# Artifact Specifications { artifact name : (source file, categorical columns) }
+
+ARTIFACT_SOURCES = {
+    'bba_electives_description' : ('bba_electives_description.pkl', ['Module_Code', 'Module_Type']),
+    'bba_electives_ranking' : ('bba_electives_ranking.pkl', ['Module_Code', 'Module_Type']),
+    'bba_electives_demand_vacancy_data' : ('bba_electives_demand_vacancy_data.pkl',
+                                           ['Module_Code', 'Academic_Term', 'Module_Type']),
+    'bba_electives_info' : ('bba_electives_info.xlsx', ['Module_Code', 'Module_Type']),
+    'ge_requirements' : ('nus_ge_requirements.xlsx', ['Module_Code', 'Pillar'])
+}
+
+# -- Reads a source file (pickle or excel) into a Dataframe:
+
+def read_source(file_path):
+    if file_path.endswith('.pkl'):
+        with open(file_path, 'rb') as f:
+            return pickle.load(f)
+    return pd.read_excel(file_path)
+
+# -- Applies categorical & small integer dtypes:
+
+def compact_dtypes(df, categorical_columns):
+    df = df.reset_index(drop=True)
+    for col in df.columns:
+        if col in categorical_columns:
+            df[col] = df[col].astype('category')
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+# -- Writes Dataframe as a Feather file, uncompressed so that it can be memory-mapped & column-projected on load,
+#    recording the sha256 of its source file (if any) for utils.open_data_artifact to detect stale files:
+
+def write_artifact(df, target, source_hash=None):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if source_hash is not None:
+        table = table.replace_schema_metadata({**table.schema.metadata, ARTIFACT_SOURCE_HASH_KEY: source_hash.encode()})
+    feather.write_feather(table, target, compression='uncompressed')
+
+#######################
+# Cohort Percentiles
+
+MIN_COHORT_SIZE = 20
+
+# -- Reads a long-format cohort transcript file (CSV or Parquet):
+
+def read_cohort(file_path):
+    if file_path.endswith('.parquet'):
+        return pd.read_parquet(file_path)
+    return pd.read_csv(file_path)
+
+# -- Returns Dataframe [Track, CGPA] of the graded students of a cohort, sorted by CGPA within each track:
+
+def build_cohort_percentiles(cohort):
+    from user import aggregate_cohort
+    from utils import COHORT_OVERALL
+
+    snapshot = aggregate_cohort(cohort)
+    students = snapshot.students[snapshot.students['Graded_Units'] > 0]
+    tracks = snapshot.tracks[(snapshot.tracks['Units'] > 0) & snapshot.tracks['CGPA'].notna()]
+
+    df = pd.concat([
+        pd.DataFrame({'Track': COHORT_OVERALL, 'CGPA': students['CGPA'].to_numpy(dtype=float)}),
+        pd.DataFrame({'Track': tracks.index.get_level_values('Module_Type'), 'CGPA': tracks['CGPA'].to_numpy(dtype=float)})
+    ])
+    df = df[df.groupby('Track')['CGPA'].transform('size') >= MIN_COHORT_SIZE]
+    return compact_dtypes(df.sort_values(['Track', 'CGPA']), ['Track'])
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Convert the reference data in ./data into Feather artifacts.")
+    parser.add_argument('--cohort', default=None,
+                        help="long-format cohort transcripts (.csv or .parquet) for cohort_percentiles")
+    args = parser.parse_args()
+
+    #######################
+    # Convert Data
+
+    data_dir = './data'
+    converted = 0
+
+    for name, (source, categorical_columns) in ARTIFACT_SOURCES.items():
+
+        source_path = os.path.join(data_dir, source)
+        df = compact_dtypes(read_source(source_path), categorical_columns)
+        target = os.path.join(data_dir, f'{name}.feather')
+        write_artifact(df, target, source_hash=hash_data_file(source_path))
+        converted += 1
+        print(f"Converted {source} -> {target} ({len(df)} rows)")
+
+    print(f"Saved {converted} .feather files in path location: {os.path.abspath(data_dir)}")
+
+    #######################
+    # Build Cohort Percentiles
+
+    # -- Only from a real anonymized cohort: without one, the dashboard shows no cohort percentiles
+
+    if args.cohort is None:
+        print("Skipped cohort_percentiles.feather (no --cohort file given)")
+    else:
+        df = build_cohort_percentiles(read_cohort(args.cohort))
+        target = os.path.join(data_dir, 'cohort_percentiles.feather')
+        write_artifact(df, target)
+        print(f"Built {target} ({df['Track'].nunique()} tracks, {len(df)} CGPAs) from {args.cohort}")
@@ -23,9 +23,9 @@ if __name__ == "__main__":
     file_path = './data'
     df = pd.read_csv(file_path+'/'+'demand_allocation.csv')
 
-    bba_requirements = load_bba_requirements()
-    bba_electives = return_all_bba_electives()
-    bba_modtypes = return_flatten_bba_electives()
+    requirements_index = load_requirements_index()
+    bba_electives = list(requirements_index.all_bba_electives)
+    bba_modtypes = dict(requirements_index.module_track)
 
     #######################
     # Preprocessing
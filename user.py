@@ -1,167 +1,518 @@
+import re
+import time
 import pandas as pd
 import numpy as np
 from utils import *
-from dataclasses import dataclass
-import streamlit as st
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
 
 '''
     1) This script contains the User class to instantiate user objects.
-    2) This script is imported as a module.
+    2) This script is imported as a module;
+    3) This script has no UI (Streamlit) dependency: problems are stored in User.diagnostics for app.py to render.
 '''
 
 #######################
-# Read Helper Data
+# Snapshot Cache Size (number of filter states remembered per user)
 
-bba_requirements = load_bba_requirements()
-ge_mods = load_ge_requirements()
+SNAPSHOT_CACHE_SIZE = 16
+
+#######################
+# Duplicate Rules (shared by the per-metric methods & the aggregation kernel)
+
+# -- double-counted / duplicated mods: identical rows are counted once
+DUPLICATE_SUBSET = ['Module_Code', 'Module_Title', 'Year', 'Semester', 'Units', 'Grade', 'GPA', 'Term']
+# -- IP mods: MCs are counted for only 1 entry
+IP_DUPLICATE_SUBSET = ['Module_Code', 'Module_Title', 'Units', 'Module_Type', 'Module_Type_UE']
+# -- grades excluded from CGPA
+UNGRADED = ["S", "IP", "NG"]
+
+#######################
+# CGPA Timeline (cumulative CGPA after every term, incl. terms without modules)
+
+FULL_TERM_ORDER = [11, 12, 21, 22, 31, 32, 41, 42, 51, 52]
+
+@dataclass(frozen=True)
+class CGPATimeline:
+    terms: list         # e.g [11, 12, 21] (Y1S1, Y1S2, Y2S1), padded up to the last term taken
+    measures: list      # waterfall measure per term: 'absolute' for the first term taken, else 'relative'
+    cgpa: list          # cumulative CGPA after each term
+    track_cgpa: dict    # { Module_Type : cumulative track CGPA after each term }
+
+EMPTY_TIMELINE = CGPATimeline(terms=[], measures=[], cgpa=[], track_cgpa={})
 
 #######################
 # UserProgression Class
 
-@dataclass
+# -- Progress of a single track (a tuple, so track_status values still unpack as (Completion_Rate, Completion_Status, CGPA)):
+
+class TrackProgress(NamedTuple):
+    completion_rate: float
+    completion_status: tuple    # remaining requirements, e.g ('FIN3701', '8 MCs of 3K BBA-FIN modules')
+    cgpa: float
+
+# -- Computed metrics only: the filtered transcript itself is a row mask over User.raw_data (see User.apply_filter)
+
+@dataclass(frozen=True, slots=True)
 class UserProgressSnapshot:
-    filtered_data: pd.DataFrame
     total_units: int
     completion_rate: float
     cgpa: float
     current_year : int
     SU_used : int
-    track_status : dict
+    track_status : MappingProxyType     # { Module_Type : TrackProgress or None }
+    cgpa_timeline : CGPATimeline
+    cgpa_sums : tuple           # (weighted half-points, graded units, graded count, inexact count) behind cgpa
+    # { track : bitset of modules credited to it in track_status (see utils.assign_track_modules) },
+    # None for snapshots rebuilt from a CohortSnapshot
+    credited_bits : MappingProxyType = field(default=None, compare=False)
+
+#######################
+# Aggregation Kernel (every snapshot metric from a single groupby pass)
+
+@dataclass(frozen=True)
+class TranscriptAggregate:
+    is_empty: bool
+    total_units: int
+    cgpa: float
+    cgpa_sums: tuple            # (weighted half-points, graded units, graded count, inexact count)
+    current_year: int
+    SU_used_in_y1: int          # S/U units used in year 1
+    SU_used_after_y1: int       # S/U units used from year 2 onwards
+    module_types_ue: frozenset  # distinct Module_Type_UE values
+    track_units: dict           # { Module_Type : units (duplicates included) }
+    track_cgpa: dict            # { Module_Type : CGPA }
+    track_cgpa_sums: dict       # { Module_Type : CGPA sums }
+    track_bits: dict            # { Module_Type : bitset of modules taken (see utils.ModuleVocabulary) }
+    ue_units: int               # units of Module_Type_UE == 'UE' (duplicates included)
+    ue_cgpa: float
+    ue_cgpa_sums: tuple
+    cgpa_timeline: CGPATimeline
+
+EMPTY_AGGREGATE = TranscriptAggregate(
+    is_empty=True, total_units=0, cgpa=0, cgpa_sums=(0, 0, 0, 0), current_year=0, SU_used_in_y1=0, SU_used_after_y1=0,
+    module_types_ue=frozenset(), track_units={}, track_cgpa={}, track_cgpa_sums={}, track_bits={},
+    ue_units=0, ue_cgpa=0, ue_cgpa_sums=(0, 0, 0, 0), cgpa_timeline=EMPTY_TIMELINE
+)
+
+# -- Returns CGPA of one aggregated group (0 if it has no graded modules, same as User.compute_cgpa):
+
+def _group_cgpa(weighted_half_points, units, graded, inexact):
+    if graded == 0:
+        return 0
+    return cgpa_from_totals(weighted_half_points, units, exact=(inexact == 0))
+
+# -- Returns one integer key per row from per-column factorized codes (equal keys <=> equal values in every column):
+
+def _combine_codes(codes_list):
+    key, key_size = np.zeros(len(codes_list[0]), dtype=np.int64), 1
+    for codes in codes_list:
+        size = int(codes.max()) + 1
+        if key_size * size >= 2 ** 62:
+            key = pd.factorize(key)[0]                                  # re-factorize only before the key could overflow
+            key_size = int(key.max()) + 1
+        key, key_size = key * size + codes, key_size * size
+    return pd.factorize(key)[0]                                         # keys below the row count, in order of first appearance
+
+# -- Returns boolean mask of the first row of every key (same as ~DataFrame.duplicated(keep='first')):
+
+def _first_occurrences(key):
+    mask = np.zeros(len(key), dtype=bool)
+    mask[np.unique(key, return_index=True)[1]] = True
+    return mask
+
+# -- Returns CGPA of every cell of cumulative (weighted half-points, units, graded count, inexact count) arrays,
+#    vectorized version of _group_cgpa:
+
+def _cumulative_cgpas(weighted_half_points, units, graded, inexact):
+    exact = (inexact == 0) & (units > 0)
+    whole_points = np.where(exact, weighted_half_points, 0).astype(np.int64)
+    whole_units = np.where(exact, units, 1).astype(np.int64)
+    cgpas = ((100 * whole_points + whole_units) // (2 * whole_units)) / 100
+    cgpas = np.where(graded == 0, 0, cgpas).astype(object)
+    for cell in zip(*np.nonzero((graded > 0) & ~exact)):
+        cgpas[cell] = _group_cgpa(weighted_half_points[cell], units[cell], graded[cell], inexact[cell])
+    return cgpas
+
+# -- Returns CGPATimeline from the grouped table: per (track, term) sums, one cumulative sum along terms,
+#    then padding to FULL_TERM_ORDER (terms without modules repeat the last CGPA,
+#    as User.compute_cgpa(data[data['Term'] <= term]) would give):
+
+def _cgpa_timeline(groups):
+    terms, term_idx = np.unique(groups.index.get_level_values('Term').to_numpy(), return_inverse=True)
+    track_idx, tracks = pd.factorize(groups.index.get_level_values('Module_Type'))
+    padded_terms = [term for term in FULL_TERM_ORDER if term <= terms.max()]
+
+    # row 0 = all modules, rows 1.. = one per track; columns = terms taken
+    sums = np.zeros((4, len(tracks) + 1, len(terms)))
+    for i, (overall_col, track_col) in enumerate([('Weighted', 'Track_Weighted'), ('Graded_Units', 'Track_Graded_Units'),
+                                                   ('Graded', 'Graded'), ('Inexact', 'Inexact')]):
+        np.add.at(sums[i, 0], term_idx, groups[overall_col].to_numpy())
+        np.add.at(sums[i, 1:], (track_idx, term_idx), groups[track_col].to_numpy())
+    cgpas = _cumulative_cgpas(*np.cumsum(sums, axis=2))
+
+    position = {term : i for i, term in enumerate(terms)}
+    def padded(row):
+        padded_cgpas, last_cgpa = [], 0
+        for term in padded_terms:
+            last_cgpa = row[position[term]] if term in position else last_cgpa
+            padded_cgpas.append(last_cgpa)
+        return padded_cgpas
+
+    return CGPATimeline(
+        terms=padded_terms,
+        measures=['absolute' if term == terms.min() else 'relative' for term in padded_terms],
+        cgpa=padded(cgpas[0]),
+        track_cgpa={track : padded(cgpas[i + 1]) for i, track in enumerate(tracks)}
+    )
+
+# -- Returns per-row columns of the grouped sums, duplicate rules applied as row masks
+#    (rows of different students, given as {student_codes}, are never duplicates of each other):
+
+def _kernel_columns(data, student_codes=None):
+    units = data['Units'].to_numpy()
+    half_points = data['GPA'].to_numpy(dtype=float) * 2
+    grades = data['Grade'].to_numpy()
+    graded = ~data['Grade'].isin(UNGRADED).to_numpy()
+    inexact = graded & ~((half_points == np.round(half_points)) & (units == np.round(units)))
+
+    # duplicate rules as masks; deduplicating a track's rows == deduplicating the full transcript on subset + track column
+    codes = {col : pd.factorize(data[col], use_na_sentinel=False)[0] for col in set(DUPLICATE_SUBSET + IP_DUPLICATE_SUBSET)}
+    leading_codes = [] if student_codes is None else [student_codes]
+    row_key = _combine_codes(leading_codes + [codes[col] for col in DUPLICATE_SUBSET])
+    keep = _first_occurrences(row_key)
+    keep_total = keep.copy()
+    keep_total[keep] = _first_occurrences(_combine_codes(leading_codes + [codes[col] for col in IP_DUPLICATE_SUBSET])[keep])
+    keep_cgpa = graded & keep
+    keep_track = graded & _first_occurrences(_combine_codes([row_key, codes['Module_Type']]))
+    keep_ue = graded & _first_occurrences(_combine_codes([row_key, codes['Module_Type_UE']]))
+
+    weighted = np.where(graded, half_points * units, 0.0)
+    zero_units = np.zeros_like(units)
+
+    return {
+        'Module_Type': data['Module_Type'].to_numpy(),
+        'Module_Type_UE': data['Module_Type_UE'].to_numpy(),
+        'Year': data['Year'].to_numpy(),
+        'Term': data['Term'].to_numpy(),
+        'Grade_Class': np.where(graded, 'graded', np.where(grades == 'S', 'S', 'other')),
+        'Units': units,
+        'Total_Units': np.where(keep_total, units, zero_units),
+        'Weighted': np.where(keep_cgpa, weighted, 0.0),
+        'Graded_Units': np.where(keep_cgpa, units, zero_units),
+        'Track_Weighted': np.where(keep_track, weighted, 0.0),
+        'Track_Graded_Units': np.where(keep_track, units, zero_units),
+        'UE_Weighted': np.where(keep_ue, weighted, 0.0),
+        'UE_Graded_Units': np.where(keep_ue, units, zero_units),
+        'Graded': graded.astype(int),
+        'Inexact': inexact.astype(int)
+    }
+
+GROUP_KEYS = ['Module_Type', 'Module_Type_UE', 'Year', 'Term', 'Grade_Class']
+
+# -- Returns TranscriptAggregate of a prepared transcript (see prepare_transcript):
+#    duplicate rules are applied as row masks, then one groupby-sum over (Module_Type, Module_Type_UE, Year, Term, Grade class)
+#    totals units, weighted half-points & S/U usage; the snapshot fields & per-track CGPAs are read off the (small)
+#    grouped table.
+
+def aggregate_transcript(data):
+
+    if data.empty:
+        return EMPTY_AGGREGATE
+
+    groups = pd.DataFrame(_kernel_columns(data)).groupby(GROUP_KEYS, sort=False, dropna=False).sum()
+
+    # -- Everything below works on the grouped table (a few rows per track & year):
+
+    years = groups.index.get_level_values('Year')
+    is_S = groups.index.get_level_values('Grade_Class') == 'S'
+    is_UE = groups.index.get_level_values('Module_Type_UE') == 'UE'
+    totals = groups.sum()
+    ue = groups[is_UE].sum()
+    by_track = groups.groupby(level='Module_Type', sort=False).sum()
+
+    # modules taken per track as a boolean matrix [track, module] over the shared vocabulary, stored as int bitsets
+    vocabulary = load_module_vocabulary()
+    track_names, track_matrix = vocabulary.encode_matrix(data['Module_Type'].to_numpy(), data['Module_Code'])
+
+    # CGPA sums (weighted half-points, graded units, graded count, inexact count), kept for incremental updates (see WhatIfPlan)
+    cgpa_sums = (totals['Weighted'], totals['Graded_Units'], int(totals['Graded']), int(totals['Inexact']))
+    ue_cgpa_sums = (ue['UE_Weighted'], ue['UE_Graded_Units'], int(ue['Graded']), int(ue['Inexact']))
+    track_cgpa_sums = {
+        track : (weighted_half_points, units, int(graded), int(inexact))
+        for track, weighted_half_points, units, graded, inexact in zip(
+            by_track.index, by_track['Track_Weighted'], by_track['Track_Graded_Units'], by_track['Graded'], by_track['Inexact']
+        )
+    }
+
+    return TranscriptAggregate(
+        is_empty=False,
+        total_units=int(totals['Total_Units']),
+        cgpa=_group_cgpa(*cgpa_sums),
+        cgpa_sums=cgpa_sums,
+        current_year=int(years.astype(int).max()),
+        SU_used_in_y1=groups['Units'][is_S & (years <= 1)].sum(),
+        SU_used_after_y1=groups['Units'][is_S & (years >= 2)].sum(),
+        module_types_ue=frozenset(groups.index.get_level_values('Module_Type_UE')),
+        track_units=dict(by_track['Units']),
+        track_cgpa={track : _group_cgpa(*sums) for track, sums in track_cgpa_sums.items()},
+        track_cgpa_sums=track_cgpa_sums,
+        track_bits={track : vocabulary.bits_from_mask(mask) for track, mask in zip(track_names, track_matrix)},
+        ue_units=groups['Units'][is_UE].sum(),
+        ue_cgpa=_group_cgpa(*ue_cgpa_sums),
+        ue_cgpa_sums=ue_cgpa_sums,
+        cgpa_timeline=_cgpa_timeline(groups)
+    )
 
 #######################
 # User Class
 
 class User:
-    
+
     # -- Initialize User object:
 
-    def __init__(self, raw_data):
+    def __init__(self, raw_data, snapshot_cache_size=SNAPSHOT_CACHE_SIZE):
 
-        self.raw_data = raw_data
-        self.filtered_data = raw_data
+        self.raw_data = raw_data # the one transcript frame; filters are row masks over it
+        self.row_mask = np.ones(len(raw_data), dtype=bool) # rows kept by the current filter (None: no track selected)
+        self.diagnostics = [] # list of Diagnostic for the UI to render
         if 'Module_Type' in raw_data.columns:
             self.all_tracks = set(self.raw_data['Module_Type'].unique())
         else:
             self.all_tracks = None
-            st.error("Can't seem to find [Module_Type] column in your data.")
+            self.diagnostics.append(Diagnostic('error', "Can't seem to find [Module_Type] column in your data."))
         self.main_major = None
         self.snapshot = None # stores user computed metrics below
+        self.data_version = 0 # bump (via invalidate_snapshots) whenever raw_data changes
+        # { (selected tracks, main major, data version) : (row_mask, snapshot) }
+        self.snapshot_cache = LRUCache(max_entries=snapshot_cache_size)
+        self.snapshot_key = None # snapshot_cache key of the current snapshot (None when no track is selected)
+        self.derived_cache = LRUCache(max_entries=4 * snapshot_cache_size) # { (snapshot key, method, arguments) : result }
         self.init_cgpa =self.compute_cgpa(self.raw_data)
-    
-    # -- Store a new snapshot of updated metrics based on user's filter:
+
+    # -- Rows of raw_data kept by the current filter (raw_data itself when every row is kept, None when no track is selected):
+
+    @property
+    def filtered_data(self):
+        if self.row_mask is None:
+            return None
+        return self.raw_data if self.row_mask.all() else self.raw_data[self.row_mask]
+
+    # -- Store a new snapshot of updated metrics based on user's filter (one aggregation pass, see aggregate_transcript):
 
     def _generate_snapshot(self):
-        filtered = self.filtered_data.copy()
-        total_units = self.compute_total_MCs(filtered)
-        cgpa = self.compute_cgpa(filtered)
-        completion_rate = self.compute_completion_rate(filtered)
-        current_year = self.compute_current_year(filtered)
-        SU_used = self.compute_SUs(filtered)
-        track_status = self.compute_progress(filtered)
+        aggregate = aggregate_transcript(self.filtered_data)
+        track_status, credited_bits = self._progress_and_credits(aggregate)
 
         return UserProgressSnapshot(
-            filtered_data=filtered,
-            total_units=total_units,
-            completion_rate=completion_rate,
-            cgpa=cgpa,
-            current_year = current_year,
-            SU_used = SU_used,
-            track_status=track_status
+            total_units=aggregate.total_units,
+            completion_rate=self._completion_rate(aggregate.total_units),
+            cgpa=aggregate.cgpa,
+            current_year = aggregate.current_year,
+            SU_used = self._remaining_SUs(aggregate) if not aggregate.is_empty else 32,
+            track_status=MappingProxyType(track_status),
+            cgpa_timeline=aggregate.cgpa_timeline,
+            cgpa_sums=aggregate.cgpa_sums,
+            credited_bits=MappingProxyType(credited_bits)
         )
-    
+
     # -- Apply user's filter on raw data:
 
     def apply_filter(self, selected_tracks):
         if selected_tracks:
-            unselected_tracks = set(self.all_tracks) - set(selected_tracks)
-            unselected_mods = set(self.raw_data[self.raw_data['Module_Type'].isin(unselected_tracks)]['Module_Code'])
-            self.filtered_data = self.raw_data[~(self.raw_data['Module_Code'].isin(unselected_mods))]
-            self.snapshot = self._generate_snapshot()
+            key = (frozenset(selected_tracks), self.main_major, self.data_version)
+            self.snapshot_key = key
+            cached = self.snapshot_cache.get(key)
+            if cached is None:
+                unselected_tracks = set(self.all_tracks) - set(selected_tracks)
+                unselected_mods = set(self.raw_data[self.raw_data['Module_Type'].isin(unselected_tracks)]['Module_Code'])
+                self.row_mask = ~self.raw_data['Module_Code'].isin(unselected_mods).to_numpy()
+                self.snapshot = self._generate_snapshot()
+                self.snapshot_cache.put(key, (self.row_mask, self.snapshot))
+            else:
+                self.row_mask, self.snapshot = cached
         else:
-            self.filtered_data = None
-    
+            self.row_mask = None
+            self.snapshot_key = None
+
+    # -- Return result of compute() for the current snapshot, computed once per (snapshot, method, arguments) on reruns:
+
+    def _derived(self, method, arguments, compute):
+        if self.snapshot_key is None:
+            return compute()
+        key = (self.snapshot_key, method, arguments)
+        cached = self.derived_cache.get(key)
+        if cached is None:
+            cached = compute()
+            self.derived_cache.put(key, cached)
+        return cached
+
+    # -- Discard cached snapshots after raw_data has been modified:
+
+    def invalidate_snapshots(self):
+        self.data_version += 1
+        self.snapshot_cache.clear()
+        self.derived_cache.clear()
+        self.row_mask = np.ones(len(self.raw_data), dtype=bool)
+
+    # -- Return picklable state of the cached snapshots, for a SnapshotStore (see User.from_state):
+
+    def export_state(self):
+        return {
+            'main_major': self.main_major,
+            'snapshots': [
+                (selected_tracks, main_major, row_mask, replace(snapshot, track_status=dict(snapshot.track_status),
+                                                                credited_bits=dict(snapshot.credited_bits)))
+                for (selected_tracks, main_major, data_version), (row_mask, snapshot) in self.snapshot_cache.items()
+                if data_version == self.data_version
+            ]
+        }
+
+    # -- Return User of raw_data with the snapshots of an exported state already cached:
+
+    @classmethod
+    def from_state(cls, raw_data, state):
+        user = cls(raw_data=raw_data)
+        user.main_major = state['main_major']
+        for selected_tracks, main_major, row_mask, snapshot in state['snapshots']:
+            snapshot = replace(snapshot, track_status=MappingProxyType(snapshot.track_status),
+                               credited_bits=MappingProxyType(snapshot.credited_bits))
+            user.snapshot_cache.put((selected_tracks, main_major, user.data_version), (row_mask, snapshot))
+        return user
+
+    # -- Return dictionary of snapshot cache size, hits, misses & evictions:
+
+    def snapshot_cache_stats(self):
+        return self.snapshot_cache.stats()
+
     # -- Return total MCs completed by user:
 
     def compute_total_MCs(self, data):
 
         # remove double-counted mods
         # remove any duplicated mods
-        data = data.drop_duplicates(
-            subset=['Module_Code', 'Module_Title', 'Year', 'Semester', 'Units', 'Grade', 'GPA', 'Term'], keep='first'
-            )
-    
+        data = data.drop_duplicates(subset=DUPLICATE_SUBSET, keep='first')
+
         # for IP mods, count MCs for only 1 entry
-        data = data.drop_duplicates(
-            subset=['Module_Code', 'Module_Title', 'Units', 'Module_Type', 'Module_Type_UE'], keep='first'
-            )
-        
+        data = data.drop_duplicates(subset=IP_DUPLICATE_SUBSET, keep='first')
+
         if data.empty:
             return 0
         else:
             total = int(data['Units'].sum())
             return total
-    
+
     def compute_completion_rate(self, data):
+        return self._completion_rate(self.compute_total_MCs(data))
+
+    def _completion_rate(self, total_MCs_completed):
         total_MCs_requirement = 160
-        total_MCs_completed = self.compute_total_MCs(data)
         return round((total_MCs_completed/ total_MCs_requirement)*100, 1)
-    
+
     # -- Return user's CGPA:
-    
+
     def compute_cgpa(self, data):
-        data = data[~(data['Grade'].isin(["S", "IP", "NG"]))]
+        data = data[~(data['Grade'].isin(UNGRADED))]
 
         # remove double-counted mods
         # remove any duplicated mods
-        data = data.drop_duplicates(
-            subset=['Module_Code', 'Module_Title', 'Year', 'Semester', 'Units', 'Grade', 'GPA', 'Term'], keep='first'
-            )
-        
+        data = data.drop_duplicates(subset=DUPLICATE_SUBSET, keep='first')
+
         # for IP mods, just take the entry with max(Term) or Grade != IP
 
         if data.empty:
             return 0
         else:
-            cgpa = np.sum(data['GPA'] * data['Units']) / sum(data['Units'])
-            cgpa = round_half_up(cgpa)
-            return cgpa
-    
+            return compute_exact_cgpa(data['GPA'], data['Units'])
+
     # -- Return user's current year of study:
 
     def compute_current_year(self, data):
         return max(data['Year'].astype(int))
-    
+
     # -- Return user's remaining SU count:
 
     def compute_SUs(self, data):
         if not data.empty:
-            current_year = self.compute_current_year(data)
-            if current_year <= 1:
-                total_SUs = 32
-                total_used = sum(data[data['Grade']=='S']['Units'])
-            else:
-                SUs_in_y1 = sum(data[(data['Year'] <= 1) & (data['Grade']=='S')]['Units'])
-                remaining_SUs = 32 - SUs_in_y1
-                bringover_SUs = 12
-                total_used = sum(data[(data['Year'] >= 2) & (data['Grade']=='S')]['Units'])
-                
-                if remaining_SUs >= bringover_SUs:
-                    total_SUs = 12
-                else:
-                    total_SUs = remaining_SUs
-
-            return (total_SUs - total_used)
+            return self._remaining_SUs(aggregate_transcript(data))
         else:
             return 32
-    
+
+    def _remaining_SUs(self, aggregate):
+        if aggregate.current_year <= 1:
+            total_SUs = 32
+            total_used = aggregate.SU_used_in_y1 + aggregate.SU_used_after_y1
+        else:
+            remaining_SUs = 32 - aggregate.SU_used_in_y1
+            bringover_SUs = 12
+            total_used = aggregate.SU_used_after_y1
+
+            if remaining_SUs >= bringover_SUs:
+                total_SUs = 12
+            else:
+                total_SUs = remaining_SUs
+
+        return (total_SUs - total_used)
+
+    # -- Start a what-if plan on top of the current filtered data (see WhatIfPlan):
+
+    def start_what_if(self):
+        return WhatIfPlan(self, aggregate_transcript(self.filtered_data))
+
+    # -- Return list of ClassificationTarget, one per degree classification band, for the remaining units to 160
+    #    (or for the units of each remaining module, e.g [4] * 30), memoized per snapshot like plan_graduation_path:
+
+    def compute_classification_reachability(self, remaining_units=None):
+        if remaining_units is None:
+            remaining = max(0, 160 - int(self.snapshot.total_units))
+            remaining_units = [4] * (remaining // 4) + ([remaining % 4] if remaining % 4 else [])
+        weighted_half_points, graded_units = self.snapshot.cgpa_sums[:2]
+        return self._derived('compute_classification_reachability', tuple(remaining_units),
+                             lambda: classification_reachability(weighted_half_points, graded_units, remaining_units))
+
+    # -- Return GraduationPlan of the remaining requirements of BBA tracks (default: the tracks shown in the track table),
+    #    plus the rest of the 160 MCs as 'Other module' placeholders (memoized per snapshot: the search is only re-run when the
+    #    filter, the data or the arguments change):
+
+    def plan_graduation_path(self, max_units=20, tracks=None, include_other_modules=True, time_budget=0.15):
+        arguments = (max_units, None if tracks is None else tuple(tracks), include_other_modules, time_budget)
+        return self._derived('plan_graduation_path', arguments,
+                             lambda: self._plan_graduation_path(max_units, tracks, include_other_modules, time_budget))
+
+    def _plan_graduation_path(self, max_units, tracks, include_other_modules, time_budget):
+        # the modules the track table credits, so that the plan never re-schedules them
+        credited_bits = self.snapshot.credited_bits
+        if credited_bits is None:
+            credited_bits = self._progress_and_credits(aggregate_transcript(self.filtered_data))[1]
+        if tracks is None:
+            tracks = [track for track in self.snapshot.track_status if track.startswith('BBA-')]
+        modules = remaining_requirements(tracks, credited_bits)
+        if include_other_modules:
+            other_units = 160 - int(self.snapshot.total_units) - sum(module.units for module in modules)
+            modules += other_module_placeholders(max(0, other_units))
+
+        filtered_data = self.filtered_data
+        current_term = int(filtered_data['Term'].max()) if filtered_data is not None and not filtered_data.empty else None
+        return schedule_graduation_path(modules, max_units=max_units, current_term=current_term, time_budget=time_budget)
+
     # -- Return user's academic progression { Module_Type : (Completion_Rate, Completion_Status, CGPA) }:
 
     def compute_progress(self, data): # data is filtered_data
+        return self._progress_from_aggregate(aggregate_transcript(data))
+
+    def _progress_from_aggregate(self, aggregate):
+        return self._progress_and_credits(aggregate)[0]
+
+    # -- Return (academic progression, { track : bitset of modules credited to it (see utils.assign_track_modules) }):
+
+    def _progress_and_credits(self, aggregate):
 
         # Initialize academic progress for all tracks
         completion_status = {}
-        all_tracks = list(self.all_tracks.union(set(data['Module_Type_UE'].unique())))
-        for track in all_tracks: 
+        all_tracks = list(self.all_tracks.union(aggregate.module_types_ue, aggregate.track_units))
+        for track in all_tracks:
             completion_status[track] = None
         completion_status['BBA-FSP'] = None
         completion_status['BBA-BE'] = None
@@ -169,198 +520,986 @@ class User:
         completion_status['GE'] = None
         completion_status['UE'] = None
 
-        # Compute academic progress for all tracks
+        if aggregate.is_empty:
+            return completion_status, {}
 
+        # Evaluate the degree rules of every track (tracks without rules stay None),
+        # each module taken credited to the track(s) where it counts best (see utils.assign_track_modules)
+        rules = load_degree_rules()
+        credited_bits = assign_track_modules(rules, list(completion_status.keys()), aggregate.track_bits)
         for track in list(completion_status.keys()):
-            if track == 'GE':
-                completion_status[track] = self.compute_GE_progress(data)
-            elif track == 'UE':
-                completion_status[track] = self.compute_UE_progress(data)
-            elif track =='BBA-BE':
-                completion_status[track] = self.compute_BBA_CORE_progress(data, 'BBA-BE')
-            elif track =='BBA-BF':
-                completion_status[track] = self.compute_BBA_CORE_progress(data, 'BBA-BF')
-            elif track =='BBA-FSP':
-                completion_status[track] = self.compute_BBA_CORE_progress(data, 'BBA-FSP')
-            elif track.startswith('BBA-'):
-                completion_status[track] = self.compute_BBA_MAJ_progress(data, track)
-            elif track.startswith("MAJOR-"):
-                completed_MCs = sum(data[data['Module_Type']==track]['Units'])
-                completion_rate = round(completed_MCs/ 40, 2)
-                completion_status[track] = (
-                    completion_rate,                                        # float
-                    [f"{40 - completed_MCs} number of {track} electives"],  # list
-                    self.compute_cgpa(data[data['Module_Type']==track])     # float
-                )
-            elif track.startswith("MINOR-"):
-                completed_MCs = sum(data[data['Module_Type']==track]['Units'])
-                completion_rate = round(completed_MCs / 20, 2)
-                completion_status[track] = (
-                    completion_rate,                                        # float
-                    [f"{20 - completed_MCs} number of {track} electives"],  # list
-                    self.compute_cgpa(data[data['Module_Type']==track])     # float
-                )
+            completion_status[track] = self._track_progress(rules, aggregate, track, credited_bits.get(track))
 
-        return completion_status
-    
-    # -- Return academic progression tuple (Completion_Rate, Completion_Status) for BBA-CORE (i.e BBA-BE, BBA-BE, BBA-FSP):
+        return completion_status, credited_bits
 
-    def compute_BBA_CORE_progress(self, data, track:str):
-    
-        if not data.empty:
+    # -- Return academic progression tuple (Completion_Rate, Completion_Status, CGPA) of a single track:
+
+    def compute_track_progress(self, data, track):
+        aggregate = aggregate_transcript(data)
+        if aggregate.is_empty:
+            return None
+        # same module assignment as the track table, for the tracks it shows
+        progress = self._progress_from_aggregate(aggregate)
+        return progress[track] if track in progress else self._track_progress(load_degree_rules(), aggregate, track)
+
+    def _track_progress(self, rules, aggregate, track, credited_bits=None):
+        if track == 'UE':
+            # UE counts units of every module outside the core, GE & main major (Module_Type_UE)
+            taken_bits, taken_units, track_cgpa = 0, aggregate.ue_units, aggregate.ue_cgpa
+        else:
+            taken_bits = aggregate.track_bits.get(track, 0) if credited_bits is None else credited_bits
+            taken_units, track_cgpa = aggregate.track_units.get(track, 0), aggregate.track_cgpa.get(track, 0)
+
+        result = rules.evaluate(track, taken_bits, taken_units)
+        if result is None:
+            return None
+        completion_rate, completion_status = result
+        return TrackProgress(completion_rate, tuple(completion_status), track_cgpa)
+
+#######################
+# What-If Planner (hypothetical modules applied as O(1) deltas to running sums)
+
+@dataclass(frozen=True)
+class HypotheticalModule:
+    module_code: str
+    units: int
+    grade: str
+    module_type: str
+    module_type_ue: str
+    year: int
+
+@dataclass(frozen=True)
+class WhatIfProjection:
+    cgpa: float
+    degree_classification: str
+    total_units: int
+    completion_rate: float
+    current_year: int
+    SU_used: int                # remaining S/Us (same meaning as UserProgressSnapshot.SU_used)
+    track_status: dict
+
+class WhatIfPlan:
+
+    # -- Initialize plan from the TranscriptAggregate of the user's filtered data:
+
+    def __init__(self, user, aggregate):
+
+        self.user = user
+        self.base = aggregate
+        self.modules = {} # { plan id : HypotheticalModule }
+        self._next_id = 0
+
+        # running sums, same fields as TranscriptAggregate so the user's progress rules apply unchanged
+        self.is_empty = False
+        self.total_units = aggregate.total_units
+        self.cgpa_sums = list(aggregate.cgpa_sums)
+        self.track_cgpa_sums = {track : list(sums) for track, sums in aggregate.track_cgpa_sums.items()}
+        self.ue_cgpa_sums = list(aggregate.ue_cgpa_sums)
+        self.track_units = dict(aggregate.track_units)
+        self.ue_units = aggregate.ue_units
+        self.track_bits = dict(aggregate.track_bits)
+        self.SU_used_in_y1 = aggregate.SU_used_in_y1
+        self.SU_used_after_y1 = aggregate.SU_used_after_y1
+
+        self._module_counts = {} # { (Module_Type, module id) : number of hypothetical modules }
+        self._type_counts = {} # { Module_Type or Module_Type_UE : number of hypothetical modules }
+        self._year_counts = {} # { Year : number of hypothetical modules }
+
+    # -- Add a hypothetical module, returns its plan id:
+
+    def add_module(self, module_code, units, grade, module_type, year=None):
+        if grade not in get_grade_mapping():
+            raise ValueError(f"Unrecognized grade: '{grade}'")
+        module = HypotheticalModule(
+            module_code=module_code,
+            units=units,
+            grade=grade,
+            module_type=module_type,
+            module_type_ue=module_type_ue(module_type, self.user.main_major),
+            year=year if year is not None else max(self.base.current_year, 1)
+        )
+        plan_id, self._next_id = self._next_id, self._next_id + 1
+        self.modules[plan_id] = module
+        self._apply_module(module, 1)
+        self._apply_grade(module, 1)
+        return plan_id
+
+    # -- Remove a hypothetical module:
+
+    def remove_module(self, plan_id):
+        module = self.modules.pop(plan_id)
+        self._apply_grade(module, -1)
+        self._apply_module(module, -1)
+
+    # -- Change the grade of a hypothetical module:
+
+    def change_grade(self, plan_id, grade):
+        if grade not in get_grade_mapping():
+            raise ValueError(f"Unrecognized grade: '{grade}'")
+        module = self.modules[plan_id]
+        self._apply_grade(module, -1)
+        self.modules[plan_id] = module = HypotheticalModule(**{**module.__dict__, 'grade': grade})
+        self._apply_grade(module, 1)
 
-            required = set(bba_requirements.get(track, {}).get('Required_Courses', []))
+    # -- Units, module bits & year of a module (sign = 1 to add, -1 to remove):
 
-            if track in data['Module_Type'].str.upper().unique():
-                data = data[data['Module_Type']==track]
-                completed = set(data['Module_Code'].str.upper())
-                remaining = required - completed
-                completion_rate = round(1 - (len(remaining)/len(required)), 2)
-                completion_status = list(remaining)
-                track_cgpa = self.compute_cgpa(data)
+    def _apply_module(self, module, sign):
+        self.total_units += sign * module.units
+        self.track_units[module.module_type] = self.track_units.get(module.module_type, 0) + sign * module.units
+        if module.module_type_ue == 'UE':
+            self.ue_units += sign * module.units
+
+        for key, counts in ((module.module_type, self._type_counts), (module.module_type_ue, self._type_counts),
+                            (module.year, self._year_counts)):
+            counts[key] = counts.get(key, 0) + sign
+
+        module_id = load_module_vocabulary().ids.get(module.module_code)
+        if module_id is not None:
+            key = (module.module_type, module_id)
+            self._module_counts[key] = self._module_counts.get(key, 0) + sign
+            bit = 1 << module_id
+            if self._module_counts[key] > 0 or self.base.track_bits.get(module.module_type, 0) & bit:
+                self.track_bits[module.module_type] = self.track_bits.get(module.module_type, 0) | bit
+            else:
+                self.track_bits[module.module_type] &= ~bit
+
+        # drop tracks that only existed through removed hypothetical modules
+        if self._type_counts[module.module_type] == 0 and module.module_type not in self.base.track_units:
+            for running in (self.track_units, self.track_bits, self.track_cgpa_sums):
+                running.pop(module.module_type, None)
+
+    # -- CGPA sums & S/U usage of a module's grade (sign = 1 to add, -1 to remove):
+
+    def _apply_grade(self, module, sign):
+        if module.grade == 'S':
+            if module.year <= 1:
+                self.SU_used_in_y1 += sign * module.units
             else:
-                completion_rate = 0
-                completion_status = list(required)
-                track_cgpa = 0
+                self.SU_used_after_y1 += sign * module.units
+        if module.grade in UNGRADED:
+            return
+
+        half_points = get_grade_mapping()[module.grade] * 2
+        inexact = int(half_points != round(half_points) or module.units != round(module.units))
+        delta = (sign * half_points * module.units, sign * module.units, sign, sign * inexact)
+
+        sums_to_update = [self.cgpa_sums, self.track_cgpa_sums.setdefault(module.module_type, [0, 0, 0, 0])]
+        if module.module_type_ue == 'UE':
+            sums_to_update.append(self.ue_cgpa_sums)
+        for sums in sums_to_update:
+            for i, value in enumerate(delta):
+                sums[i] += value
+
+    # -- Derived fields read by User._progress_from_aggregate & User._remaining_SUs:
+
+    @property
+    def module_types_ue(self):
+        return self.base.module_types_ue | {track for track, count in self._type_counts.items() if count > 0}
+
+    @property
+    def current_year(self):
+        return max([self.base.current_year] + [year for year, count in self._year_counts.items() if count > 0])
+
+    @property
+    def track_cgpa(self):
+        return {track : _group_cgpa(*sums) for track, sums in self.track_cgpa_sums.items()}
+
+    @property
+    def ue_cgpa(self):
+        return _group_cgpa(*self.ue_cgpa_sums)
+
+    # -- Return projected metrics of the user's transcript plus every hypothetical module:
+
+    def projection(self):
+        cgpa = _group_cgpa(*self.cgpa_sums)
+        return WhatIfProjection(
+            cgpa=cgpa,
+            degree_classification=degree_classifier(cgpa),
+            total_units=int(self.total_units),
+            completion_rate=self.user._completion_rate(self.total_units),
+            current_year=self.current_year,
+            SU_used=self.user._remaining_SUs(self),
+            track_status=self.user._progress_from_aggregate(self)
+        )
+
+#######################
+# Degree Classification Reachability (exact DP over the grade points of the remaining modules)
+
+# -- Half-points (grade point x 2) of every graded letter grade, e.g { 10 : 'A', 9 : 'A-', ..., 0 : 'F' }:
+
+GRADE_OF_HALF_POINTS = {}
+for grade in sorted(get_grade_mapping(), key=len):
+    if grade not in UNGRADED:
+        GRADE_OF_HALF_POINTS.setdefault(int(get_grade_mapping()[grade] * 2), grade)
+HALF_POINT_STEPS = tuple(sorted(GRADE_OF_HALF_POINTS))
+
+@dataclass(frozen=True)
+class ClassificationTarget:
+    degree_classification: str
+    min_cgpa: float
+    reachable: bool
+    guaranteed: bool            # reached whatever the remaining grades
+    grade_mix: dict             # { grade : number of remaining modules } of the least demanding mix, best grade first
+    projected_cgpa: float       # CGPA with that grade mix
+
+# -- Returns one cost table per module prefix: table[i][s] = fewest modules graded at {cap} (all others below it)
+#    to score exactly s weighted half-points over the first i modules (memoized per (module units, cap)):
+
+@lru_cache(maxsize=512)
+def _grade_mix_tables(units, cap):
+    unreachable = len(units) + 1
+    size = cap * sum(units) + 1
+    cost = np.full(size, unreachable, dtype=np.int64)
+    cost[0] = 0
+    tables = [cost]
 
-            return (completion_rate, completion_status, track_cgpa)
+    for module_units in units:
+        next_cost = np.full(size, unreachable, dtype=np.int64)
+        for half_points in HALF_POINT_STEPS:
+            if half_points > cap:
+                break
+            shift = half_points * module_units
+            np.minimum(next_cost[shift:], cost[:size - shift] + (half_points == cap), out=next_cost[shift:])
+        cost = next_cost
+        tables.append(cost)
+    return tables
 
+# -- Returns least demanding grades (half-points per module) scoring at least {needed} weighted half-points:
+#    lowest possible best grade, then fewest modules at that grade, then smallest total; None if unreachable:
+
+def _least_demanding_grades(units, needed):
+    for cap in HALF_POINT_STEPS:
+        tables = _grade_mix_tables(units, cap)
+        candidates = tables[-1][needed:]
+        if len(candidates) == 0 or candidates.min() > len(units):
+            continue
+
+        total = needed + int(np.argmin(candidates))           # first minimum = smallest total among fewest cap grades
+        grades = []
+        for i in range(len(units), 0, -1):
+            for half_points in HALF_POINT_STEPS:
+                shift = half_points * units[i - 1]
+                if (half_points <= cap and shift <= total and
+                        tables[i - 1][total - shift] + (half_points == cap) == tables[i][total]):
+                    grades.append(half_points)
+                    total -= shift
+                    break
+        return grades
+    return None
+
+def classification_reachability(weighted_half_points, graded_units, remaining_units):
+    units = tuple(sorted((int(u) for u in remaining_units if u > 0), reverse=True))
+    total_units = graded_units + sum(units)
+    targets = []
+
+    for min_cgpa, degree_class in DEGREE_CLASS_BANDS:
+        # CGPA (rounded half-up to 2 d.p.) >= min_cgpa
+        #   <=>  total weighted half-points >= total units x (200 x min_cgpa - 1) / 100
+        if min_cgpa == 0:
+            grades = [0] * len(units)
+        elif total_units == 0:              # no graded units taken or left (e.g all S/U or IP): the CGPA stays 0
+            grades = None
         else:
-            return None
-        
-    # -- Return academic progression tuple (Completion_Rate, Completion_Status) for BBA-MAJOR:
+            needed = max(0, int(np.ceil(total_units * (200 * min_cgpa - 1) / 100 - weighted_half_points)))
+            grades = _least_demanding_grades(units, needed)
 
-    def compute_BBA_MAJ_progress(self, data, major):
+        grade_mix = {}
+        for half_points in sorted(grades or [], reverse=True):
+            grade_mix[GRADE_OF_HALF_POINTS[half_points]] = grade_mix.get(GRADE_OF_HALF_POINTS[half_points], 0) + 1
+        projected_half_points = weighted_half_points + sum(g * u for g, u in zip(grades or [], sorted(units)))
+
+        targets.append(ClassificationTarget(
+            degree_classification=degree_class,
+            min_cgpa=min_cgpa,
+            reachable=grades is not None,
+            guaranteed=grades is not None and all(g == 0 for g in grades),
+            grade_mix=grade_mix,
+            projected_cgpa=cgpa_from_totals(projected_half_points, total_units) if grades is not None and total_units else 0
+        ))
+    return targets
+
+#######################
+# Graduation Path Scheduler (remaining requirements packed into the fewest semesters)
+#   - Remaining required courses & elective units of BBA tracks come from the compiled degree rules (bba_requirements.json);
+#   - Optionally, the rest of the 160 MCs (GE, UE, minors...) is planned as 'Other module' placeholders;
+#   - Constraints: at most {max_units} MCs per semester, and within a track a module follows every lower-level (e.g 3K) module
+#     of the track left to take, one semester later at the earliest;
+#   - Greedy list scheduling (longest chain first), then a pruned depth-first search for a shorter plan within a time budget.
+
+MODULE_LEVEL_PATTERN = re.compile(r'[A-Z]+(\d)\d{3}')
+
+@dataclass(frozen=True)
+class PlannedModule:
+    label: str                  # module code, or placeholder e.g 'BBA-FIN 3K elective'
+    track: str                  # None for 'Other module' placeholders
+    units: int
+    level: int                  # 1-4 from the module code (0 for 'Other module' placeholders)
+    is_placeholder: bool
+
+@dataclass(frozen=True)
+class GraduationPlan:
+    terms: tuple                # e.g (22, 31, 32) (Y2S2, Y3S1, Y3S2)
+    semesters: tuple            # (PlannedModule, ...) per term
+    lower_bound: int            # fewest semesters any plan could take
+    is_optimal: bool            # plan reaches the lower bound, or the search proved no shorter plan exists
+
+    @property
+    def semester_units(self):
+        return [sum(module.units for module in semester) for semester in self.semesters]
+
+    # -- Returns Dataframe of the plan, one row per module:
+
+    def to_dataframe(self):
+        return pd.DataFrame(
+            [{'Term': term, 'Module': module.label, 'Track': module.track or '-', 'Units': module.units}
+             for term, semester in zip(self.terms, self.semesters) for module in semester],
+            columns=['Term', 'Module', 'Track', 'Units']
+        )
+
+class _SearchTimeout(Exception):
+    pass
+
+# -- Returns module level (e.g 3 for FIN3701, 0 if the code has no level):
+
+def module_level(module_code):
+    match = MODULE_LEVEL_PATTERN.match(str(module_code))
+    return int(match.group(1)) if match else 0
+
+# -- Returns the term after term (e.g 12 after 11, 21 after 12), special terms are not planned:
+
+def next_term(term):
+    year, semester = divmod(term, 10)
+    return year * 10 + 2 if semester == 1 else (year + 1) * 10 + 1
+
+# -- Returns units of each required course: units listed in bba_electives_info,
+#    the rest of the track's Required_Units split evenly
+#    in multiples of 2 MCs:
+
+def _required_course_units(module_codes, required_units):
+    listed_units = load_bba_electives_info().drop_duplicates('Module_Code').set_index('Module_Code')['Units']
+    units = {code : int(listed_units[code]) for code in module_codes if code in listed_units.index}
+    unlisted = [code for code in module_codes if code not in units]
+    if unlisted:
+        share, extra = divmod(max(required_units - sum(units.values()), 0) // 2, len(unlisted))
+        for i, code in enumerate(unlisted):
+            units[code] = 2 * (share + (i < extra)) or 4
+    return units
+
+# -- Returns list of PlannedModule left to take in tracks, given { track : bitset of modules credited to it }
+#    (see utils.assign_track_modules), same as the track table:
+
+def remaining_requirements(tracks, credited_bits):
+    rules = load_degree_rules()
+    requirements_index = load_requirements_index()
+    remaining, planned_codes = [], set()
+    credited_any = 0
+    for bits in credited_bits.values():
+        credited_any |= bits
+
+    for track in tracks:
+        track_rules = rules.tracks.get(track)
+        if track_rules is None:
+            continue
+        taken_bits, required_bits = credited_bits.get(track, 0), 0
+
+        for rule in track_rules:
+            if rule.kind == 'required_all':
+                # a course credited to other tracks only (double-count limit reached) is not taken again
+                missing = rules.vocabulary.codes_of(rule.bits & ~taken_bits & ~credited_any)
+                units = _required_course_units(
+                    rules.vocabulary.codes_of(rule.bits), requirements_index.track(track).required_units
+                )
+                # a course required by several tracks (e.g BSP4701) is planned once, under the first track
+                remaining.extend(
+                    PlannedModule(code, track, units[code], module_level(code), False)
+                    for code in missing if code not in planned_codes
+                )
+                planned_codes.update(missing)
+                required_bits |= rule.bits
+
+            elif rule.kind == 'choose_units':
+                credited, required, _ = rule.evaluate(rules.vocabulary, track, taken_bits & ~required_bits, 0)
+                level = min((module_level(code) for code in rules.vocabulary.codes_of(rule.bits)), default=0)
+                remaining.extend(PlannedModule(f"{track} {level}K elective", track, rule.units_per_module, level, True)
+                                 for _ in range(required - credited))
+    return remaining
+
+# -- Returns list of 'Other module' placeholders making up {units} MCs:
+
+def other_module_placeholders(units, units_per_module=4):
+    sizes = [units_per_module] * (units // units_per_module) + ([units % units_per_module] if units % units_per_module else [])
+    return [PlannedModule('Other module', None, size, 0, True) for size in sizes]
+
+# -- Returns (semester index per module) of greedy list scheduling: each semester takes the available modules
+#    with the longest chain of higher-level modules after them (then the largest) that still fit:
+
+def _greedy_schedule(modules, depths, max_units):
+    semester_of = [None] * len(modules)
+    semester = 0
+    while None in semester_of:
+        available = [i for i, module in enumerate(modules) if semester_of[i] is None and all(
+            semester_of[j] is not None and semester_of[j] < semester
+            for j, other in enumerate(modules)
+            if other.track == module.track and other.level < module.level and module.track is not None
+        )]
+        free = max_units
+        for i in sorted(available, key=lambda i: (-depths[i], -modules[i].units)):
+            if modules[i].units <= free:
+                semester_of[i] = semester
+                free -= modules[i].units
+        semester += 1
+    return semester_of
+
+# -- Returns list where [f] = largest sum of module sizes (any number of each) <= f, for f up to max_units:
+
+def _usable_units(sizes, max_units):
+    reachable = 1
+    for _ in range(max_units):
+        for size in sizes:
+            reachable |= (reachable << size) & ((1 << (max_units + 1)) - 1)
+    usable = []
+    for f in range(max_units + 1):
+        usable.append(f if reachable >> f & 1 else usable[-1])
+    return usable
+
+# -- Returns (semester index per module) of a plan fitting {n_semesters}, None if none exists;
+#    raises _SearchTimeout past deadline.
+#    Depth-first over the track modules one track at a time in level order (tracks with the smallest modules, then the longest
+#    chains first, as the space they leave unusable is what prunes the search), then 'Other module' placeholders
+#    (no constraints) fill the space left:
+
+def _search_schedule(modules, depths, max_units, n_semesters, deadline):
+    track_rank = {}
+    for i, module in enumerate(modules):
+        if module.track is not None:
+            rank = track_rank.get(module.track, (max_units, 0))
+            track_rank[module.track] = (min(rank[0], module.units), min(rank[1], -depths[i] - 1))
+    order = sorted((i for i, module in enumerate(modules) if module.track is not None),
+                   key=lambda i: (track_rank[modules[i].track], modules[i].track, modules[i].level, -modules[i].units,
+                                  modules[i].label))
+    fillers = sorted((i for i, module in enumerate(modules) if module.track is None), key=lambda i: -modules[i].units)
+    filler_units = sum(modules[i].units for i in fillers)
+    suffix_units = np.cumsum([modules[i].units for i in order][::-1])[::-1].tolist() + [0]
+
+    # usable[position][f] = most of f MCs the modules left at position can fill
+    usable, tables = [], {}
+    for position in range(len(order) + 1):
+        sizes = frozenset(modules[i].units for i in order[position:] + fillers)
+        if sizes not in tables:
+            tables[sizes] = _usable_units(sizes, max_units)
+        usable.append(tables[sizes])
+
+    free = [max_units] * n_semesters
+    semester_of = [None] * len(modules)
+    last_semester = {}                          # { (track, level) : [semesters used] }
+    nodes = [0]
+
+    # first-fit decreasing of the placeholders into the space left
+    def fill():
+        space = list(free)
+        for i in fillers:
+            semester = next((semester for semester in range(n_semesters) if space[semester] >= modules[i].units), None)
+            if semester is None:
+                return False
+            space[semester] -= modules[i].units
+            semester_of[i] = semester
+        return True
+
+    def place(position):
+        nodes[0] += 1
+        if nodes[0] % 1024 == 0 and time.perf_counter() > deadline:
+            raise _SearchTimeout()
+        if suffix_units[position] + filler_units > sum(usable[position][f] for f in free):
+            return False
+        if position == len(order):
+            return fill()
+
+        i = order[position]
+        module = modules[i]
+        earliest = max((max(semesters) + 1 for (track, level), semesters in last_semester.items()
+                        if track == module.track and level < module.level and semesters), default=0)
+        # interchangeable modules (same track, level & units) are placed in non-decreasing semesters (symmetry breaking)
+        previous = modules[order[position - 1]] if position > 0 else None
+        if (previous is not None and
+                (previous.track, previous.level, previous.units) == (module.track, module.level, module.units)):
+            earliest = max(earliest, semester_of[order[position - 1]])
+
+        for semester in range(earliest, n_semesters - depths[i]):
+            if module.units > free[semester]:
+                continue
+            free[semester] -= module.units
+            semester_of[i] = semester
+            last_semester.setdefault((module.track, module.level), []).append(semester)
+            if place(position + 1):
+                return True
+            last_semester[(module.track, module.level)].pop()
+            free[semester] += module.units
+            semester_of[i] = None
+        return False
+
+    return list(semester_of) if place(0) else None
+
+def schedule_graduation_path(modules, max_units=20, current_term=None, time_budget=0.15):
+    if any(module.units > max_units for module in modules):
+        raise ValueError(f"A module has more than the {max_units} MCs allowed per semester.")
+    start_term = next_term(current_term) if current_term else 11
+    if not modules:
+        return GraduationPlan(terms=(), semesters=(), lower_bound=0, is_optimal=True)
+
+    # depth = number of higher levels of the same track left after the module
+    track_levels = {}
+    for module in modules:
+        if module.track is not None:
+            track_levels.setdefault(module.track, set()).add(module.level)
+    depths = [sum(level > module.level for level in track_levels.get(module.track, ())) for module in modules]
+
+    lower_bound = max(
+        -(-sum(module.units for module in modules) // _usable_units({module.units for module in modules}, max_units)[max_units]),
+        max(depths) + 1,
+        sum(2 * module.units > max_units for module in modules)          # modules over half the cap never share a semester
+    )
+
+    semester_of = _greedy_schedule(modules, depths, max_units)
+    n_semesters = max(semester_of) + 1
+    is_optimal = n_semesters == lower_bound
+
+    # pruned search for shorter plans, from the lower bound up, until proved or out of time
+    deadline = time.perf_counter() + time_budget
+    try:
+        for target in range(lower_bound, n_semesters):
+            found = _search_schedule(modules, depths, max_units, target, deadline)
+            if found is not None:
+                semester_of, n_semesters = found, target
+                break
+        is_optimal = True
+    except _SearchTimeout:
+        pass
+
+    terms = [start_term]
+    for _ in range(n_semesters - 1):
+        terms.append(next_term(terms[-1]))
+    semesters = [[] for _ in range(n_semesters)]
+    for module, semester in zip(modules, semester_of):
+        semesters[semester].append(module)
+
+    return GraduationPlan(
+        terms=tuple(terms),
+        semesters=tuple(
+            tuple(sorted(semester, key=lambda module: (module.track is None, str(module.track), module.label)))
+            for semester in semesters
+        ),
+        lower_bound=lower_bound,
+        is_optimal=is_optimal
+    )
+
+#######################
+# Cohort Analytics Engine (snapshot metrics of many students in one pass, for distribution statistics)
+#   - Input: long-format table of many transcripts: upload schema columns (see utils.EXPECTED_COLUMNS), a student id column
+#     and optionally Main_Major (default: each student's first BBA major, same as the dashboard & batch_process.py);
+#   - Same duplicate rules & groupby-sum as aggregate_transcript, with the student as the leading group key;
+#   - Degree rules are evaluated one track at a time on a boolean matrix [student, module] (see utils.ModuleVocabulary);
+#     only students with a module counting towards two requirement slots go through utils.assign_track_modules;
+#   - Each student's metrics are the same as User.snapshot of their transcript with every track selected.
+
+# -- Tracks in every track_status (see User._progress_from_aggregate):
+
+REPORTED_TRACKS = ['BBA-FSP', 'BBA-BE', 'BBA-BF', 'GE', 'UE']
+
+@dataclass(frozen=True)
+class CohortSnapshot:
+    students: pd.DataFrame          # index Student: Main_Major, Total_Units, Completion_Rate, CGPA, Current_Year, SU_Remaining,
+                                    # Degree_Classification, Assigned (went through the module assignment) & CGPA sums
+    tracks: pd.DataFrame            # index (Student, Module_Type): Completion_Rate, Completion_Status, CGPA, Units
+                                    # (Completion_Rate NaN & Completion_Status None for tracks without rules)
+    timeline: pd.DataFrame          # index (Student, Term): Measure, CGPA
+    track_timeline: pd.DataFrame    # index (Student, Module_Type, Term): CGPA
+
+    # -- Returns UserProgressSnapshot of one student:
+
+    def snapshot(self, student):
+        row = self.students.loc[student]
+        tracks = self.tracks.loc[student]
+        timeline = self.timeline.loc[student]
+        track_status = {
+            track : None if status is None else TrackProgress(rate, status, cgpa)
+            for track, rate, status, cgpa in zip(
+                tracks.index, tracks['Completion_Rate'], tracks['Completion_Status'], tracks['CGPA']
+            )
+        }
+        return UserProgressSnapshot(
+            total_units=int(row['Total_Units']),
+            completion_rate=row['Completion_Rate'],
+            cgpa=row['CGPA'],
+            current_year=int(row['Current_Year']),
+            SU_used=int(row['SU_Remaining']),
+            track_status=MappingProxyType(track_status),
+            cgpa_timeline=CGPATimeline(
+                terms=list(timeline.index),
+                measures=list(timeline['Measure']),
+                cgpa=list(timeline['CGPA']),
+                track_cgpa={
+                    track : list(cgpas)
+                    for track, cgpas in self.track_timeline.loc[student, 'CGPA'].groupby(level='Module_Type', sort=False)
+                }
+            ),
+            cgpa_sums=(row['Weighted_Half_Points'], row['Graded_Units'], int(row['Graded']), int(row['Inexact']))
+        )
+
+# -- Returns Dataframe of columns indexed by a sorted MultiIndex { level name : (level values, codes of each row) },
+#    built from the codes directly (no re-factorizing of the values), so .loc lookups of one student are cheap:
+
+def _indexed_frame(levels, columns):
+    sorted_levels, sorted_codes = [], []
+    for values, codes in levels.values():
+        order = np.argsort(values, kind='stable')
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        sorted_levels.append(pd.Index(np.asarray(values)[order]))
+        sorted_codes.append(rank[codes])
+    rows = np.lexsort(sorted_codes[::-1])
+    index = pd.MultiIndex(
+        levels=sorted_levels, codes=[codes[rows] for codes in sorted_codes], names=list(levels), verify_integrity=False
+    )
+    return pd.DataFrame({name : np.asarray(column)[rows] for name, column in columns.items()}, index=index)
+
+# -- Returns groupby-sum of value columns over key columns, same rows & order as
+#    DataFrame.groupby(keys, sort=False, dropna=False).sum() (one integer key per row & np.bincount per column,
+#    the row-level Dataframe is never built):
+
+def _group_sums(keys, values):
+    key = _combine_codes([pd.factorize(column, use_na_sentinel=False)[0] for column in keys.values()])
+    first_rows = np.unique(key, return_index=True)[1]
+    return pd.DataFrame({
+        name : np.bincount(key, weights=column, minlength=len(first_rows)).astype(column.dtype)
+        for name, column in values.items()
+    }, index=pd.MultiIndex.from_arrays([column[first_rows] for column in keys.values()], names=list(keys)))
+
+# -- Returns columns of the modules in a boolean mask over the vocabulary, for module matrices whose columns are
+#    the modules listed by the degree rules ({rule_ids}: their sorted vocabulary ids):
+
+def _rule_columns(mask, rule_ids):
+    return np.searchsorted(rule_ids, np.flatnonzero(mask))
+
+# -- Returns list of (rule, module columns) of the course-based rules of a track (electives exclude the track's required courses,
+#    as in DegreeRules.evaluate):
+
+def _course_rule_columns(vocabulary, track_rules, rule_ids):
+    columns, required_mask = [], np.zeros(len(vocabulary), dtype=bool)
+    for rule in track_rules:
+        if rule.kind == 'required_all':
+            columns.append((rule, _rule_columns(vocabulary.mask_from_bits(rule.bits), rule_ids)))
+            required_mask |= vocabulary.mask_from_bits(rule.bits)
+        elif rule.kind == 'choose_units':
+            columns.append((rule, _rule_columns(vocabulary.mask_from_bits(rule.bits) & ~required_mask, rule_ids)))
+    return columns
+
+# -- Returns (list of Completion_Rate, list of Completion_Status) of one track for many students,
+#    given their modules taken (boolean matrix [student, module listed by the rules]) & units taken
+#    (same as DegreeRules.evaluate row by row):
+
+def _evaluate_rules_matrix(vocabulary, track, track_rules, rule_ids, taken, taken_units):
+    credited, required = np.zeros(len(taken_units)), 0
+    statuses = [[] for _ in range(len(taken_units))]
+    required_mask = np.zeros(len(vocabulary), dtype=bool)
+
+    for rule in track_rules:
+        if rule.kind == 'required_all':
+            columns = _rule_columns(vocabulary.mask_from_bits(rule.bits), rule_ids)
+            missing = ~taken[:, columns]
+            credited += len(columns) - missing.sum(axis=1)
+            required += len(columns)
+            for row, column in zip(*np.nonzero(missing)):
+                statuses[row].append(vocabulary.codes[rule_ids[columns[column]]])
+            required_mask |= vocabulary.mask_from_bits(rule.bits)
+
+        elif rule.kind == 'choose_units':
+            # electives are chosen from modules not already counted as required courses of the track
+            columns = _rule_columns(vocabulary.mask_from_bits(rule.bits) & ~required_mask, rule_ids)
+            rule_required = rule.units // rule.units_per_module
+            rule_credited = np.minimum(taken[:, columns].sum(axis=1), rule_required)
+            remaining = rule.units - rule_credited * rule.units_per_module
+            credited += rule_credited
+            required += rule_required
+            for row in np.flatnonzero(remaining > 0):
+                statuses[row].append(rule.label.format(remaining=remaining[row], track=track))
+
+        elif rule.kind == 'pillar_coverage':
+            for pillar, bits in rule.pillars:
+                covered = taken[:, _rule_columns(vocabulary.mask_from_bits(bits), rule_ids)].any(axis=1)
+                credited += covered
+                for row in np.flatnonzero(~covered):
+                    statuses[row].append(pillar)
+            required += len(rule.pillars)
+
+        elif rule.kind == 'unit_total':
+            remaining = rule.units - taken_units
+            credited += np.minimum(taken_units, rule.units)
+            required += rule.units
+            for row in np.flatnonzero(remaining > 0):
+                statuses[row].append(rule.label.format(remaining=remaining[row], track=track))
 
-        if not data.empty:
-            
-            if major == 'BBA-ACC':
-
-                required = set(bba_requirements.get('BBA-ACC', {}).get('Required_Courses', []))
-
-                if major in data['Module_Type'].str.upper().unique():
-                    data = data[data['Module_Type']==major]
-                    completed = set(data['Module_Code'].str.upper())
-                    remaining = required - completed
-                    completion_rate = round(1 - (len(remaining)/len(required)), 2)
-                    completion_status = list(remaining)
-                    track_cgpa = self.compute_cgpa(data)
-                else:
-                    completion_rate = 0
-                    completion_status = list(required)
-                    track_cgpa = 0
-            
-                return (completion_rate, completion_status, track_cgpa)
-
-            elif major.startswith('BBA-') and major not in ['BBA-BE', 'BBA-BF', 'BBA-FSP']:
-
-                L3000_done, L4000_done = False, False
-                required = set(bba_requirements.get(major, {}).get('Required_Courses', []))
-                # obtain level 3000 & level 4000 electives requirements:
-                L3000_electives_info = bba_requirements.get(major, {})
-                L3000_electives = set(L3000_electives_info.get("3000_Electives", {}).get("Courses", {}))
-                L3000_required_units = L3000_electives_info.get("3000_Electives", {}).get("Required_Units", {})
-
-                L4000_electives_info = bba_requirements.get(major, {})
-                L4000_electives = set(L4000_electives_info.get("4000_Electives", {}).get("Courses", {}))
-                L4000_required_units = L4000_electives_info.get("4000_Electives", {}).get("Required_Units", {})
-
-                if major in data['Module_Type'].str.upper().unique():
-
-                    data = data[data['Module_Type']==major]
-
-                    # check required modules completion:
-                    completed = set(data[data['Module_Type'] == major]['Module_Code'].str.upper())
-                    remaining_required = required - completed
-
-                    # obtain electives completed:
-                    electives_completed = completed - (required & completed)
-
-                    # check how many level 3000 & level 4000 electives completed:
-                    num_L3000_completed = len(electives_completed & L3000_electives)
-                    num_L4000_completed = len(electives_completed & L4000_electives)
-                    
-                    if num_L3000_completed == (L3000_required_units / 4): L3000_done = True
-                    if num_L4000_completed == (L4000_required_units / 4): L4000_done = True
-
-                    numerator = (len(completed) + num_L3000_completed + num_L4000_completed)
-                    denominator = (len(required) + (L3000_required_units / 4) + (L4000_required_units / 4))
-
-                    completion_rate = round(numerator / denominator, 2)
-                    track_cgpa = self.compute_cgpa(data)
-
-                    if L3000_done & L4000_done:
-                        completion_status = list(remaining_required)
-                    else:
-                        completion_status = list(remaining_required) + \
-                                    [f"{L3000_required_units-(num_L3000_completed * 4)} MCs of 3K {major} modules"] + \
-                                    [f"{L4000_required_units-(num_L4000_completed * 4)} MCs of 4K {major} modules"]
-                else:
-                    completion_rate = 0
-                    completion_status = list(required) + \
-                                        [f"{L3000_required_units} MCs of 3K {major} modules"] + \
-                                        [f"{L4000_required_units} MCs of 4K {major} modules"]
-                    track_cgpa = 0
-
-                return (completion_rate, completion_status, track_cgpa)
         else:
-            return None
+            raise ValueError(f"Unknown rule type '{rule.kind}'")
 
-    # -- Return academic progression tuple (Completion_Rate, Completion_Status) for GE:
-     
-    def compute_GE_progress(self, data):
+    rates = [round(float(value) / required, 2) if required else 0 for value in credited]
+    return rates, [tuple(status) for status in statuses]
 
-            if not data.empty:
+# -- Returns (timeline, track_timeline) Dataframes of CohortSnapshot from the grouped table: per (student, track, term) sums,
+#    one cumulative sum along terms, then padding to FULL_TERM_ORDER (same as _cgpa_timeline, one row per student & per track):
 
-                required_prefixes = {'GEA', 'GEI', 'GESS', 'GEN', 'GEC', 'GEX'}
+def _cohort_timelines(groups, by_track, student_ids, track_names, student_column):
+    n_students = len(student_ids)
+    group_students = groups.index.get_level_values('Student').to_numpy()
+    track_students = by_track.index.get_level_values('Student').to_numpy()
+    terms, term_idx = np.unique(groups.index.get_level_values('Term').to_numpy(), return_inverse=True)
+    track_rows = by_track.index.get_indexer(groups.index.droplevel(['Module_Type_UE', 'Year', 'Term', 'Grade_Class']))
 
-                if 'GE' in data['Module_Type'].str.upper().unique():
+    # rows 0..n_students-1 = all modules of each student, then one row per (student, track); columns = terms of the cohort
+    n_rows = n_students + len(by_track)
+    overall_cells, track_cells = group_students * len(terms) + term_idx, (n_students + track_rows) * len(terms) + term_idx
+    sums = np.zeros((4, n_rows, len(terms)))
+    for i, (overall_col, track_col) in enumerate([('Weighted', 'Track_Weighted'), ('Graded_Units', 'Track_Graded_Units'),
+                                                   ('Graded', 'Graded'), ('Inexact', 'Inexact')]):
+        sums[i] = (np.bincount(overall_cells, weights=groups[overall_col].to_numpy(), minlength=n_rows * len(terms)) +
+                   np.bincount(track_cells, weights=groups[track_col].to_numpy(), minlength=n_rows * len(terms))
+                   ).reshape(n_rows, len(terms))
+    cgpas = _cumulative_cgpas(*np.cumsum(sums, axis=2, out=sums)).astype(float)
 
-                    data = data[data['Module_Type']=='GE']
-                    completed = set(data['Module_Code'].str.upper())
-                    required_prefixes_checker = required_prefixes.copy()
+    # terms without modules (of the student) repeat the last CGPA
+    taken_terms = np.zeros((n_students, len(terms)), dtype=bool)
+    taken_terms[group_students, term_idx] = True
+    row_students = np.concatenate([np.arange(n_students), track_students])
+    first_terms = terms[taken_terms.argmax(axis=1)]
+    last_terms = terms[len(terms) - 1 - taken_terms[:, ::-1].argmax(axis=1)]
 
-                    for completed_ge_mod in list(completed):
-                        match = ge_mods[ge_mods['Module_Code'] == completed_ge_mod]
-                        if not match.empty:
-                            prefix = match.iloc[0]['Pillar']
-                            required_prefixes_checker.remove(prefix)
-                    completion_rate = round(1 - (len(required_prefixes_checker) / len(required_prefixes)), 2)
-                    completion_status = list(required_prefixes_checker)
-                    track_cgpa = self.compute_cgpa(data)
+    position = {term : i for i, term in enumerate(terms)}
+    padded, last_cgpas = np.zeros((len(row_students), len(FULL_TERM_ORDER))), np.zeros(len(row_students))
+    for j, term in enumerate(FULL_TERM_ORDER):
+        if term in position:
+            last_cgpas = np.where(taken_terms[row_students, position[term]], cgpas[:, position[term]], last_cgpas)
+        padded[:, j] = last_cgpas
 
-                else:
-                    completion_rate = 0
-                    completion_status = list(required_prefixes)
-                    track_cgpa = 0
-                return (completion_rate, completion_status, track_cgpa)
-            
-            else:
-                return None
-    
-    # -- Return academic progression tuple (Completion_Rate, Completion_Status) for UE:
+    rows, columns = np.nonzero(np.array(FULL_TERM_ORDER)[None, :] <= last_terms[row_students][:, None])
+    is_overall = rows < n_students
+    rows, columns = (rows[is_overall], rows[~is_overall]), (columns[is_overall], columns[~is_overall])
 
-    def compute_UE_progress(self, data):
+    full_terms = pd.Index(FULL_TERM_ORDER)
+    timeline = _indexed_frame(
+        {student_column : (student_ids, rows[0]), 'Term' : (full_terms, columns[0])},
+        {'Measure': np.where(full_terms[columns[0]] == first_terms[rows[0]], 'absolute', 'relative'),
+         'CGPA': padded[rows[0], columns[0]]}
+    )
+    track_timeline = _indexed_frame(
+        {student_column : (student_ids, row_students[rows[1]]),
+         'Module_Type' : (track_names, by_track.index.get_level_values('Module_Type').to_numpy()[rows[1] - n_students]),
+         'Term' : (full_terms, columns[1])},
+        {'CGPA': padded[rows[1], columns[1]]}
+    )
+    return timeline, track_timeline
 
-        if not data.empty:
+# -- Returns CohortSnapshot of a long-format table of many transcripts (one row per module taken, {student_column} = student id):
 
-            required_MCs = 48
+def aggregate_cohort(data, student_column='Student'):
 
-            if 'UE' in data['Module_Type_UE'].str.upper().unique():
-                
-                data = data[data['Module_Type_UE']=='UE']
+    student_codes, student_ids = pd.factorize(data[student_column])
+    student_ids = np.asarray(student_ids)
+    n_students = len(student_ids)
+    module_types = data['Module_Type'].to_numpy()
+    type_codes, type_names = pd.factorize(module_types)
+    type_names = pd.Index(type_names)
 
-                completed_MCs = sum(data['Units'])
-                completion_rate = round(completed_MCs / required_MCs, 2)
-                completion_status = [f"{required_MCs - completed_MCs} number of UE MCs"]
-                track_cgpa = self.compute_cgpa(data)
-    
-            else:
-                completion_rate = 0
-                completion_status = [f"{required_MCs} number of UE MCs"]
-                track_cgpa = 0
-            
-            return (completion_rate, completion_status, track_cgpa)
-        
+    # main major of every student, then the derived columns of prepare_transcript with each row's main major
+    if 'Main_Major' in data.columns:
+        main_majors = data['Main_Major'].groupby(student_codes).first()
+    else:
+        is_major = np.isin(type_codes, type_names.get_indexer(return_major_options(type_names)))
+        main_majors = pd.Series(module_types[is_major]).groupby(student_codes[is_major]).first()
+    main_majors = main_majors.reindex(range(n_students)).astype(object)
+    main_majors = main_majors.where(main_majors.notna(), None).to_numpy()
+
+    row_majors = main_majors[student_codes]
+    type_major_key = _combine_codes([type_codes, pd.factorize(row_majors, use_na_sentinel=False)[0]])
+    first_rows = np.unique(type_major_key, return_index=True)[1]
+    type_major_ue = [module_type_ue(module_types[row], row_majors[row]) for row in first_rows]
+
+    # tracks are grouped as integer codes: Module_Type, Module_Type_UE & REPORTED_TRACKS share one code per track name
+    track_names = type_names.append(pd.Index(type_major_ue + REPORTED_TRACKS)).unique()
+    ue_codes = track_names.get_indexer(type_major_ue)[type_major_key]
+    reported_codes = track_names.get_indexer(REPORTED_TRACKS)
+    track_names, n_tracks = np.asarray(track_names, dtype=object), len(track_names)
+    ue_track = reported_codes[REPORTED_TRACKS.index('UE')]
+
+    years = data['Year'].astype(int).to_numpy()
+    prepared = pd.DataFrame({
+        'Module_Code': data['Module_Code'].to_numpy(),
+        'Module_Title': data['Module_Title'].to_numpy(),
+        'Year': years,
+        'Semester': data['Semester'].to_numpy(),
+        'Units': data['Units'].to_numpy(),
+        'Module_Type': type_codes,
+        'Module_Type_UE': ue_codes,
+        'Grade': data['Grade'].to_numpy(),
+        'GPA': map_grade_points(data['Grade']).to_numpy(),
+        'Term': years * 10 + data['Semester'].astype(int).to_numpy()
+    })
+
+    columns = _kernel_columns(prepared, student_codes)
+    groups = _group_sums({'Student': student_codes, **{key : columns.pop(key) for key in GROUP_KEYS}}, columns)
+
+    # -- Per-student metrics off the grouped table (a few rows per student, track & year):
+
+    group_students = groups.index.get_level_values('Student').to_numpy()
+    group_years = groups.index.get_level_values('Year').to_numpy()
+    is_S = groups.index.get_level_values('Grade_Class') == 'S'
+    is_UE = groups.index.get_level_values('Module_Type_UE') == ue_track
+    totals = groups.groupby(level='Student').sum()
+    ue = groups[is_UE].groupby(level='Student').sum().reindex(range(n_students), fill_value=0)
+    by_track = groups.groupby(level=['Student', 'Module_Type'], sort=False).sum()
+
+    total_units = totals['Total_Units'].to_numpy()
+    cgpas = _cumulative_cgpas(
+        *(totals[col].to_numpy() for col in ['Weighted', 'Graded_Units', 'Graded', 'Inexact'])
+    ).astype(float)
+    current_years = pd.Series(group_years).groupby(group_students).max().to_numpy()
+    SU_used_in_y1 = groups['Units'].where(is_S & (group_years <= 1), 0).groupby(level='Student').sum().to_numpy()
+    SU_used_after_y1 = groups['Units'].where(is_S & (group_years >= 2), 0).groupby(level='Student').sum().to_numpy()
+    # S/U allowance: 32 MCs in year 1, at most 12 of them brought over to later years (see User._remaining_SUs)
+    SU_remaining = np.where(
+        current_years <= 1,
+        32 - SU_used_in_y1 - SU_used_after_y1,
+        np.minimum(32 - SU_used_in_y1, 12) - SU_used_after_y1
+    )
+
+    # -- Tracks of every student's track_status (Module_Type & Module_Type_UE values, plus the REPORTED_TRACKS),
+    #    one (student, track) pair per key = student * n_tracks + track, sorted by student
+
+    track_keys = pd.Index(
+        by_track.index.get_level_values('Student').to_numpy() * n_tracks +
+        by_track.index.get_level_values('Module_Type').to_numpy()
+    )
+    pair_keys = np.unique(np.concatenate([
+        track_keys.to_numpy(),
+        group_students * n_tracks + groups.index.get_level_values('Module_Type_UE').to_numpy(),
+        (np.arange(n_students)[:, None] * n_tracks + reported_codes[None, :]).ravel()
+    ]))
+    pair_students, pair_tracks = np.divmod(pair_keys, n_tracks)
+    pair_bounds = np.searchsorted(pair_students, np.arange(n_students + 1))
+
+    position = track_keys.get_indexer(pair_keys)
+    track_cgpas = _cumulative_cgpas(
+        *(by_track[col].to_numpy() for col in ['Track_Weighted', 'Track_Graded_Units', 'Graded', 'Inexact'])
+    )
+    ue_cgpas = _cumulative_cgpas(*(ue[col].to_numpy() for col in ['UE_Weighted', 'UE_Graded_Units', 'Graded', 'Inexact']))
+    is_ue_track = pair_tracks == ue_track
+    pair_units = np.where(is_ue_track, ue['Units'].to_numpy()[pair_students],
+                          np.where(position >= 0, by_track['Units'].to_numpy()[position], 0))
+    pair_cgpas = np.where(is_ue_track, ue_cgpas[pair_students], np.where(position >= 0, track_cgpas[position], 0)).astype(float)
+
+    # -- Modules taken as a boolean matrix [student, module listed by a rule of the cohort's tracks].
+    #    The max-flow credits every module to every course-based rule listing it, up to the rule's capacity, whenever the
+    #    modules listed by several of a student's tracks are needed by at most 2 of them (and at most
+    #    rules.double_count_limit modules by 2): an elective rule does not need them if its other modules already fill it.
+    #    Only the other students go through the module assignment (see utils.assign_track_modules)
+
+    vocabulary, rules = load_module_vocabulary(), load_degree_rules()
+    track_rules = {track : rules.rules_of(track_names[track]) for track in range(n_tracks)}
+    rule_bits = 0
+    for rule in (rule for rules_of_track in track_rules.values() for rule in rules_of_track or ()):
+        rule_bits |= rule.bits
+        for _, bits in rule.pillars:
+            rule_bits |= bits
+    rule_ids = np.flatnonzero(vocabulary.mask_from_bits(rule_bits))
+    module_ids = vocabulary.encode(prepared['Module_Code'])
+    known = np.isin(module_ids, rule_ids)
+    module_columns = np.searchsorted(rule_ids, module_ids)
+    taken = np.zeros((n_students, len(rule_ids)), dtype=bool)
+    taken[student_codes[known], module_columns[known]] = True
+
+    course_rules = {
+        track : _course_rule_columns(vocabulary, rules_of_track or (), rule_ids) for track, rules_of_track in track_rules.items()
+    }
+    course_rules = {track : rule_columns for track, rule_columns in course_rules.items() if rule_columns}
+    course_tracks = {}                                  # { track : student codes holding it }
+    listed_by = np.zeros(taken.shape, dtype=np.int16)
+    assigned = np.zeros(n_students, dtype=bool)
+    for track, rule_columns in course_rules.items():
+        students = pair_students[pair_tracks == track]
+        counts = np.zeros((len(students), len(rule_ids)), dtype=np.int16)
+        for rule, columns in rule_columns:
+            counts[:, columns] += taken[np.ix_(students, columns)]
+        listed_by[students] += counts > 0
+        assigned[students] |= (counts > 1).any(axis=1)  # a module in two rules of the same track
+        course_tracks[track] = students
+
+    shared = listed_by > 1
+    needed_by = np.zeros(taken.shape, dtype=np.int16)
+    for track, students in course_tracks.items():
+        for rule, columns in course_rules[track]:
+            rule_taken, rule_shared = taken[np.ix_(students, columns)], shared[np.ix_(students, columns)]
+            rule_required = rule.units // rule.units_per_module
+            is_filled = (rule.kind == 'choose_units') & (rule_taken.sum(axis=1) - rule_shared.sum(axis=1) >= rule_required)
+            needed_by[np.ix_(students, columns)] += rule_shared & ~is_filled[:, None]
+    assigned |= (needed_by > 2).any(axis=1) | ((needed_by == 2).sum(axis=1) > rules.double_count_limit)
+
+    credited_bits = {}                                  # { student code : { track : bitset of modules credited } }
+    if assigned.any():
+        typed_rows = assigned[student_codes] & (module_ids >= 0)
+        student_track_bits = {}
+        for student, track, module_id in zip(student_codes[typed_rows], module_types[typed_rows], module_ids[typed_rows]):
+            track_bits = student_track_bits.setdefault(student, {})
+            track_bits[track] = track_bits.get(track, 0) | (1 << int(module_id))
+        for student in np.flatnonzero(assigned):
+            tracks = list(track_names[pair_tracks[pair_bounds[student]:pair_bounds[student + 1]]])
+            credited_bits[student] = assign_track_modules(rules, tracks, student_track_bits.get(student, {}))
+
+    # -- Rules of each track, evaluated for every student holding it at once
+
+    completion_rates = np.full(len(pair_keys), np.nan)
+    completion_statuses = np.full(len(pair_keys), None, dtype=object)
+    for track, rules_of_track in track_rules.items():
+        if rules_of_track is None:
+            continue
+        rows = np.flatnonzero(pair_tracks == track)
+        students = pair_students[rows]
+        if track == ue_track:
+            # UE counts units of every module outside the core, GE & main major (Module_Type_UE)
+            track_taken = np.zeros((len(rows), len(rule_ids)), dtype=bool)
+        elif track in course_tracks:
+            track_taken = taken[students]
+            for i in np.flatnonzero(assigned[students]):
+                track_taken[i] = vocabulary.mask_from_bits(credited_bits[students[i]].get(track_names[track], 0))[rule_ids]
         else:
-            return None
\ No newline at end of file
+            typed_rows = known & (type_codes == track)
+            student_rows = np.full(n_students, -1)
+            student_rows[students] = np.arange(len(students))
+            track_taken = np.zeros((len(rows), len(rule_ids)), dtype=bool)
+            track_taken[student_rows[student_codes[typed_rows]], module_columns[typed_rows]] = True
+        rates, statuses = _evaluate_rules_matrix(
+            vocabulary, track_names[track], rules_of_track, rule_ids, track_taken, pair_units[rows]
+        )
+        completion_rates[rows] = rates
+        completion_statuses[rows] = statuses
+
+    # -- Result tables
+
+    students = pd.DataFrame({
+        'Main_Major': main_majors,
+        'Total_Units': total_units,
+        'Completion_Rate': [round((units / 160) * 100, 1) for units in total_units],      # same as User._completion_rate
+        'CGPA': cgpas,
+        'Current_Year': current_years,
+        'SU_Remaining': SU_remaining,
+        'Degree_Classification': [degree_classifier(cgpa) for cgpa in cgpas],
+        'Assigned': assigned,
+        'Weighted_Half_Points': totals['Weighted'].to_numpy(),
+        'Graded_Units': totals['Graded_Units'].to_numpy(),
+        'Graded': totals['Graded'].to_numpy(),
+        'Inexact': totals['Inexact'].to_numpy()
+    }, index=pd.Index(student_ids, name=student_column))
+
+    tracks = _indexed_frame(
+        {student_column : (student_ids, pair_students), 'Module_Type' : (track_names, pair_tracks)},
+        {'Completion_Rate': completion_rates, 'Completion_Status': completion_statuses, 'CGPA': pair_cgpas, 'Units': pair_units}
+    )
+    timeline, track_timeline = _cohort_timelines(groups, by_track, student_ids, track_names, student_column)
+    return CohortSnapshot(students=students, tracks=tracks, timeline=timeline, track_timeline=track_timeline)
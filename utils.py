@@ -1,71 +1,779 @@
 import json
+import hashlib
+import io
+import os
+import sqlite3
+import zlib
+from contextlib import closing, contextmanager
+from functools import lru_cache
+from collections import OrderedDict
 from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
 import pandas as pd
 import pickle
-import streamlit as st
+import sys
+import threading
+import time
 import base64
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType, ModuleType
 
 '''
     1) This script contains helper functions needed across all other app scripts;
-    2) This script is imported as a module.
+    2) This script is imported as a module;
+    3) This script has no UI (Streamlit) dependency: problems are returned as Diagnostic / ValidationIssue records
+       for app.py to render.
 '''
 
 #######################
-# Read App-related Data
+# Reference Data Registry
+
+class DataRegistry:
+
+    '''
+        1) Loads each reference artifact lazily, on first access only;
+        2) Memoizes it for the whole process, so every Streamlit session shares one copy;
+        3) Records per-artifact load time (seconds) and memory footprint (bytes).
+    '''
+
+    def __init__(self):
+        self._loaders = {}
+        self._artifacts = {}
+        self._stats = {}
+        self._lock = threading.RLock()            # re-entrant: loaders may depend on other artifacts
+
+    # -- Register a zero-argument loader under an artifact name:
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+
+    # -- Return artifact, loading it on first access:
+
+    def get(self, name):
+        if name in self._artifacts:
+            return self._artifacts[name]
+
+        with self._lock:
+            if name not in self._artifacts:          # another thread may have loaded it meanwhile
+                start = time.perf_counter()
+                artifact = self._loaders[name]()
+                load_time = time.perf_counter() - start
+                self._artifacts[name] = artifact
+                self._stats[name] = {
+                    'Artifact': name,
+                    'Load_Time_s': round(load_time, 4),
+                    'Memory_Bytes': estimate_memory(artifact)
+                }
+        return self._artifacts[name]
+
+    # -- Drop loaded artifact(s) so they are re-read on next access:
+
+    def invalidate(self, name=None):
+        with self._lock:
+            names = list(self._artifacts) if name is None else [name]
+            for n in names:
+                self._artifacts.pop(n, None)
+                self._stats.pop(n, None)
+
+    # -- Return Dataframe of load time & memory for every loaded artifact:
+
+    def report(self):
+        return pd.DataFrame(list(self._stats.values()), columns=['Artifact', 'Load_Time_s', 'Memory_Bytes'])
+
+# -- Returns approximate memory footprint (bytes) of a loaded artifact:
+
+def estimate_memory(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    # compiled artifacts (e.g DegreeRules) hold MappingProxyType fields that cannot be pickled: walk them recursively
+    return deep_memory(obj, set())
 
-# -- Read BBA Electives Course Descriptions:
-with open('./data/bba_electives_description.pkl', 'rb') as f:
-        course_descriptions = pickle.load(f)
+#######################
+# Bounded LRU Cache
+
+class LRUCache:
+
+    '''
+        1) Bounded, thread-safe least-recently-used cache { key : value };
+        2) Evicts the least recently used entries beyond max_entries;
+        3) Tracks hits, misses & evictions.
+    '''
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    # -- Return cached entry (marking it most recently used), None if absent:
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
 
-# -- Read BBA Electives Information:
-bba_electives_info = pd.read_excel('./data/bba_electives_info.xlsx')
+    # -- Store entry, evicting least recently used entries beyond max_entries:
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits, self.misses, self.evictions = 0, 0, 0
+
+    # -- Return list of (key, value) from least to most recently used (without marking them used):
+
+    def items(self):
+        with self._lock:
+            return list(self._entries.items())
+
+    # -- Return dictionary of cache size, hit rate & evictions:
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions
+        }
 
-# -- Read BBA Requirements:
-with open('./data/bba_requirements.json') as f:
-    bba_requirements = json.load(f)
+# -- Raw readers for each App-related artifact:
 
-# -- Read Demand Vacancy Compiled Data:
-demand_vacancy_data = pd.read_csv('./data/demand_allocation.csv')
+def _read_pickle(file_path):
+    with open(file_path, 'rb') as f:
+        return pickle.load(f)
 
-# -- Read GE Modules:
-ge_mods = pd.read_excel("./data/nus_ge_requirements.xlsx")
+def _read_json(file_path):
+    with open(file_path) as f:
+        return json.load(f)
 
-# -- Read Recommender Module Ranking:
-with open('./data/bba_electives_ranking.pkl', 'rb') as f:
-        bba_electives_ranking = pickle.load(f)
+# -- Schema metadata key under which build_data_artifacts.py stores the sha256 of the source file of an artifact:
+
+ARTIFACT_SOURCE_HASH_KEY = b'source_sha256'
+
+# -- Returns sha256 hex digest of a reference data file:
+
+def hash_data_file(file_path):
+    return hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+
+# -- Returns memory-mapped Arrow table of a columnar artifact (built by build_data_artifacts.py), None if it is missing,
+#    pyarrow is not installed, or it is stale: built from another version of its source file (e.g popularity_ranker.py
+#    or course_description_from_API.py was re-run since), checked only if a source file is given:
+
+def open_data_artifact(name, source=None, columns=None):
+    artifact_path = Path(f'./data/{name}.feather')
+    if not artifact_path.exists():
+        return None
+    try:
+        from pyarrow import feather
+    except ImportError:                 # pyarrow not installed
+        return None
+    table = feather.read_table(artifact_path, columns=columns, memory_map=True)
+    if source is not None:
+        source_hash = (table.schema.metadata or {}).get(ARTIFACT_SOURCE_HASH_KEY)
+        if source_hash != hash_data_file(source).encode():
+            return None
+    return table
+
+# -- Reads a columnar artifact, falling back to read_source(source) if the artifact is missing or stale:
+
+def read_data_artifact(name, source, read_source, columns=None):
+    table = open_data_artifact(name, source, columns=columns)
+    if table is not None:
+        return table.to_pandas()
+    df = read_source(source)
+    return df[columns] if columns is not None else df
+
+# -- Columnar artifacts are read with only the columns the app uses (the other columns are never read from disk):
+
+data_registry = DataRegistry()
+data_registry.register('bba_electives_description', lambda: read_data_artifact(
+    'bba_electives_description', './data/bba_electives_description.pkl', _read_pickle
+))
+data_registry.register('bba_electives_info', lambda: read_data_artifact(     # whole: re-saved by course_description_from_API.py
+    'bba_electives_info', './data/bba_electives_info.xlsx', pd.read_excel
+))
+data_registry.register('ge_requirements', lambda: read_data_artifact(
+    'ge_requirements', './data/nus_ge_requirements.xlsx', pd.read_excel, columns=['Module_Code', 'Pillar']
+))
+data_registry.register('bba_electives_ranking', lambda: read_data_artifact(
+    'bba_electives_ranking', './data/bba_electives_ranking.pkl', _read_pickle
+))
+data_registry.register('bba_electives_demand_vacancy_data', lambda: read_data_artifact(
+    'bba_electives_demand_vacancy_data', './data/bba_electives_demand_vacancy_data.pkl', _read_pickle,
+    columns=['Module_Code', 'Academic_Term', 'Demand']
+))
+data_registry.register('bba_requirements', lambda: _read_json('./data/bba_requirements.json'))
+data_registry.register('demand_vacancy_data', lambda: pd.read_csv('./data/demand_allocation.csv'))
+data_registry.register('requirements_index', lambda: compile_requirements_index(load_bba_requirements()))
+data_registry.register('ge_pillar_index', lambda: compile_ge_pillar_index(load_ge_requirements()))
+data_registry.register('degree_rules_spec', lambda: _read_json('./data/degree_rules.json'))
+data_registry.register('module_vocabulary', lambda: compile_module_vocabulary(
+    list(load_bba_electives_info()['Module_Code']) + list(load_ge_requirements()['Module_Code']) +
+    _rule_spec_courses(load_bba_requirements(), data_registry.get('degree_rules_spec'))
+))
+data_registry.register('degree_rules', lambda: compile_degree_rules(
+    load_bba_requirements(), data_registry.get('degree_rules_spec'), load_ge_requirements(), load_module_vocabulary()
+))
+data_registry.register('cohort_percentiles', lambda: compile_cohort_percentiles(
+    read_data_artifact(                 # built from a cohort file outside ./data: no source to check
+        'cohort_percentiles', None, lambda _: pd.DataFrame({'Track': pd.Series(dtype=str), 'CGPA': pd.Series(dtype=float)})
+    )
+))
+
+#######################
+# Compiled Requirements Index (built once from bba_requirements.json)
+
+BBA_CORE_TRACKS = frozenset({'BBA-BE', 'BBA-BF', 'BBA-FSP'})
+
+# -- Requirements of a single track (e.g BBA-FIN):
+
+@dataclass(frozen=True)
+class TrackRequirements:
+    track: str
+    required_courses: frozenset = frozenset()
+    required_units: int = 0
+    electives_3000: frozenset = frozenset()
+    electives_3000_units: int = 0
+    electives_4000: frozenset = frozenset()
+    electives_4000_units: int = 0
+
+    @property
+    def is_core(self):
+        return self.track in BBA_CORE_TRACKS
+
+# -- Immutable index of all tracks and modules:
+
+@dataclass(frozen=True)
+class RequirementsIndex:
+    tracks: MappingProxyType                        # { track : TrackRequirements }
+    module_track: MappingProxyType                  # { module : track }, last track listing the module wins
+    all_bba_electives: tuple                        # major (non-core) modules in requirements order
+
+    # -- Returns TrackRequirements of track (empty requirements for unknown tracks):
+
+    def track(self, name):
+        return self.tracks.get(name) or TrackRequirements(track=name)
+
+def compile_requirements_index(bba_requirements):
+    tracks, module_track, all_bba_electives = {}, {}, []
+
+    for track, data in bba_requirements.items():
+        required = data.get('Required_Courses', [])
+        L3000 = data.get('3000_Electives', {})
+        L4000 = data.get('4000_Electives', {})
+
+        tracks[track] = TrackRequirements(
+            track=track,
+            required_courses=frozenset(required),
+            required_units=data.get('Required_Units', 0),
+            electives_3000=frozenset(L3000.get('Courses', [])),
+            electives_3000_units=L3000.get('Required_Units', 0),
+            electives_4000=frozenset(L4000.get('Courses', [])),
+            electives_4000_units=L4000.get('Required_Units', 0)
+        )
+
+        for courses in (required, L3000.get('Courses', []), L4000.get('Courses', [])):
+            for mod in courses:
+                module_track[mod] = track
+            if track not in BBA_CORE_TRACKS:
+                all_bba_electives.extend(courses)
+
+    return RequirementsIndex(
+        tracks=MappingProxyType(tracks),
+        module_track=MappingProxyType(module_track),
+        all_bba_electives=tuple(all_bba_electives)
+    )
+
+#######################
+# Compiled GE Pillar Index (built once from nus_ge_requirements.xlsx)
+
+# -- Immutable hash index of GE modules { module : pillar }:
+
+@dataclass(frozen=True)
+class GEPillarIndex:
+    module_pillar: MappingProxyType                 # { module : pillar }, first listing of a module wins
+
+    # -- Returns boolean mask of module codes (array/Series) that are not in the GE list:
+
+    def unknown_modules(self, module_codes):
+        return ~pd.Series(module_codes).isin(self.module_pillar.keys()).to_numpy()
+
+def compile_ge_pillar_index(ge_requirements):
+    module_pillar = {}
+    for module_code, pillar in zip(ge_requirements['Module_Code'], ge_requirements['Pillar']):
+        module_pillar.setdefault(module_code, pillar)
+    return GEPillarIndex(module_pillar=MappingProxyType(module_pillar))
+
+#######################
+# Module Vocabulary (built once from bba_electives_info.xlsx, nus_ge_requirements.xlsx & the requirement rules)
+
+# -- Interned module codes { module : id }, shared by every session. A set of modules is represented either as
+#    an int bitset (bit i set when module i is in the set) or as a boolean mask of length len(codes);
+#    many students at once are a boolean matrix (one row per student), so set operations become array operations:
+
+@dataclass(frozen=True, eq=False)
+class ModuleVocabulary:
+    codes: tuple                                    # module code of each id
+    ids: MappingProxyType                           # { module : id }
+    index: pd.Index                                 # codes as an Index, for vectorized lookups
+
+    def __len__(self):
+        return len(self.codes)
+
+    # -- Returns array of ids of module codes (array/Series), -1 for codes outside the vocabulary:
+
+    def encode(self, module_codes):
+        return self.index.get_indexer(module_codes)
+
+    # -- Returns boolean mask of module codes (codes outside the vocabulary are ignored):
+
+    def mask_of(self, module_codes):
+        return self.mask_from_ids(self.encode(module_codes))
+
+    def mask_from_ids(self, ids):
+        mask = np.zeros(len(self.codes), dtype=bool)
+        mask[ids[ids >= 0]] = True
+        return mask
+
+    # -- Conversions between boolean masks & int bitsets:
+
+    def bits_from_mask(self, mask):
+        return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+    def mask_from_bits(self, bits):
+        packed = np.frombuffer(bits.to_bytes((len(self.codes) + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(packed, bitorder='little', count=len(self.codes)).astype(bool)
+
+    # -- Returns bitset of module codes (codes outside the vocabulary are ignored):
+
+    def bits_of(self, module_codes):
+        bits = 0
+        for code in module_codes:
+            bit = self.ids.get(code)
+            if bit is not None:
+                bits |= 1 << bit
+        return bits
+
+    # -- Returns list of module codes in a bitset (in vocabulary order):
+
+    def codes_of(self, bits):
+        codes = []
+        while bits:
+            lowest = bits & -bits
+            codes.append(self.codes[lowest.bit_length() - 1])
+            bits ^= lowest
+        return codes
+
+    # -- Returns (Index of students, boolean matrix [student, module]) from parallel arrays of student keys & module codes:
+
+    def encode_matrix(self, student_keys, module_codes):
+        rows, students = pd.factorize(pd.Series(student_keys))
+        ids = self.encode(module_codes)
+        matrix = np.zeros((len(students), len(self.codes)), dtype=bool)
+        matrix[rows[ids >= 0], ids[ids >= 0]] = True
+        return pd.Index(students), matrix
+
+def compile_module_vocabulary(module_codes):
+    codes = tuple(sorted({str(code) for code in module_codes if pd.notna(code)}))
+    return ModuleVocabulary(codes=codes, ids=MappingProxyType({code : i for i, code in enumerate(codes)}), index=pd.Index(codes))
+
+#######################
+# Compiled Degree Rules (declarative rules evaluated on integer bitsets)
+#   - BBA tracks are read from bba_requirements.json (Required_Courses, 3000_Electives, 4000_Electives
+#     or an explicit Rules list);
+#   - GE, UE, MAJOR-* & MINOR-* are read from the Tracks of degree_rules.json ('*' matches any suffix),
+#     as is Double_Count_Units, the units that may count towards two tracks (see assign_track_modules);
+#   - Rule types: required_all (Courses), choose_units (Courses, Units), pillar_coverage (Pillars of the GE list),
+#     unit_total (Units);
+#   - A track's completion rate is (sum of credited) / (sum of required) over its rules.
+
+# -- A single compiled rule:
+
+@dataclass(frozen=True)
+class RequirementRule:
+    kind: str                                       # 'required_all' | 'choose_units' | 'pillar_coverage' | 'unit_total'
+    bits: int = 0                                   # modules of the rule (required_all, choose_units)
+    pillars: tuple = ()                             # ((pillar, bits), ...) (pillar_coverage)
+    units: int = 0                                  # units to complete (choose_units, unit_total)
+    units_per_module: int = 4                       # (choose_units)
+    label: str = ''                                 # status line of remaining units, formatted with {remaining} & {track}
+
+    # -- Returns (credited, required, list of remaining requirements) for modules taken (bitset) & units taken:
+
+    def evaluate(self, vocabulary, track, taken_bits, taken_units):
+        if self.kind == 'required_all':
+            missing = self.bits & ~taken_bits
+            required = self.bits.bit_count()
+            return required - missing.bit_count(), required, vocabulary.codes_of(missing)
+
+        if self.kind == 'choose_units':
+            required = self.units // self.units_per_module
+            credited = min((self.bits & taken_bits).bit_count(), required)
+            remaining = self.units - credited * self.units_per_module
+            return credited, required, [self.label.format(remaining=remaining, track=track)] if remaining > 0 else []
+
+        if self.kind == 'pillar_coverage':
+            missing = [pillar for pillar, bits in self.pillars if not bits & taken_bits]
+            return len(self.pillars) - len(missing), len(self.pillars), missing
+
+        if self.kind == 'unit_total':
+            remaining = self.units - taken_units
+            status = [self.label.format(remaining=remaining, track=track)] if remaining > 0 else []
+            return min(taken_units, self.units), self.units, status
+
+        raise ValueError(f"Unknown rule type '{self.kind}'")
+
+# -- Immutable rules of every track:
+
+@dataclass(frozen=True)
+class DegreeRules:
+    vocabulary: ModuleVocabulary
+    tracks: MappingProxyType                        # { track : (RequirementRule, ...) }
+    wildcards: tuple                                # ((track prefix, (RequirementRule, ...)), ...) e.g ('MAJOR-', ...)
+    double_count_units: int = 0                     # units that may count towards two tracks
+
+    # -- Returns how many modules may count towards two tracks: modules are counted at DOUBLE_COUNT_MODULE_UNITS MCs,
+    #    the units per module of the elective rules (a 2-MC module takes a 4-MC share of the limit):
+
+    @property
+    def double_count_limit(self):
+        return self.double_count_units // DOUBLE_COUNT_MODULE_UNITS
+
+    # -- Returns rules of track (None for tracks without rules):
+
+    def rules_of(self, track):
+        rules = self.tracks.get(track)
+        if rules is None:
+            rules = next((rules for prefix, rules in self.wildcards if track.startswith(prefix)), None)
+        return rules
+
+    # -- Returns (Completion_Rate, Completion_Status) of track for modules taken (bitset) & units taken,
+    #    None for tracks without rules:
+
+    def evaluate(self, track, taken_bits, taken_units=0):
+        rules = self.rules_of(track)
+        if rules is None:
+            return None
+
+        credited, required, completion_status = 0, 0, []
+        required_bits = 0
+        for rule in rules:
+            # electives are chosen from modules not already counted as required courses of the track
+            available_bits = taken_bits & ~required_bits if rule.kind == 'choose_units' else taken_bits
+            rule_credited, rule_required, rule_status = rule.evaluate(self.vocabulary, track, available_bits, taken_units)
+            credited, required = credited + rule_credited, required + rule_required
+            completion_status.extend(rule_status)
+            if rule.kind == 'required_all':
+                required_bits |= rule.bits
+        return (round(credited / required, 2) if required else 0, completion_status)
+
+# -- Returns list of rule specifications { Type, ... } of a bba_requirements.json entry:
+
+def _bba_rule_specs(data):
+    if 'Rules' in data:
+        return data['Rules']
+    specs = [{'Type': 'required_all', 'Courses': data['Required_Courses']}] if data.get('Required_Courses') else []
+    for level in ['3000', '4000']:
+        electives = data.get(f'{level}_Electives')
+        if electives:
+            specs.append({'Type': 'choose_units', 'Courses': electives['Courses'], 'Units': electives['Required_Units'],
+                          'Label': f"{{remaining}} MCs of {level[0]}K {{track}} modules"})
+    return specs
+
+# -- Returns list of every module code listed in the rule specifications:
+
+def _rule_spec_courses(bba_requirements, degree_rules_spec):
+    rule_specs = [_bba_rule_specs(data) for data in bba_requirements.values()] + list(degree_rules_spec['Tracks'].values())
+    return [code for rules in rule_specs for rule in rules for code in rule.get('Courses', [])]
+
+def compile_degree_rules(bba_requirements, degree_rules_spec, ge_requirements, vocabulary):
+    specs = {track : _bba_rule_specs(data) for track, data in bba_requirements.items()}
+    specs.update(degree_rules_spec['Tracks'])
+
+    ge_pillar_bits = {}
+    for module_code, pillar in compile_ge_pillar_index(ge_requirements).module_pillar.items():
+        ge_pillar_bits[pillar] = ge_pillar_bits.get(pillar, 0) | (1 << vocabulary.ids[module_code])
+
+    def compile_rule(spec):
+        return RequirementRule(
+            kind=spec['Type'],
+            bits=vocabulary.bits_of(spec.get('Courses', [])),
+            pillars=tuple((pillar, ge_pillar_bits.get(pillar, 0)) for pillar in spec.get('Pillars', [])),
+            units=spec.get('Units', 0),
+            units_per_module=spec.get('Units_Per_Module', 4),
+            label=spec.get('Label', '')
+        )
+
+    tracks, wildcards = {}, []
+    for track, rules in specs.items():
+        compiled = tuple(compile_rule(spec) for spec in rules)
+        if track.endswith('*'):
+            wildcards.append((track[:-1], compiled))
+        else:
+            tracks[track] = compiled
+
+    return DegreeRules(vocabulary=vocabulary, tracks=MappingProxyType(tracks), wildcards=tuple(wildcards),
+                       double_count_units=degree_rules_spec.get('Double_Count_Units', 0))
+
+#######################
+# Multi-track Module Assignment (max-flow from modules taken to the requirement slots of the tracks pursued)
+#   - Each module taken counts towards one track where its rules list it, or two tracks for up to
+#     DegreeRules.double_count_limit modules (Double_Count_Units of degree_rules.json);
+#   - Only course-based rules (required_all, choose_units) are assigned, unit-based rules keep the modules of their Module_Type;
+#   - Modules are first assigned to the track the student typed (Module_Type), then re-routed wherever that fills more
+#     requirement slots in total: the flow maximises the number of slots filled over all tracks, not the sum of completion
+#     rates, where a slot counts 1 / (slots of its track);
+#   - No track is credited less than the modules typed under it: e.g a student who typed more double-counted modules than
+#     the limit allows keeps the typed modules of every track the flow would credit less.
+
+DOUBLE_COUNT_MODULE_UNITS = 4
+
+# -- Max-flow on a small graph (Ford-Fulkerson with depth-first augmenting paths; flows here are at most a few dozen units):
+
+class MaxFlow:
+
+    def __init__(self):
+        self.edges = []                             # [head, residual capacity] pairs, edge i ^ 1 is the reverse of edge i
+        self.adjacency = {}                         # { node : [edge indices] }
+
+    # -- Add edge with capacity, returns its index (flow on it = capacity of its reverse edge i ^ 1):
+
+    def add_edge(self, tail, head, capacity):
+        self.adjacency.setdefault(tail, []).append(len(self.edges))
+        self.edges.append([head, capacity])
+        self.adjacency.setdefault(head, []).append(len(self.edges))
+        self.edges.append([tail, 0])
+        return len(self.edges) - 2
+
+    def flow_on(self, edge):
+        return self.edges[edge ^ 1][1]
+
+    # -- Push one unit along path (list of edge indices) if every edge has capacity left, returns whether it did:
+
+    def push(self, path):
+        if any(self.edges[edge][1] <= 0 for edge in path):
+            return False
+        for edge in path:
+            self.edges[edge][1] -= 1
+            self.edges[edge ^ 1][1] += 1
+        return True
+
+    # -- Augment from the current flow until no augmenting path is left, returns flow added:
+
+    def augment(self, source, sink):
+        added = 0
+        while True:
+            visited = {source}
+            path = self._find_path(source, sink, visited)
+            if path is None:
+                return added
+            for edge in path:
+                self.edges[edge][1] -= 1
+                self.edges[edge ^ 1][1] += 1
+            added += 1
+
+    def _find_path(self, source, sink, visited):
+        stack = [(source, iter(self.adjacency.get(source, ())))]
+        path = []
+        while stack:
+            node, edges = stack[-1]
+            for edge in edges:
+                head, capacity = self.edges[edge]
+                if capacity > 0 and head not in visited:
+                    visited.add(head)
+                    path.append(edge)
+                    if head == sink:
+                        return path
+                    stack.append((head, iter(self.adjacency.get(head, ()))))
+                    break
+            else:
+                stack.pop()
+                if path:
+                    path.pop()
+        return None
+
+# -- Returns { track : bitset of modules credited } for the tracks with course-based rules,
+#    given { Module_Type : bitset of modules taken }:
+
+def assign_track_modules(rules, tracks, track_bits):
+    taken_bits = 0
+    for bits in track_bits.values():
+        taken_bits |= bits
+
+    # nodes: 'source', 'sink', 'double', module id, (module id, track), (track, rule index)
+    network = MaxFlow()
+    assignments = {}                                # { (module id, track) : edge index }
+    slot_edges = {}                                 # { (module id, track) : [(edge to rule, edge from rule to sink), ...] }
+    typed_edges, other_edges = [], []
+    credited = {}
+
+    for track in sorted(tracks):                   # sorted: ties are broken the same way whatever the order tracks come in
+        if any(rule.kind in ('required_all', 'choose_units') for rule in rules.rules_of(track) or ()):
+            credited[track] = 0
+        required_bits = 0
+        for i, rule in enumerate(rules.rules_of(track) or ()):
+            if rule.kind == 'required_all':
+                eligible, capacity = rule.bits & taken_bits, rule.bits.bit_count()
+                required_bits |= rule.bits
+            elif rule.kind == 'choose_units':
+                # electives are chosen from modules not already counted as required courses of the track
+                eligible, capacity = rule.bits & ~required_bits & taken_bits, rule.units // rule.units_per_module
+            else:
+                continue
+            if not eligible:
+                continue
+            sink_edge = network.add_edge((track, i), 'sink', capacity)
+            for module in _bit_positions(eligible):
+                if (module, track) not in assignments:
+                    assignments[(module, track)] = None
+                    (typed_edges if track_bits.get(track, 0) >> module & 1 else other_edges).append((module, track))
+                slot_edges.setdefault((module, track), []).append((network.add_edge((module, track), (track, i), 1), sink_edge))
+
+    modules = sorted({module for module, _ in assignments})
+    source_edges = {module : network.add_edge('source', module, 1) for module in modules}
+    double_edge = network.add_edge('source', 'double', rules.double_count_limit)
+    double_edges = {module : network.add_edge('double', module, 1) for module in modules}
+
+    # typed assignments first, then every other track a module counts towards:
+    # direct paths are pushed greedily, augmenting paths then re-route modules wherever that credits more
+    for edges in (typed_edges, other_edges):
+        for module, track in edges:
+            edge = assignments[(module, track)] = network.add_edge(module, (module, track), 1)
+            for rule_edge, sink_edge in slot_edges[(module, track)]:
+                if (network.push([source_edges[module], edge, rule_edge, sink_edge]) or
+                        network.push([double_edge, double_edges[module], edge, rule_edge, sink_edge])):
+                    break
+        network.augment('source', 'sink')
+
+    for (module, track), edge in assignments.items():
+        if network.flow_on(edge):
+            credited[track] |= 1 << module
+
+    # tracks the flow credits less than the modules typed under them keep those
+    for track in credited:
+        typed_bits = track_bits.get(track, 0)
+        if rules.evaluate(track, typed_bits)[0] > rules.evaluate(track, credited[track])[0]:
+            credited[track] = typed_bits
+    return credited
+
+# -- Returns list of the positions of the set bits of an integer bitset:
+
+def _bit_positions(bits):
+    positions = []
+    while bits:
+        lowest = bits & -bits
+        positions.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return positions
+
+#######################
+# Cohort Percentiles (reference artifact built by build_data_artifacts.py from an anonymized cohort)
+#   - One sorted array of CGPAs per track, plus COHORT_OVERALL for the overall CGPA: no student identifiers are stored;
+#   - Percentiles are looked up by binary search, so rendering never aggregates the cohort.
+
+COHORT_OVERALL = 'Overall'
+
+@dataclass(frozen=True, eq=False)
+class CohortPercentiles:
+    tracks: MappingProxyType                        # { track : sorted np.ndarray of CGPAs }
+
+    # -- Returns percentile rank (0-100) of cgpa within the track's cohort (ties count half), None if the track has no reference:
+
+    def percentile(self, track, cgpa):
+        values = self.tracks.get(track)
+        if values is None or cgpa is None or np.isnan(cgpa):
+            return None
+        below = np.searchsorted(values, cgpa, side='left')
+        at_or_below = np.searchsorted(values, cgpa, side='right')
+        return 100 * (below + at_or_below) / (2 * len(values))
+
+def compile_cohort_percentiles(df):
+    tracks = {
+        str(track) : np.sort(values.to_numpy(dtype=float))
+        for track, values in df.groupby('Track', observed=True, sort=False)['CGPA']
+    }
+    return CohortPercentiles(tracks=MappingProxyType(tracks))
+
+# -- Returns percentile rank formatted for display (e.g 'Top 12%', 'Bottom 30%'), '' if there is no reference:
+
+def format_percentile(percentile):
+    if percentile is None:
+        return ''
+    if percentile >= 50:
+        return f"Top {max(1, round(100 - percentile))}%"
+    return f"Bottom {max(1, round(percentile))}%"
 
-#-- Read Recommender Module Demand-Vacancy:
-with open('./data/bba_electives_demand_vacancy_data.pkl', 'rb') as f:
-        bba_electives_demand_vacancy_data = pickle.load(f)
-    
 #######################
 # Helper Functions to Load App-related Data
 
 def load_bba_electives_description():
-    return course_descriptions
+    return data_registry.get('bba_electives_description')
 
 def load_bba_electives_info():
-    return bba_electives_info
+    return data_registry.get('bba_electives_info')
 
 def load_bba_requirements():
-    return bba_requirements
+    return data_registry.get('bba_requirements')
 
 def load_bba_electives_ranking():
-    return bba_electives_ranking
+    return data_registry.get('bba_electives_ranking')
 
 def load_bba_electives_demand_vacancy_data():
-    return bba_electives_demand_vacancy_data
+    return data_registry.get('bba_electives_demand_vacancy_data')
 
 def load_demand_vacancy_data():
-    return demand_vacancy_data
+    return data_registry.get('demand_vacancy_data')
 
 def load_ge_requirements():
-    return ge_mods
+    return data_registry.get('ge_requirements')
+
+def load_requirements_index():
+    return data_registry.get('requirements_index')
+
+def load_ge_pillar_index():
+    return data_registry.get('ge_pillar_index')
+
+def load_module_vocabulary():
+    return data_registry.get('module_vocabulary')
+
+def load_degree_rules():
+    return data_registry.get('degree_rules')
+
+def load_cohort_percentiles():
+    return data_registry.get('cohort_percentiles')
+
+# -- Returns Dataframe of per-artifact load time & memory:
+
+def load_data_registry_report():
+    return data_registry.report()
 
 #######################
 # Helper Functions
 
+# -- A message for the UI to render (level is 'error', 'warning' or 'info'):
+
+@dataclass(frozen=True)
+class Diagnostic:
+    level: str
+    message: str
+
 # -- Returns dictionary of {letter grade : numerical grade}:
 
 def get_grade_mapping():
@@ -89,62 +797,81 @@ def get_grade_mapping():
 
 # -- Returns numerical grade of a letter grade:
 
-def grade_point_mapper(grade):
+def grade_point_mapper(grade, diagnostics=None):
     grade_mapping = get_grade_mapping()
     if grade in grade_mapping.keys():
         return grade_mapping[grade]
     else:
-        st.warning(f"Unrecognized grade: '{grade}' — unable to map to GPA.")
+        if diagnostics is not None:
+            diagnostics.append(Diagnostic('warning', f"Unrecognized grade: '{grade}' — unable to map to GPA."))
         return None  # or a default value like 0.0 or np.nan
 
+# -- Grade vocabulary & grade-point array in the same order (last slot is NaN for unrecognized grades):
+
+GRADES = tuple(get_grade_mapping().keys())
+GRADE_POINTS = np.array(list(get_grade_mapping().values()) + [np.nan], dtype=float)
+
+# -- Returns Series of numerical grades of a Series of letter grades (categorical codes index GRADE_POINTS):
+
+def map_grade_points(grades):
+    codes = pd.Categorical(grades, categories=GRADES).codes            # -1 for unrecognized grades
+    return pd.Series(GRADE_POINTS[codes], index=grades.index, name=grades.name)
+
 # -- Returns list of BBA Electives across all Majors:
 
 def return_all_bba_electives():
-    res = []
-    for track, data in bba_requirements.items():
-        if track not in ['BBA-BE', 'BBA-BF', 'BBA-FSP']:
-            if track == 'BBA-ACC':
-                required_courses_list = data.get('Required_Courses')
-                res.extend(required_courses_list)
-            else:
-                required_courses_list = data.get('Required_Courses')
-                L3000_electives = data.get('3000_Electives').get('Courses')
-                L4000_electives = data.get('4000_Electives').get('Courses')
-                res.extend(required_courses_list)
-                res.extend(L3000_electives)
-                res.extend(L4000_electives)
-    return list(res)
+    return list(load_requirements_index().all_bba_electives)
     
 # -- Returns dictionary of {Module : Module_Type}
 
 def return_flatten_bba_electives():
-    res = {}
-    for track, data in bba_requirements.items():
-        for mod in data.get('Required_Courses'):
-            res[mod] = track
-        
-        if '3000_Electives' in data:
-            for mod in data.get('3000_Electives').get('Courses'):
-                res[mod] = track
-        
-        if '4000_Electives' in data:
-            for mod in data.get('4000_Electives').get('Courses'):
-                res[mod] = track
-    return res
+    return dict(load_requirements_index().module_track)
+
+# -- Returns BBA majors (non-core BBA tracks) among tracks, in the given order:
+
+def return_major_options(tracks):
+    return [track for track in tracks if (
+        track.startswith('BBA-') and
+        track not in BBA_CORE_TRACKS
+    )]
+
+# -- Adds derived columns needed by the User model (GPA, Term, Module_Type_UE) in place,
+#    appending a Diagnostic to {diagnostics} for every unrecognized grade:
+
+def prepare_transcript(df, main_major, diagnostics=None):
+    df['GPA'] = map_grade_points(df['Grade'])
+    if diagnostics is not None:
+        for grade in df.loc[df['GPA'].isnull(), 'Grade'].unique():
+            diagnostics.append(Diagnostic('warning', f"Unrecognized grade: '{grade}' — unable to map to GPA."))
+    df['Term'] = (df['Year'].astype(str) + df['Semester'].astype(str)).astype(int)
+    df['Module_Type_UE'] = df['Module_Type'].apply(lambda x : module_type_ue(x, main_major))
+    return df
+
+# -- Returns UE view of a module type: core, GE & main major modules keep their type, every other module counts as 'UE':
+
+def module_type_ue(module_type, main_major):
+    return (
+        module_type if module_type in ['BBA-BE', 'BBA-BF', 'BBA-FSP', 'GE', 'UE', main_major] else
+        'UE' if module_type.startswith('MINOR-') else
+        'UE' if module_type.startswith('MAJOR-') else
+        'UE'
+    )
 
 # -- Returns Degree Classification based on CGPA:
 
+DEGREE_CLASS_BANDS = [
+    (4.5, "Honours | Highest Distinction"),
+    (4, "Honours | Distinction"),
+    (3.5, "Honours | Merit"),
+    (3, "Honours"),
+    (0, "Pass")
+]
+
 def degree_classifier(cgpa):
-    if cgpa >= 4.5:
-        return "Honours | Highest Distinction"
-    elif cgpa >= 4:
-        return "Honours | Distinction"
-    elif cgpa >= 3.5:
-        return "Honours | Merit"
-    elif cgpa >= 3:
-        return "Honours"
-    else:
-        return "Pass"
+    for min_cgpa, degree_class in DEGREE_CLASS_BANDS:
+        if cgpa >= min_cgpa:
+            return degree_class
+    return "Pass"
     
 # -- Constructs a proper Pandas Dataframe of User Progression Dictionary:
 
@@ -171,7 +898,7 @@ def normalize_completion_status(completion_status):
         res = pd.DataFrame(rows)
 
         res['Completion_Rate'].fillna(0, inplace=True)
-        res['Completion_Status'] = res['Completion_Status'].apply(lambda x: x if isinstance(x, list) else [])
+        res['Completion_Status'] = res['Completion_Status'].apply(lambda x: list(x) if isinstance(x, (list, tuple)) else [])
         res['CGPA'].fillna(0, inplace=True)
         return pd.DataFrame(res)
 
@@ -209,6 +936,42 @@ def round_half_up(value, decimals=2):
     value = Decimal(str(value))
     rounding_target = Decimal('1.' + '0' * decimals)
     return float(value.quantize(rounding_target, rounding=ROUND_HALF_UP))
+
+# -- Vectorized round_half_up over an array/Series, same result as round_half_up for values already at {decimals} decimals
+#    and for CGPA quotients (grade points in multiples of 0.5 x whole units, over whole units): only these are passed to it.
+#    Other values within 1e-9 of a tie are rounded as the tie (e.g 2.6749999999999 gives 2.68, round_half_up gives 2.67):
+
+def round_half_up_array(values, decimals=2):
+    scale = 10 ** decimals
+    # absorb binary error, e.g 2.675 * 100 = 267.49999999999997
+    scaled = np.round(np.asarray(values, dtype=float) * scale, 9)
+    return np.sign(scaled) * np.floor(np.abs(scaled) + 0.5) / scale
+
+# -- Returns CGPA rounded half-up to 2 decimals, computed exactly in integer half-points when
+#    grade points are multiples of 0.5 and units are whole numbers (same result as round_half_up):
+
+def compute_exact_cgpa(grade_points, units):
+    grade_points = np.asarray(grade_points, dtype=float)
+    units = np.asarray(units, dtype=float)
+    half_points = grade_points * 2
+    total_units = units.sum()
+
+    if total_units > 0 and np.all(half_points == np.round(half_points)) and np.all(units == np.round(units)):
+        return cgpa_from_totals((half_points * units).sum(), total_units)
+
+    return round_half_up(np.sum(grade_points * units) / total_units)
+
+# -- Returns CGPA from pre-aggregated sums of (grade points x 2 x units) & units
+#    (exact=True when every summed grade point is a multiple of 0.5 and every unit a whole number):
+
+def cgpa_from_totals(weighted_half_points, total_units, exact=True):
+    if exact and total_units > 0:
+        weighted_half_points = int(weighted_half_points)              # integer-valued, exact well below 2**53
+        total_units = int(total_units)
+        return ((100 * weighted_half_points + total_units) // (2 * total_units)) / 100
+
+    return round_half_up(np.float64(weighted_half_points) / 2 / np.float64(total_units))
+
 # - Converts excel data into bytes (for sample download):
 
 def load_excel_file_bytes(file_path):
@@ -230,140 +993,611 @@ def rem_to_px(rem):
 #######################
 # Helper Functions to Load User Excel File:
 
-# -- Column Checking:
+# -- Upload Schema { Column : Expected Type }:
+
+EXPECTED_COLUMNS = ['Module_Code', 'Module_Title', 'Year', 'Semester', 'Units', 'Module_Type', 'Grade']
+
+EXPECTED_TYPES = {
+    'Module_Code': str,
+    'Module_Title': str,
+    'Year': int,
+    'Semester': int,
+    'Units': int,
+    'Module_Type': str,
+    'Grade': str
+}
+
+ALLOWED_MODULE_TYPES = frozenset({
+    'BBA-BE', 'BBA-BF', 'BBA-FSP', 'GE', 'UE',
+    'BBA-BZA', 'BBA-MKT', 'BBA-FIN', 'BBA-BSN',
+    'BBA-BSE', 'BBA-DOS', 'BBA-RE', 'BBA-MNO', 'BBA-ACC'
+})
+
+# -- A single problem found in the uploaded data (rows are 0-based positions in the Dataframe):
 
-def validate_column(df, col, expected_type):
+@dataclass(frozen=True)
+class ValidationIssue:
+    column: str
+    message: str
+    rows: tuple = ()
+    values: tuple = ()
+    level: str = 'error'
+
+    # -- Rows as seen in Excel (header is row 1):
+
+    @property
+    def excel_rows(self):
+        return tuple(row + 2 for row in self.rows)
+
+# -- Returns positions of True values in a boolean Series:
+
+def _true_positions(mask):
+    return tuple(int(pos) for pos in mask.to_numpy().nonzero()[0])
+
+# -- Column Checking, returns list of every ValidationIssue found in column:
+
+def column_issues(df, col, expected_type):
 
     # 1. Check if column exists
     if col not in df.columns:
-        st.error(f"Column '{col}' is missing.")
-        return False
+        return [ValidationIssue(col, f"Column '{col}' is missing.")]
 
-    # 2. Check for null or empty values (NaN, empty strings)
+    issues = []
     col_data = df[col]
-    if col_data.isnull().any() or (col_data.astype(str).str.strip() == '').any():
-        st.error(f"Column '{col}' contains null or empty values.")
-        return False
 
-    # 3. Check if values match the expected data type
-    try:
-        if expected_type == int:
-            converted = pd.to_numeric(df[col], errors='raise')
-        elif expected_type == float:
-            converted = pd.to_numeric(df[col], errors='raise')
-        elif expected_type == str:
-            if not df[col].dropna().apply(lambda x: isinstance(x, str)).all():
-                st.error(f"Column '{col}' must contain only string values.")
-                return False
-        else:
-            st.error(f"Unsupported data type check for column '{col}'.")
-            return False
+    # 2. Check for null or empty values (NaN, empty strings)
+    null_mask = col_data.isnull() | (col_data.astype(str).str.strip() == '')
+    if null_mask.any():
+        issues.append(ValidationIssue(col, f"Column '{col}' contains null or empty values.", rows=_true_positions(null_mask)))
+
+    # 3. Check if (non-null) values match the expected data type
+    if expected_type in (int, float):
+        invalid_mask = ~null_mask & pd.to_numeric(col_data, errors='coerce').isnull()
+        if invalid_mask.any():
+            issues.append(ValidationIssue(col, f"Column '{col}' must contain only {expected_type.__name__} values. \
+                 Please check again for typo/misspelled/invalid data in this column.",
+                 rows=_true_positions(invalid_mask), values=tuple(col_data[invalid_mask].unique())))
+        return issues
+
+    elif expected_type == str:
+        invalid_mask = pd.Series(False, index=col_data.index)
+        if pd.api.types.infer_dtype(col_data[~null_mask], skipna=True) not in ('string', 'empty'):
+            invalid_mask = ~null_mask & (col_data.map(type) != str)
+            issues.append(ValidationIssue(col, f"Column '{col}' must contain only string values.",
+                                          rows=_true_positions(invalid_mask), values=tuple(col_data[invalid_mask].unique())))
     
-    except Exception as e:
-        st.error(f"Column '{col}' must contain only {expected_type.__name__} values. \
-                 Please check again for typo/misspelled/invalid data in this column.")
-        return False
+    else:
+        return issues + [ValidationIssue(col, f"Unsupported data type check for column '{col}'.")]
+
+    checked_mask = ~(null_mask | invalid_mask)
+    values = col_data.astype(str).str.strip().str.upper()
     
     # 4. Special Check for Module_Type
     if col == 'Module_Type':
-        allowed_MODULE_TYPES = {
-            'BBA-BE', 'BBA-BF', 'BBA-FSP', 'GE', 'UE',
-            'BBA-BZA', 'BBA-MKT', 'BBA-FIN', 'BBA-BSN',
-            'BBA-BSE', 'BBA-DOS', 'BBA-RE', 'BBA-MNO', 'BBA-ACC'
-        }
-
-        def is_valid_MODULE_TYPE(value):
-            if pd.isnull(value):
-                return False
-            value = str(value).strip().upper()
-            return (
-                value in allowed_MODULE_TYPES or
-                value.startswith("MAJOR-") or
-                value.startswith("MINOR-")
-            )
-        
-        invalid_values = df[~df[col].apply(is_valid_MODULE_TYPE)][col].unique()
-        if len(invalid_values) > 0:
-            st.error(f"Column '{col}' contains invalid module types: {', '.join(map(str, invalid_values))}")
-            return False
+        invalid_mask = checked_mask & ~(values.isin(ALLOWED_MODULE_TYPES) | values.str.match(r'(MAJOR|MINOR)-'))
+        if invalid_mask.any():
+            invalid_values = col_data[invalid_mask].unique()
+            issues.append(ValidationIssue(
+                col, f"Column '{col}' contains invalid module types: {', '.join(map(str, invalid_values))}",
+                rows=_true_positions(invalid_mask), values=tuple(invalid_values)
+            ))
     
     # 5. Special Check for Grade
     if col == "Grade":
-
-        allowed_GRADES = set(get_grade_mapping().keys())
-
-        def is_valid_GRADE(value):
-            if pd.isnull(value):
-                return False
-            return str(value).strip().upper() in allowed_GRADES
-        
-        invalid_grades = df[~df[col].apply(is_valid_GRADE)][col].unique()
-        if len(invalid_grades) > 0:
-            st.error(f"Column '{col}' contains invalid grade types: {', '.join(map(str, invalid_grades))}")
-            return False
+        invalid_mask = checked_mask & ~values.isin(get_grade_mapping().keys())
+        if invalid_mask.any():
+            invalid_grades = col_data[invalid_mask].unique()
+            issues.append(ValidationIssue(
+                col, f"Column '{col}' contains invalid grade types: {', '.join(map(str, invalid_grades))}",
+                rows=_true_positions(invalid_mask), values=tuple(invalid_grades)
+            ))
       
-    # All checks passed
-    return True
+    return issues
+
+# -- Single pass over every column of the upload schema, returns list of every ValidationIssue found:
+
+def validate_uploaded_data(df, expected_types=EXPECTED_TYPES):
+    issues = []
+    for col, expected_type in expected_types.items():
+        issues.extend(column_issues(df=df, col=col, expected_type=expected_type))
+
+    # Check for exact duplicate rows (not double-counted or IP)
+    duplicate_mask = df.duplicated()
+    if duplicate_mask.any():
+        duplicate_codes = df.loc[duplicate_mask, 'Module_Code'].unique()
+        issues.append(ValidationIssue('', f"Your dataset contains duplicate row(s) for {duplicate_codes}. Please remove them.",
+                                      rows=_true_positions(duplicate_mask),
+                                      values=tuple(duplicate_codes)))
+
+    # Warn about GE modules missing from the NUS GE list (they count towards no pillar)
+    if {'Module_Code', 'Module_Type'} <= set(df.columns):
+        ge_mask = (df['Module_Type'] == 'GE').to_numpy()
+        unknown_mask = pd.Series(ge_mask, index=df.index)
+        unknown_mask[ge_mask] = load_ge_pillar_index().unknown_modules(df.loc[ge_mask, 'Module_Code'])
+        if unknown_mask.any():
+            unknown_codes = df.loc[unknown_mask, 'Module_Code'].unique()
+            issues.append(ValidationIssue('Module_Code',
+                 f"GE module(s) {', '.join(map(str, unknown_codes))} are not in the NUS GE list \
+                 and will not count towards any GE pillar.",
+                 rows=_true_positions(unknown_mask), values=tuple(unknown_codes), level='warning'))
+    return issues
+
+# -- Maximum number of data rows accepted per upload:
+
+MAX_UPLOAD_ROWS = 20000
+
+# -- Streams the 'data' sheet of an Excel file in read-only mode, keeping only EXPECTED_COLUMNS,
+#    returns (Dataframe or None, list of ValidationIssue):
+
+def read_workbook_data(uploaded_file, sheet_name='data', max_rows=MAX_UPLOAD_ROWS):
+    from openpyxl import load_workbook
 
-# -- Main Checks across entire dataset:
+    try:
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True, keep_links=False)
+    except Exception as e:
+        return None, [ValidationIssue('', "Error reading Excel file. Make sure it's properly formatted.")]
 
-def load_uploaded_data(uploaded_file):
     try:
-        df = pd.read_excel(uploaded_file, sheet_name='data')
-        EXPECTED_COLUMNS = ['Module_Code', 'Module_Title', 'Year', 'Semester', 'Units', 'Module_Type', 'Grade']
+        # Catch error if sheet name not properly formatted as 'data'
+        if sheet_name not in workbook.sheetnames:
+            return None, [ValidationIssue('', "Could not find the tab sheet 'data' in your excel file.")]
+
+        sheet = workbook[sheet_name]
+
+        # Catch error if sheet is empty / no data
+        header = next(sheet.iter_rows(max_row=1, values_only=True), None)
+        if header is None:
+            return None, [ValidationIssue('', "Could not find any data in your excel file.")]
+
+        # Check if expected columns are a subset of the uploaded columns (before reading any data row)
+        positions = {}
+        for pos, col in enumerate(header):
+            positions.setdefault(col, pos)
+        if not set(EXPECTED_COLUMNS).issubset(positions):
+            return None, [ValidationIssue('', f"The file is missing one or more required columns. \
+                 Please ensure the columns are exactly: {EXPECTED_COLUMNS}")]
+
+        # Read only the expected columns, up to {max_rows} rows
+        column_positions = [positions[col] for col in EXPECTED_COLUMNS]
+        width = max(column_positions) + 1
+        records = []
+        for row in sheet.iter_rows(min_row=2, max_col=width, values_only=True):
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            record = tuple(row[pos] for pos in column_positions)
+            if len(records) >= max_rows:
+                if any(value is not None for value in record):
+                    return None, [ValidationIssue(
+                        '', f"Your excel file has more than {max_rows} rows of data. Please split it into smaller files."
+                    )]
+                continue
+            records.append(record)
+    
+    except Exception as e:
+        return None, [ValidationIssue('', "Error reading Excel file. Make sure it's properly formatted.")]
+    
+    finally:
+        workbook.close()
+
+    # Drop trailing blank rows (read-only sheets may report stale dimensions)
+    while records and all(value is None for value in records[-1]):
+        records.pop()
+
+    if not records:
+        return None, [ValidationIssue('', "Could not find any data in your excel file.")]
+
+    return pd.DataFrame.from_records(records, columns=EXPECTED_COLUMNS), []
+
+# -- Detects upload format from file content (not extension): 'xlsx', 'parquet', 'jsonl' or 'csv':
+
+UPLOAD_FORMAT_LABELS = {
+    'xlsx': 'excel file',
+    'csv': 'CSV file',
+    'parquet': 'Parquet file',
+    'jsonl': 'JSON file'
+}
+
+def sniff_upload_format(file_bytes):
+    if file_bytes.startswith(b'PK\x03\x04'):                 # zip container (.xlsx)
+        return 'xlsx'
+    if file_bytes.startswith(b'PAR1'):
+        return 'parquet'
+    if file_bytes.lstrip(b'\xef\xbb\xbf \t\r\n')[:1] in (b'{', b'['):
+        return 'jsonl'
+    return 'csv'
+
+# -- Reads a CSV, Parquet or JSON(-lines) file, keeping only EXPECTED_COLUMNS,
+#    returns (Dataframe or None, list of ValidationIssue):
+
+def read_tabular_data(file_bytes, file_format, max_rows=MAX_UPLOAD_ROWS):
+    label = UPLOAD_FORMAT_LABELS[file_format]
+    missing_columns = ValidationIssue('', f"The file is missing one or more required columns. \
+                 Please ensure the columns are exactly: {EXPECTED_COLUMNS}")
+    too_many_rows = ValidationIssue(
+        '', f"Your {label} has more than {max_rows} rows of data. Please split it into smaller files."
+    )
 
-        # 1. Catch error if sheet is empty / no data
-        if df.empty:
-            st.error("Could not find any data in your excel file.")
-            return None
+    try:
+        if file_format == 'csv':
+            # Check header before reading any data row, then read only expected columns up to the cap
+            header = pd.read_csv(io.BytesIO(file_bytes), nrows=0, encoding='utf-8-sig').columns
+            if not set(EXPECTED_COLUMNS).issubset(header):
+                return None, [missing_columns]
+            df = pd.read_csv(io.BytesIO(file_bytes), usecols=EXPECTED_COLUMNS, nrows=max_rows + 1, encoding='utf-8-sig')
+
+        elif file_format == 'parquet':
+            # Check schema & row count from the footer before reading (only) expected columns
+            from pyarrow import parquet
+            parquet_file = parquet.ParquetFile(io.BytesIO(file_bytes))
+            if not set(EXPECTED_COLUMNS).issubset(parquet_file.schema_arrow.names):
+                return None, [missing_columns]
+            if parquet_file.metadata.num_rows > max_rows:
+                return None, [too_many_rows]
+            df = parquet_file.read(columns=EXPECTED_COLUMNS).to_pandas()
 
-        # 2. Check if expected columns are a subset of the uploaded columns
-        if not set(EXPECTED_COLUMNS).issubset(set(df.columns)):
-            st.error(f"The file is missing one or more required columns. \
-                     Please ensure the columns are exactly: {EXPECTED_COLUMNS}")
-            return None
-        
-        # 3. Only relevant columns
-        df = df[EXPECTED_COLUMNS]
-
-        # 4. Standardise upper case for string columns
-        df['Module_Code'] = df['Module_Code'].str.upper()
-        df['Module_Title'] = df['Module_Title'].str.upper()
-        df['Module_Type'] = df['Module_Type'].str.upper()
-        df['Grade'] = df['Grade'].str.upper()
-
-        # 5. Validate each column
-        expected_types = {
-            'Module_Code': str,
-            'Module_Title': str,
-            'Year': int,
-            'Semester': int,
-            'Units': int,
-            'Module_Type': str,
-            'Grade': str
-        }
+        else:
+            is_array = file_bytes.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'[')
+            df = pd.read_json(io.BytesIO(file_bytes), lines=not is_array, dtype=False, convert_dates=False)
+            if not df.empty and not set(EXPECTED_COLUMNS).issubset(df.columns):
+                return None, [missing_columns]
 
-        for col, expected_type in expected_types.items():
-            check = validate_column(df=df, col=col, expected_type=expected_type)
-            if not check:
-                return None
-        
-        # 6. Check for exact duplicate rows (not double-counted or IP)
-        duplicate_rows = df[df.duplicated()]
-        if not duplicate_rows.empty:
-            st.error(f"Your dataset contains duplicate row(s) for {duplicate_rows['Module_Code'].unique()}. Please remove them.")
-            return None
-                
-        return df
-    
-    # Catch error if sheet name not properly formatted as 'data'
-    except ValueError:
-        st.error("Could not find the tab sheet 'data' in your excel file.")
-        return None
-    
-    # Catch any other error
     except Exception as e:
-        st.error("Error reading Excel file. Make sure it's properly formatted.")
-        return None
+        return None, [ValidationIssue('', f"Error reading {label}. Make sure it's properly formatted.")]
+
+    # Catch error if file is empty / no data
+    if df.empty:
+        return None, [ValidationIssue('', f"Could not find any data in your {label}.")]
+
+    if len(df) > max_rows:
+        return None, [too_many_rows]
+
+    df = df[EXPECTED_COLUMNS]
+
+    # Categorical / Arrow-backed string columns are treated like plain Python strings
+    for col, expected_type in EXPECTED_TYPES.items():
+        if expected_type == str and df[col].dtype != object:
+            if isinstance(df[col].dtype, (pd.CategoricalDtype, pd.StringDtype)):
+                df[col] = df[col].astype(object).where(df[col].notna(), None)
+
+    return df, []
+
+# -- Parses & validates uploaded file bytes (xlsx, CSV, Parquet or JSON-lines),
+#    returns (Dataframe or None, list of ValidationIssue):
+
+def parse_uploaded_data(file_bytes, max_rows=MAX_UPLOAD_ROWS):
+
+    # 1. Read expected columns, bailing out early if sheet/columns are missing or file is too large
+    file_format = sniff_upload_format(file_bytes)
+    if file_format == 'xlsx':
+        df, issues = read_workbook_data(io.BytesIO(file_bytes), max_rows=max_rows)
+    else:
+        df, issues = read_tabular_data(file_bytes, file_format, max_rows=max_rows)
+    if issues:
+        return None, issues
+
+    # 2. Standardise upper case for string columns (non-string cells become null & are reported below)
+    for col in ['Module_Code', 'Module_Title', 'Module_Type', 'Grade']:
+        if df[col].dtype == object:
+            df[col] = df[col].str.upper()
+
+    # 3. Validate every column in one pass (warnings are returned alongside the Dataframe)
+    issues = validate_uploaded_data(df)
+    if any(issue.level == 'error' for issue in issues):
+        return None, issues
     
+    return df, issues
+
+#######################
+# Upload Cache (keyed by content hash of the uploaded file)
+
+# -- Process-wide LRU of parsed & validated uploads { (sha256 of file bytes, max_rows) : (Dataframe, issues) },
+#    shared by every Streamlit session so a repeat upload of the same file is served without re-parsing:
+
+upload_cache = LRUCache(max_entries=32)
+
+# -- Returns raw bytes of an uploaded file (Streamlit UploadedFile, file object or path):
 
+def read_upload_bytes(uploaded_file):
+    if hasattr(uploaded_file, 'getvalue'):
+        return uploaded_file.getvalue()
+    if hasattr(uploaded_file, 'read'):
+        position = uploaded_file.tell() if hasattr(uploaded_file, 'tell') else None
+        file_bytes = uploaded_file.read()
+        if position is not None:
+            uploaded_file.seek(position)
+        return file_bytes
+    return Path(uploaded_file).read_bytes()
+
+# -- Returns sha256 hex digest of file bytes:
+
+def hash_upload(file_bytes):
+    return hashlib.sha256(file_bytes).hexdigest()
+
+# -- Reads & validates uploaded file through the upload cache, returns (Dataframe or None, list of ValidationIssue):
+
+def read_uploaded_data(uploaded_file, max_rows=MAX_UPLOAD_ROWS):
+    _, df, issues = read_hashed_upload(uploaded_file, max_rows=max_rows)
+    return df, issues
+
+# -- Same as read_uploaded_data, also returning the sha256 of the file (e.g to key the snapshot store without re-hashing):
+
+def read_hashed_upload(uploaded_file, max_rows=MAX_UPLOAD_ROWS):
+    file_bytes = read_upload_bytes(uploaded_file)
+    content_hash = hash_upload(file_bytes)
+    key = (content_hash, max_rows)
+
+    cached = upload_cache.get(key)
+    if cached is None:
+        cached = parse_uploaded_data(file_bytes, max_rows=max_rows)
+        upload_cache.put(key, cached)
+
+    # Callers (e.g. the dashboard) add columns in place, so never hand out the cached Dataframe itself
+    df, issues = cached
+    return content_hash, (df.copy() if df is not None else None), list(issues)
+
+# -- Returns dictionary of upload cache size, hit rate & evictions:
+
+def load_upload_cache_stats():
+    return upload_cache.stats()
+
+#######################
+# Figure Cache (keyed by content hash of a dashboard panel's inputs & colour theme)
+
+FIGURE_CACHE_REPORT_COLUMNS = ['Panel', 'Builds', 'Hits', 'Mean_Build_s', 'Mean_Hash_s', 'Saved_s', 'Last', 'Last_s']
+
+class FigureCache:
+
+    '''
+        1) Process-wide LRU of built figures { (panel, content hash of the panel's inputs) : figure },
+           shared by every Streamlit session;
+        2) A panel is only rebuilt when its inputs or the colour theme change, not on every rerun;
+        3) Records per-panel build time, cache hits & build time saved by the hits.
+    '''
+
+    def __init__(self, max_entries):
+        self.cache = LRUCache(max_entries=max_entries)
+        self._timings = {}                          # { panel : per-panel counters (see report) }
+        self._lock = threading.Lock()
+
+    # -- Returns figure of panel for inputs, built with build() only on a cache miss.
+    #    Inputs must include everything build() reads (data, theme, user values), figures must not be mutated after build:
+
+    def get_or_build(self, panel, build, *inputs):
+        start = time.perf_counter()
+        key = (panel, hash_figure_inputs(*inputs))
+        hash_time = time.perf_counter() - start
+
+        figure = self.cache.get(key)
+        build_time = None
+        if figure is None:
+            start = time.perf_counter()
+            figure = build()
+            build_time = time.perf_counter() - start
+            self.cache.put(key, figure)
+
+        with self._lock:
+            timings = self._timings.setdefault(panel, {
+                'builds': 0, 'hits': 0, 'build_s': 0.0, 'hash_s': 0.0, 'last': None, 'last_s': 0.0
+            })
+            timings['hash_s'] += hash_time
+            if build_time is None:
+                timings['hits'] += 1
+                timings['last'], timings['last_s'] = 'cache', hash_time
+            else:
+                timings['builds'] += 1
+                timings['build_s'] += build_time
+                timings['last'], timings['last_s'] = 'built', hash_time + build_time
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self._timings.clear()
+
+    # -- Returns Dataframe of per-panel builds, hits, mean build & hash time, time saved by hits
+    #    & how the last request was served:
+
+    def report(self):
+        rows = []
+        with self._lock:
+            for panel, timings in self._timings.items():
+                mean_build = timings['build_s'] / timings['builds'] if timings['builds'] else 0.0
+                lookups = timings['builds'] + timings['hits']
+                rows.append({
+                    'Panel': panel,
+                    'Builds': timings['builds'],
+                    'Hits': timings['hits'],
+                    'Mean_Build_s': round(mean_build, 4),
+                    'Mean_Hash_s': round(timings['hash_s'] / lookups, 4) if lookups else 0.0,
+                    'Saved_s': round(timings['hits'] * mean_build - timings['hash_s'], 4),  # net of time spent hashing
+                    'Last': timings['last'],
+                    'Last_s': round(timings['last_s'], 4)
+                })
+        return pd.DataFrame(rows, columns=FIGURE_CACHE_REPORT_COLUMNS)
+
+# -- Returns sha256 hex digest of figure inputs (Dataframes, Series, arrays, containers, dataclasses & palettes, scalars):
+
+def hash_figure_inputs(*inputs):
+    digest = hashlib.sha256()
+    for value in inputs:
+        _update_figure_digest(digest, value)
+    return digest.hexdigest()
+
+def _update_figure_digest(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        frame = value.to_frame() if isinstance(value, pd.Series) else value
+        digest.update(repr((type(value).__name__, list(frame.columns), [str(dtype) for dtype in frame.dtypes])).encode())
+        # object cells may be unhashable (e.g lists of completion status), so they are hashed by their repr
+        columns = {
+            i : (frame.iloc[:, i].map(repr) if frame.dtypes.iloc[i] == object else frame.iloc[:, i])
+            for i in range(frame.shape[1])
+        }
+        digest.update(pd.util.hash_pandas_object(pd.DataFrame(columns, index=frame.index), index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        digest.update(repr(('ndarray', str(value.dtype), value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        digest.update(f"{type(value).__name__}[{len(value)}](".encode())
+        for item in value:
+            _update_figure_digest(digest, item)
+        digest.update(b')')
+    elif isinstance(value, (set, frozenset)):
+        _update_figure_digest(digest, sorted(value, key=repr))
+    elif isinstance(value, dict):
+        digest.update(b'dict')
+        _update_figure_digest(digest, sorted(value.items(), key=lambda item: repr(item[0])))
+    elif hasattr(value, '__dict__') and not isinstance(value, type):
+        # dataclasses & plain objects (e.g ColorPalette): hashed by their attributes
+        digest.update(type(value).__name__.encode())
+        _update_figure_digest(digest, vars(value))
+    else:
+        digest.update(repr((type(value).__name__, value)).encode())
+
+# -- Process-wide figure cache of the dashboard panels:
+
+figure_cache = FigureCache(max_entries=128)
+
+# -- Returns Dataframe of per-panel build timings of the figure cache:
+
+def load_figure_cache_report():
+    return figure_cache.report()
+
+#######################
+# Persistent Snapshot Store (SQLite, keyed by content hash of the upload + session token)
+
+# -- Location of the store (opt-in: disabled unless SNAPSHOT_STORE_PATH is set), entry lifetime after last access & size cap of
+#    stored payloads. Enabling it stores every uploaded transcript (grades included) on the server's disk until it expires,
+#    and anyone holding a student's ?session= link can resume that student's dashboard:
+
+SNAPSHOT_STORE_PATH = os.environ.get('SNAPSHOT_STORE_PATH', '')
+SNAPSHOT_STORE_TTL_SECONDS = int(os.environ.get('SNAPSHOT_STORE_TTL_SECONDS', 7 * 24 * 60 * 60))
+SNAPSHOT_STORE_MAX_BYTES = int(os.environ.get('SNAPSHOT_STORE_MAX_BYTES', 256 * 1024 * 1024))
+
+class SnapshotStore:
+
+    '''
+        1) Persists a validated transcript & the state computed from it (e.g User.export_state) as zlib-compressed pickles,
+           keyed by (sha256 of the uploaded file, session token), so a returning student resumes without re-uploading;
+        2) Entries expire ttl_seconds after their last access;
+        3) Least recently accessed entries are evicted while stored payloads exceed max_bytes.
+    '''
+
+    def __init__(self, db_path, ttl_seconds=SNAPSHOT_STORE_TTL_SECONDS, max_bytes=SNAPSHOT_STORE_MAX_BYTES):
+        self.db_path = str(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")           # readers don't block the writer of another session
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "content_hash TEXT NOT NULL, session_token TEXT NOT NULL, transcript BLOB NOT NULL, state BLOB NOT NULL, "
+                "size INTEGER NOT NULL, created REAL NOT NULL, last_access REAL NOT NULL, "
+                "PRIMARY KEY (content_hash, session_token))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS snapshots_token ON snapshots (session_token, last_access)")
+            connection.execute("CREATE INDEX IF NOT EXISTS snapshots_last_access ON snapshots (last_access)")
+
+    # -- Yields a connection, committing (or rolling back) & closing it on exit:
+
+    @contextmanager
+    def _connect(self):
+        with closing(sqlite3.connect(self.db_path, timeout=5)) as connection:
+            with connection:
+                yield connection
+
+    # -- Store (or replace) an entry, then evict expired & excess entries:
+
+    def put(self, content_hash, session_token, transcript, state):
+        transcript_blob = zlib.compress(pickle.dumps(transcript, protocol=pickle.HIGHEST_PROTOCOL))
+        state_blob = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (content_hash, session_token, transcript_blob, state_blob, len(transcript_blob) + len(state_blob), now, now)
+            )
+            self._evict(connection, now)
+
+    # -- Returns (content hash, transcript, state) of the session's most recently used entry (of content_hash if given),
+    #    None if there is none or it has expired:
+
+    def get(self, session_token, content_hash=None):
+        now = time.time()
+        with self._connect() as connection:
+            query = "SELECT content_hash, transcript, state FROM snapshots WHERE session_token = ? AND last_access >= ?"
+            params = [session_token, now - self.ttl_seconds]
+            if content_hash is not None:
+                query += " AND content_hash = ?"
+                params.append(content_hash)
+            row = connection.execute(query + " ORDER BY last_access DESC LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE snapshots SET last_access = ? WHERE content_hash = ? AND session_token = ?",
+                               (now, row[0], session_token))
+        return row[0], pickle.loads(zlib.decompress(row[1])), pickle.loads(zlib.decompress(row[2]))
+
+    # -- Drop expired entries, then the least recently used ones beyond max_bytes; returns number of entries removed:
+
+    def evict(self):
+        with self._connect() as connection:
+            return self._evict(connection, time.time())
+
+    def _evict(self, connection, now):
+        removed = connection.execute("DELETE FROM snapshots WHERE last_access < ?", (now - self.ttl_seconds,)).rowcount
+        removed += connection.execute(
+            "DELETE FROM snapshots WHERE rowid IN (SELECT rowid FROM ("
+            "SELECT rowid, SUM(size) OVER (ORDER BY last_access DESC, rowid DESC) AS kept_bytes FROM snapshots"
+            ") WHERE kept_bytes > ?)", (self.max_bytes,)
+        ).rowcount
+        return removed
+
+    # -- Return dictionary of number of entries & bytes stored:
+
+    def stats(self):
+        with self._connect() as connection:
+            entries, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM snapshots").fetchone()
+        return {'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes, 'ttl_seconds': self.ttl_seconds}
+
+# -- Returns the process-wide SnapshotStore, None if disabled (SNAPSHOT_STORE_PATH unset or ''):
+
+@lru_cache(maxsize=1)
+def load_snapshot_store():
+    return SnapshotStore(SNAPSHOT_STORE_PATH) if SNAPSHOT_STORE_PATH else None
+
+#######################
+# Session Memory Accounting (what each Streamlit session holds, for sizing servers)
+
+# -- Returns approximate deep memory footprint (bytes) of obj, skipping objects already counted (ids in seen):
+
+def deep_memory(obj, seen):
+    if id(obj) in seen or callable(obj) or isinstance(obj, (type, ModuleType)):
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return estimate_memory(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)):
+        return size
+
+    if isinstance(obj, (dict, MappingProxyType)):
+        size += sum(deep_memory(key, seen) + deep_memory(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_memory(item, seen) for item in obj)
+    if hasattr(obj, '__dict__'):
+        size += deep_memory(vars(obj), seen)
+    for slot in {slot for cls in type(obj).__mro__ for slot in getattr(cls, '__slots__', ())}:
+        size += deep_memory(getattr(obj, slot, None), seen)
+    return size
+
+# -- Returns Dataframe of memory (bytes) held by each key of a session state,
+#    objects shared between keys counted once (first key):
+
+def session_memory_report(session_state):
+    seen = set()
+    rows = [
+        {'Key': key, 'Type': type(value).__name__, 'Bytes': deep_memory(value, seen)} for key, value in session_state.items()
+    ]
+    return pd.DataFrame(rows, columns=['Key', 'Type', 'Bytes']).sort_values('Bytes', ascending=False, ignore_index=True)